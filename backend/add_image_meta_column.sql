@@ -0,0 +1,7 @@
+-- Add per-photo dimensions and inline placeholders to products table
+USE finance_auction_db;
+
+-- JSON object keyed by image path: {"uploads/...": {"width": 1707, "height": 2560, "placeholder": "data:image/webp;base64,..."}}
+ALTER TABLE products ADD COLUMN image_meta TEXT DEFAULT NULL COMMENT 'Per-image dimensions and LQIP placeholder' AFTER image_path;
+
+-- Existing rows are filled by: python backfill_image_meta.py
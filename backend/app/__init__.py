@@ -36,6 +36,10 @@ def create_app(config_class=Config):
     app.wsgi_app = _StripTrailingSlash(app.wsgi_app)
     app.config.from_object(config_class)
 
+    # orjson-backed (when installed) JSON encoding, keys left unsorted
+    from .utils.serialization import FastJSONProvider
+    app.json = FastJSONProvider(app)
+
     # Enable CORS for React frontend
     CORS(app, resources={
         r"/api/*": {
@@ -85,6 +89,16 @@ def create_app(config_class=Config):
     def health():
         return {"status": "ok", "message": "AutoRevive API is running"}
 
+    # Password hashing queue full (app/utils/passwords.py) – ask the client to retry
+    from .utils.passwords import HashPoolBusy
+
+    @app.errorhandler(HashPoolBusy)
+    def password_hashing_busy(error):
+        resp = jsonify({"error": str(error)})
+        resp.status_code = 503
+        resp.headers["Retry-After"] = "2"
+        return resp
+
     # Handle request too large (413) – must include CORS headers because
     # Flask may reject the body before flask-cors processes the response.
     @app.errorhandler(413)
@@ -22,5 +22,69 @@ class Config:
         ext.strip() for ext in os.getenv("ALLOWED_EXTENSIONS", "png,jpg,jpeg,gif,webp").split(",")
     )
 
+    # Resumable chunked uploads (see /api/vehicles/uploads)
+    UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", 1024 * 1024))  # 1 MB per chunk
+    CHUNKED_UPLOAD_MAX_SIZE = int(os.getenv("CHUNKED_UPLOAD_MAX_SIZE", 50 * 1024 * 1024))
+    CHUNKED_UPLOAD_TTL = int(os.getenv("CHUNKED_UPLOAD_TTL", 24 * 3600))  # abandoned sessions are swept after this
+    UPLOAD_MAX_CONCURRENT_ASSEMBLIES = int(os.getenv("UPLOAD_MAX_CONCURRENT_ASSEMBLIES", 2))
+
+    # Image conversion — longest edge cap for uploaded photos (0 = keep native resolution)
+    IMAGE_MAX_EDGE = int(os.getenv("IMAGE_MAX_EDGE", 2560))
+    WEBP_QUALITY = int(os.getenv("WEBP_QUALITY", 85))
+
     # CORS
     CORS_ORIGINS = os.getenv("CORS_ORIGINS", "http://localhost:3000").split(",")
+
+    # Public landing page cache (seconds): fresh window, then served stale while one refresh runs
+    HOME_CACHE_TTL = int(os.getenv("HOME_CACHE_TTL", 30))
+    HOME_CACHE_STALE_TTL = int(os.getenv("HOME_CACHE_STALE_TTL", 300))
+
+    # Admin dashboard rollup: recompute platform_stats from the base tables this often (seconds)
+    STATS_RECONCILE_INTERVAL = int(os.getenv("STATS_RECONCILE_INTERVAL", 900))
+
+    # Office dashboard / profile counters cache (seconds); an office's own writes invalidate it
+    OFFICE_STATS_CACHE_TTL = int(os.getenv("OFFICE_STATS_CACHE_TTL", 15))
+
+    # List endpoints: how long an exact filtered COUNT is reused for keyset (?after=) pages (seconds)
+    PAGINATION_COUNT_TTL = int(os.getenv("PAGINATION_COUNT_TTL", 30))
+
+    # Auction/vehicle detail views embed only this many top bids (full history is paged)
+    DETAIL_TOP_BIDS = int(os.getenv("DETAIL_TOP_BIDS", 20))
+
+    # Public auction facet counts: full in-memory index rebuild interval (seconds); edits apply immediately
+    FACET_REBUILD_INTERVAL = int(os.getenv("FACET_REBUILD_INTERVAL", 600))
+
+    # Search box typeahead: full in-memory prefix index rebuild interval (seconds); product edits apply immediately
+    SUGGEST_REBUILD_INTERVAL = int(os.getenv("SUGGEST_REBUILD_INTERVAL", 600))
+
+    # Saved-search alerts: full reload of the in-memory reverse index (seconds); this process's edits apply immediately
+    SAVED_SEARCH_REBUILD_INTERVAL = int(os.getenv("SAVED_SEARCH_REBUILD_INTERVAL", 300))
+
+    # Frontend error ingestion: queue capacity (rows), flush interval (ms) and rows per multi-row INSERT
+    ERROR_LOG_QUEUE_SIZE = int(os.getenv("ERROR_LOG_QUEUE_SIZE", 5000))
+    ERROR_LOG_FLUSH_MS = int(os.getenv("ERROR_LOG_FLUSH_MS", 1000))
+    ERROR_LOG_BATCH_SIZE = int(os.getenv("ERROR_LOG_BATCH_SIZE", 200))
+
+    # Error groups: raw error_logs rows kept per group, then the share of further occurrences still stored
+    ERROR_GROUP_RAW_QUOTA = int(os.getenv("ERROR_GROUP_RAW_QUOTA", 100))
+    ERROR_GROUP_SAMPLE_RATE = float(os.getenv("ERROR_GROUP_SAMPLE_RATE", 0.01))
+
+    # Log retention (maintain_logs.py): days of raw rows kept, and day partitions created ahead
+    ERROR_LOG_RETENTION_DAYS = int(os.getenv("ERROR_LOG_RETENTION_DAYS", 30))
+    AUTH_LOG_RETENTION_DAYS = int(os.getenv("AUTH_LOG_RETENTION_DAYS", 90))
+    LOG_PARTITIONS_AHEAD = int(os.getenv("LOG_PARTITIONS_AHEAD", 7))
+
+    # Admin error log browser: window searched when no date_from is given (days)
+    ERROR_LOG_DEFAULT_DAYS = int(os.getenv("ERROR_LOG_DEFAULT_DAYS", 7))
+
+    # Wishlist alerts: bids on one product within this many seconds become one price alert
+    WISHLIST_PRICE_ALERT_COALESCE = int(os.getenv("WISHLIST_PRICE_ALERT_COALESCE", 30))
+    # Ending-soon alerts: auctions closing within this many minutes, scanned every N seconds (0 = off)
+    WISHLIST_ENDING_SOON_MINUTES = int(os.getenv("WISHLIST_ENDING_SOON_MINUTES", 60))
+    WISHLIST_ENDING_SOON_SCAN_INTERVAL = int(os.getenv("WISHLIST_ENDING_SOON_SCAN_INTERVAL", 300))
+
+    # Password hashing (app/utils/passwords.py): Werkzeug method string (changing it rehashes users on login),
+    # concurrent native-thread hashes, and queued requests beyond which sign-ins get a 503
+    PASSWORD_HASH_METHOD = os.getenv("PASSWORD_HASH_METHOD", "scrypt")
+    PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", 4))
+    PASSWORD_HASH_MAX_WAITING = int(os.getenv("PASSWORD_HASH_MAX_WAITING", 64))
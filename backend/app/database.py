@@ -1,3 +1,4 @@
+import json
 import MySQLdb
 import MySQLdb.cursors
 from werkzeug.security import generate_password_hash
@@ -74,7 +75,18 @@ class Database:
             except Exception:
                 pass  # Column already exists
 
-        # Wishlists table (one user, one row, items stored as JSON text to support older MySQL versions or directly as JSON)
+        # Admin user list pages newest-first by (created_at, id); office search
+        for index_sql in (
+            "ALTER TABLE users ADD INDEX idx_created (created_at, id)",
+            "ALTER TABLE users ADD FULLTEXT INDEX ft_office_search (username, finance_name, owner_name)",
+        ):
+            try:
+                cursor.execute(index_sql)
+            except Exception:
+                pass  # Index already exists
+
+        # Legacy wishlists table (one user, one row, items as a JSON array);
+        # superseded by wishlist_items, which is migrated from it below
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS wishlists (
                 user_id INT PRIMARY KEY,
@@ -110,56 +122,57 @@ class Database:
             ('is_active', 'BOOLEAN DEFAULT TRUE AFTER status'),
             ('winner_user_id', 'INT DEFAULT NULL AFTER is_active'),
             ('closed_at', 'TIMESTAMP NULL DEFAULT NULL AFTER winner_user_id'),
+            ('image_meta', 'TEXT DEFAULT NULL AFTER image_path'),
+            ('search_text', 'TEXT DEFAULT NULL'),
         ]:
             try:
                 cursor.execute(f"ALTER TABLE products ADD COLUMN {col} {definition}")
             except Exception:
                 pass  # Column already exists
 
-        # Backfill category for existing products that don't have it set
+        # Backfill category for existing products that don't have it set.
+        # search_text indexes the category: clear it so the search_text
+        # backfill below rebuilds it for these rows
         try:
-            cursor.execute("""
-                UPDATE products SET category = '2W'
-                WHERE category IS NULL AND (
-                    name LIKE '%%bike%%' OR name LIKE '%%motorcycle%%' OR name LIKE '%%scooter%%'
-                    OR name LIKE '%%bullet%%' OR name LIKE '%%activa%%' OR name LIKE '%%pulsar%%'
-                    OR name LIKE '%%splendor%%' OR name LIKE '%%royal enfield%%'
-                    OR name LIKE '%%yamaha%%' OR name LIKE '%%tvs%%' OR name LIKE '%%bajaj%%'
-                    OR name LIKE '%%hero%%' OR name LIKE '%%ktm%%' OR name LIKE '%%duke%%'
-                    OR name LIKE '%%access%%' OR name LIKE '%%jupiter%%'
-                )
-            """)
-            cursor.execute("""
-                UPDATE products SET category = '3W'
-                WHERE category IS NULL AND (
-                    name LIKE '%%auto%%' OR name LIKE '%%rickshaw%%'
-                    OR name LIKE '%%three%%wheeler%%' OR name LIKE '%%3 wheeler%%'
-                    OR name LIKE '%%ape%%' OR name LIKE '%%tuk%%'
-                )
-            """)
-            cursor.execute("""
-                UPDATE products SET category = '4W'
-                WHERE category IS NULL AND (
-                    name LIKE '%%car%%' OR name LIKE '%%suv%%' OR name LIKE '%%sedan%%'
-                    OR name LIKE '%%hatchback%%' OR name LIKE '%%jeep%%' OR name LIKE '%%innova%%'
-                    OR name LIKE '%%swift%%' OR name LIKE '%%fortuner%%' OR name LIKE '%%creta%%'
-                    OR name LIKE '%%nexon%%' OR name LIKE '%%brezza%%' OR name LIKE '%%ertiga%%'
-                    OR name LIKE '%%wagon%%' OR name LIKE '%%alto%%' OR name LIKE '%%i20%%'
-                    OR name LIKE '%%i10%%' OR name LIKE '%%dzire%%' OR name LIKE '%%verna%%'
-                    OR name LIKE '%%city%%' OR name LIKE '%%polo%%' OR name LIKE '%%baleno%%'
-                )
-            """)
-            cursor.execute("""
-                UPDATE products SET category = 'Commercial'
-                WHERE category IS NULL AND (
-                    name LIKE '%%truck%%' OR name LIKE '%%bus%%' OR name LIKE '%%tempo%%'
-                    OR name LIKE '%%van%%' OR name LIKE '%%lorry%%' OR name LIKE '%%tractor%%'
-                    OR name LIKE '%%tipper%%' OR name LIKE '%%commercial%%'
-                    OR name LIKE '%%eicher%%' OR name LIKE '%%tata ace%%'
-                )
-            """)
+            from .utils.vehicle_category import classify_vehicle
+            cursor.execute("SELECT id, name, description FROM products WHERE category IS NULL")
+            updates = []
+            for product_id, name, description in cursor.fetchall():
+                category = classify_vehicle(name, description)
+                if category:
+                    updates.append((category, product_id))
+            if updates:
+                cursor.executemany("UPDATE products SET category = %s, search_text = NULL WHERE id = %s", updates)
+        except Exception:
+            pass  # Non-critical migration
+
+        # Stats group approved products by category
+        try:
+            cursor.execute("ALTER TABLE products ADD INDEX idx_status_category (status, category)")
+        except Exception:
+            pass  # Index already exists
+
+        # Listing pages seek on (created_at, id) within a status / office
+        for index_sql in (
+            "ALTER TABLE products ADD INDEX idx_status_created (status, created_at, id)",
+            "ALTER TABLE products ADD INDEX idx_office_created (office_id, created_at, id)",
+        ):
+            try:
+                cursor.execute(index_sql)
+            except Exception:
+                pass  # Index already exists
+
+        # Vehicle/auction search (see app/utils/search.py); fill search_text
+        # before building the FULLTEXT index so it is built once
+        try:
+            from .utils.search import backfill_search_text
+            backfill_search_text(cursor)
         except Exception:
             pass  # Non-critical migration
+        try:
+            cursor.execute("ALTER TABLE products ADD FULLTEXT INDEX ft_search (search_text)")
+        except Exception:
+            pass  # Index already exists
 
         # Bids table
         cursor.execute("""
@@ -174,6 +187,51 @@ class Database:
             )
         """)
 
+        # Dashboard "recent activity" reads the latest bids; bid history
+        # pages seek on (amount, id) per product
+        for index_sql in (
+            "ALTER TABLE bids ADD INDEX idx_bid_time (bid_time)",
+            "ALTER TABLE bids ADD INDEX idx_product_amount (product_id, amount, id)",
+        ):
+            try:
+                cursor.execute(index_sql)
+            except Exception:
+                pass  # Index already exists
+
+        # Wishlist membership, one row per (user, product); idx_product is the
+        # reverse index (who wishlisted a product)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS wishlist_items (
+                user_id INT NOT NULL,
+                product_id INT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (user_id, product_id),
+                INDEX idx_product (product_id, user_id),
+                INDEX idx_user_created (user_id, created_at),
+                FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+                FOREIGN KEY (product_id) REFERENCES products(id) ON DELETE CASCADE
+            )
+        """)
+
+        # Move items out of the legacy JSON column; emptied rows are not
+        # migrated again. INSERT IGNORE skips ids of deleted products.
+        cursor.execute("SELECT user_id, items FROM wishlists WHERE items IS NOT NULL")
+        legacy = cursor.fetchall()
+        if legacy:
+            pairs = []
+            for user_id, items in legacy:
+                try:
+                    product_ids = json.loads(items) if items else []
+                except (TypeError, ValueError):
+                    continue
+                pairs.extend((user_id, int(pid)) for pid in product_ids if str(pid).isdigit())
+            if pairs:
+                cursor.executemany(
+                    "INSERT IGNORE INTO wishlist_items (user_id, product_id) VALUES (%s, %s)",
+                    pairs,
+                )
+            cursor.execute("UPDATE wishlists SET items = NULL WHERE items IS NOT NULL")
+
         # Office details table (finance office extended info)
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS office_details (
@@ -235,12 +293,37 @@ class Database:
             ('upi_transaction_id', 'VARCHAR(100) DEFAULT NULL AFTER payment_screenshot'),
             ('verified_by', 'INT DEFAULT NULL AFTER upi_transaction_id'),
             ('verified_at', 'TIMESTAMP NULL DEFAULT NULL AFTER verified_by'),
+            ('duplicate_of', 'INT DEFAULT NULL AFTER verified_at'),
+            ('duplicate_distance', 'TINYINT UNSIGNED DEFAULT NULL AFTER duplicate_of'),
         ]:
             try:
                 cursor.execute(f"ALTER TABLE transactions ADD COLUMN {col} {definition}")
             except Exception:
                 pass  # Column already exists
 
+        # Perceptual-hash index of payment screenshots (near-duplicate detection).
+        # The 256-bit hash is split into 8 indexed 32-bit bands for candidate lookup.
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS payment_screenshot_hashes (
+                transaction_id INT PRIMARY KEY,
+                phash CHAR(64) NOT NULL,
+                band0 INT UNSIGNED NOT NULL,
+                band1 INT UNSIGNED NOT NULL,
+                band2 INT UNSIGNED NOT NULL,
+                band3 INT UNSIGNED NOT NULL,
+                band4 INT UNSIGNED NOT NULL,
+                band5 INT UNSIGNED NOT NULL,
+                band6 INT UNSIGNED NOT NULL,
+                band7 INT UNSIGNED NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                INDEX idx_band0 (band0), INDEX idx_band1 (band1),
+                INDEX idx_band2 (band2), INDEX idx_band3 (band3),
+                INDEX idx_band4 (band4), INDEX idx_band5 (band5),
+                INDEX idx_band6 (band6), INDEX idx_band7 (band7),
+                FOREIGN KEY (transaction_id) REFERENCES transactions(id) ON DELETE CASCADE
+            )
+        """)
+
         # Password Resets table
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS password_resets (
@@ -296,11 +379,106 @@ class Database:
                 occurred_at     DATETIME     NOT NULL,
                 created_at      TIMESTAMP    DEFAULT CURRENT_TIMESTAMP,
 
-                INDEX idx_error_type (error_type),
-                INDEX idx_user_id    (user_id),
-                INDEX idx_occurred_at (occurred_at)
+                fingerprint     CHAR(32)     DEFAULT NULL,
+
+                INDEX idx_type_time  (error_type, occurred_at),
+                INDEX idx_user_time  (user_id, occurred_at),
+                INDEX idx_occurred_at (occurred_at),
+                INDEX idx_fingerprint (fingerprint, occurred_at)
             )
         """)
+        # Day partitioning and retention are applied by maintain_logs.py
+        # (see app/utils/log_retention.py), not here: converting an existing
+        # table rebuilds it.
+
+        # Group fingerprint and filter + time-order indexes on existing error_logs tables
+        for sql in (
+            "ALTER TABLE error_logs ADD COLUMN fingerprint CHAR(32) DEFAULT NULL",
+            "ALTER TABLE error_logs ADD INDEX idx_fingerprint (fingerprint, occurred_at)",
+            "ALTER TABLE error_logs ADD INDEX idx_type_time (error_type, occurred_at)",
+            "ALTER TABLE error_logs ADD INDEX idx_user_time (user_id, occurred_at)",
+        ):
+            try:
+                cursor.execute(sql)
+            except Exception:
+                pass  # Column / index already exists
+
+        # One row per error fingerprint; see app/utils/error_groups.py
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS error_groups (
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                fingerprint CHAR(32) NOT NULL UNIQUE,
+                error_type VARCHAR(50) DEFAULT NULL,
+                component_name VARCHAR(255) DEFAULT NULL,
+                title VARCHAR(500) DEFAULT NULL,
+                sample_message TEXT,
+                sample_stack TEXT,
+                occurrences INT NOT NULL DEFAULT 0,
+                raw_count INT NOT NULL DEFAULT 0,
+                affected_users VARBINARY(512) DEFAULT NULL,
+                first_seen DATETIME NOT NULL,
+                last_seen DATETIME NOT NULL,
+                INDEX idx_last_seen (last_seen, id),
+                INDEX idx_occurrences (occurrences, id)
+            )
+        """)
+
+        # Daily error counts for long-range reporting; bumped at ingest and
+        # kept after the raw error_logs partitions expire
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS error_log_daily (
+                day DATE NOT NULL,
+                error_type VARCHAR(50) NOT NULL DEFAULT '',
+                browser_name VARCHAR(100) NOT NULL DEFAULT '',
+                os_name VARCHAR(100) NOT NULL DEFAULT '',
+                occurrences INT NOT NULL DEFAULT 0,
+                PRIMARY KEY (day, error_type, browser_name, os_name)
+            )
+        """)
+
+        # Saved searches (buyer alerts) — query is the get_auctions filter set
+        # as JSON; see app/utils/saved_searches.py
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS saved_searches (
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                user_id INT NOT NULL,
+                name VARCHAR(100) NOT NULL,
+                query JSON NOT NULL,
+                notify BOOLEAN DEFAULT TRUE,
+                last_notified_at TIMESTAMP NULL DEFAULT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                INDEX idx_user (user_id),
+                FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+            )
+        """)
+
+        # In-app notifications (saved-search matches, wishlist price / ending-soon
+        # alerts), newest first per user
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS notifications (
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                user_id INT NOT NULL,
+                type VARCHAR(50) NOT NULL,
+                title VARCHAR(255) NOT NULL,
+                message VARCHAR(1000) DEFAULT NULL,
+                product_id INT DEFAULT NULL,
+                saved_search_id INT DEFAULT NULL,
+                is_read BOOLEAN DEFAULT FALSE,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                INDEX idx_user_read (user_id, is_read, id),
+                INDEX idx_product_type (product_id, type, user_id),
+                UNIQUE KEY uniq_search_product (saved_search_id, product_id),
+                FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+                FOREIGN KEY (product_id) REFERENCES products(id) ON DELETE CASCADE,
+                FOREIGN KEY (saved_search_id) REFERENCES saved_searches(id) ON DELETE CASCADE
+            )
+        """)
+
+        # Wishlist alerts look notifications up per product and type
+        try:
+            cursor.execute("ALTER TABLE notifications ADD INDEX idx_product_type (product_id, type, user_id)")
+        except Exception:
+            pass  # Index already exists
 
 
         # Subscription plans table
@@ -330,6 +508,30 @@ class Database:
                 ('Enterprise', 4999, '365 Days', '365 Days', '["Everything in Pro","Unlimited bids","Analytics dashboard","24/7 priority support","API access"]', FALSE, 3)
             """)
 
+        # Dashboard rollup — single row (id = 1) kept current by the write
+        # paths; see app/utils/platform_stats.py. Created empty here, the first
+        # dashboard read reconciles it from the base tables.
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS platform_stats (
+                id TINYINT UNSIGNED PRIMARY KEY,
+                total_users INT NOT NULL DEFAULT 0,
+                total_offices INT NOT NULL DEFAULT 0,
+                pending_offices INT NOT NULL DEFAULT 0,
+                live_auctions INT NOT NULL DEFAULT 0,
+                pending_auctions INT NOT NULL DEFAULT 0,
+                closed_auctions INT NOT NULL DEFAULT 0,
+                total_products INT NOT NULL DEFAULT 0,
+                two_wheeler INT NOT NULL DEFAULT 0,
+                three_wheeler INT NOT NULL DEFAULT 0,
+                four_wheeler INT NOT NULL DEFAULT 0,
+                commercial INT NOT NULL DEFAULT 0,
+                total_volume DECIMAL(15, 2) NOT NULL DEFAULT 0,
+                total_auction_value DECIMAL(15, 2) NOT NULL DEFAULT 0,
+                pending_payments INT NOT NULL DEFAULT 0,
+                reconciled_at DATETIME DEFAULT NULL
+            )
+        """)
+
         # Create default admin if not exists
         cursor.execute("SELECT * FROM users WHERE role = 'admin'")
         admin = cursor.fetchone()
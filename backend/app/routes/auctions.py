@@ -1,6 +1,11 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, request, jsonify
 
 from ..utils import login_required, serialize_rows
+from ..utils import facets
+from ..utils.bids import attach_bid_summary, attach_bidder_names, bid_summary, top_bids
+from ..utils.pagination import CursorError, page_params, paginate
+from ..utils.projections import FieldsError, resolve_fields, select_columns
+from ..utils.search import boolean_query, match_expr
 
 auctions_bp = Blueprint("auctions", __name__)
 
@@ -12,73 +17,84 @@ def _get_db():
 
 @auctions_bp.route("/", methods=["GET"])
 def get_auctions():
-    """Get all approved products as auctions (public endpoint)."""
+    """Get all approved products as auctions (public endpoint).
+    ?fields=card|detail|admin or a column list narrows the product columns.
+    ?category= / state / fuel_type / transmission / year / price filter the
+    list (see utils/facets.py); approved listings come with facet counts."""
     status = request.args.get("status", "")
     search = request.args.get("search", "")
-    page = int(request.args.get("page", 1))
-    per_page = int(request.args.get("per_page", 20))
+    try:
+        columns = resolve_fields(request.args.get("fields"))
+        filters = facets.parse_filters(request.args)
+    except (FieldsError, facets.FacetError) as e:
+        return jsonify({"error": str(e)}), 400
 
     conn = _get_db()
     cursor = conn.cursor()
     try:
-        # We select specific columns to avoid 'Duplicate column name' error in subquery
-        # p.* includes 'state', so we can't use p.* if we also select COALESCE(...) as state
-        # Instead, we'll alias the coalesced state or just rely on the fact that we need a unique name for the subquery
-        # But for simplicity, let's just use specific columns if possible, or alias the coalesced one.
-        # However, the frontend expects 'state'.
-        # A better approach for the count query is to NOT include the select list that causes duplicates.
-        # But the count query wraps the *entire* constructed query string.
-
-        # Let's use a CTE or just fix the column alias.
-        # Actually, simpler: distinct alias for the coalesced column, and handle mapping in frontend or just use 'state' from p if available.
-        # But the logic COALESCE(p.state, u.state) implies p.state might be null.
-        # If we alias it to `display_state`, we avoid the collision.
-        query = """
-            SELECT p.*, u.username as office_name,
-                   COALESCE(p.state, u.state) as display_state,
-                   COALESCE(u.location, '') as location,
-                   COALESCE(MAX(b.amount), 0) as current_bid,
-                   COUNT(b.id) as total_bids
-            FROM products p
-            JOIN users u ON p.office_id = u.id
-            LEFT JOIN bids b ON p.id = b.product_id
-            WHERE p.status = 'approved'
-        """
-        params = []
-
+        # COALESCE(p.state, u.state) is exposed as display_state so it doesn't
+        # collide with p.state from p.*
+        product_status = "approved"
+        extra = ""
+        scope = "all"
         if status and status != "approved":
             if status == "live":
-                query += " AND p.is_active = TRUE"
+                extra = " AND p.is_active = TRUE"
+                scope = "live"
             elif status == "closed":
-                query += " AND p.is_active = FALSE"
+                extra = " AND p.is_active = FALSE"
+                scope = "closed"
             elif status != "all" and status != "upcoming":
-                # Override to allow filtering by other statuses if needed
-                query = query.replace("WHERE p.status = 'approved'", "WHERE p.status = %s")
-                params = [status]
+                # Allow filtering by other statuses if needed
+                product_status = status
+        facet_sql, facet_params = facets.filter_sql(filters)
+        extra += facet_sql
 
-        if search:
-            query += " AND (p.name LIKE %s OR p.description LIKE %s)"
-            params.extend([f"%{search}%", f"%{search}%"])
-
-        query += " GROUP BY p.id ORDER BY p.created_at DESC"
-
-        count_query = f"SELECT COUNT(*) as total FROM ({query}) as sub"
-        cursor.execute(count_query, params)
-        total = cursor.fetchone()["total"]
+        from_where = """
+            FROM products p
+            JOIN users u ON p.office_id = u.id
+            WHERE p.status = %s
+        """ + extra
+        params = [product_status] + facet_params
+
+        select = select_columns(columns, required=("id", "created_at")) + """,
+                      u.username as office_name,
+                      COALESCE(p.state, u.state) as display_state,
+                      COALESCE(u.location, '') as location"""
+        order = (("p.created_at", "created_at"), ("p.id", "id"))
+        query = boolean_query(search)
+        if query:
+            # FULLTEXT on products.search_text, best matches first
+            score = match_expr("p.search_text", query)
+            from_where += f" AND {score}"
+            select += f", {score} as relevance"
+            order = ((score, "relevance"), ("p.id", "id"))
+        elif search.strip():
+            # Nothing searchable in the input (symbols, non-Latin script): no matches
+            from_where += " AND 1 = 0"
+
+        page = paginate(
+            cursor,
+            select=select,
+            from_where=from_where,
+            params=params,
+            order=order,
+            **page_params(request.args),
+        )
+        attach_bid_summary(cursor, page.rows, count_key="total_bids")
 
-        offset = (page - 1) * per_page
-        query += " LIMIT %s OFFSET %s"
-        params.extend([per_page, offset])
-        cursor.execute(query, params)
-        auctions = serialize_rows(cursor.fetchall())
+        facet_counts = facet_labels = None
+        if product_status == "approved":
+            facets.index.ensure_fresh(cursor)
+            counted = facets.index.counts(filters, scope)
+            facet_counts, facet_labels = counted["counts"], counted["labels"]
 
         return jsonify({
-            "auctions": auctions,
-            "total": total,
-            "page": page,
-            "per_page": per_page,
-            "pages": (total + per_page - 1) // per_page,
+            "auctions": serialize_rows(page.rows), **page.meta(),
+            "facets": facet_counts, "facet_labels": facet_labels,
         })
+    except CursorError as e:
+        return jsonify({"error": str(e)}), 400
     finally:
         cursor.close()
         conn.close()
@@ -102,20 +118,15 @@ def get_auction(auction_id):
         if not auction:
             return jsonify({"error": "Auction not found"}), 404
 
-        # Get bids
-        cursor.execute(
-            """SELECT b.*, u.username as bidder_name
-               FROM bids b JOIN users u ON b.user_id = u.id
-               WHERE b.product_id = %s ORDER BY b.amount DESC""",
-            (auction_id,),
-        )
-        bids = serialize_rows(cursor.fetchall())
-        current_bid = bids[0]["amount"] if bids else float(auction["starting_price"])
+        # Price and count from the aggregate; only the top bids are returned,
+        # the full history is paged via get_auction_bids
+        summary = bid_summary(cursor, [auction_id]).get(auction_id)
+        bids = serialize_rows(top_bids(cursor, auction_id, current_app.config["DETAIL_TOP_BIDS"]))
 
         from ..utils import serialize_row
         result = serialize_row(auction)
-        result["current_bid"] = current_bid
-        result["total_bids"] = len(bids)
+        result["current_bid"] = summary["current_bid"] if summary else float(auction["starting_price"])
+        result["total_bids"] = summary["bid_count"] if summary else 0
         result["bids"] = bids
         return jsonify(result)
     finally:
@@ -125,18 +136,23 @@ def get_auction(auction_id):
 
 @auctions_bp.route("/<int:auction_id>/bids", methods=["GET"])
 def get_auction_bids(auction_id):
-    """Get bidding history for a specific auction."""
+    """Get bidding history for a specific auction, highest first.
+    Paged by ?page= or by ?after=<next_cursor> (seek on amount, id)."""
     conn = _get_db()
     cursor = conn.cursor()
     try:
-        cursor.execute(
-            """SELECT b.*, u.username as bidder_name
-               FROM bids b JOIN users u ON b.user_id = u.id
-               WHERE b.product_id = %s ORDER BY b.amount DESC""",
-            (auction_id,),
+        page = paginate(
+            cursor,
+            select="b.*",
+            from_where="FROM bids b WHERE b.product_id = %s",
+            params=[auction_id],
+            order=(("b.amount", "amount"), ("b.id", "id")),
+            **page_params(request.args, default_per_page=50),
         )
-        bids = serialize_rows(cursor.fetchall())
-        return jsonify({"bids": bids, "total": len(bids)})
+        attach_bidder_names(cursor, page.rows)
+        return jsonify({"bids": serialize_rows(page.rows), **page.meta()})
+    except CursorError as e:
+        return jsonify({"error": str(e)}), 400
     finally:
         cursor.close()
         conn.close()
@@ -1,7 +1,6 @@
 from flask import Blueprint, request, jsonify
-from werkzeug.security import generate_password_hash, check_password_hash
 
-from ..utils import generate_token, login_required, serialize_row
+from ..utils import generate_token, login_required, office_stats, passwords, platform_stats, role_required, serialize_row
 
 auth_bp = Blueprint("auth", __name__)
 
@@ -27,8 +26,13 @@ def login():
         cursor.execute("SELECT * FROM users WHERE username = %s OR email = %s", (username, username))
         user = cursor.fetchone()
 
-        if not user or not check_password_hash(user["password_hash"], password):
+        matches, new_hash = passwords.verify_password(user["password_hash"], password) if user else (False, None)
+        if not matches:
             return jsonify({"error": "Invalid username or password"}), 401
+        if new_hash:
+            # Stored with outdated hash parameters; upgrade while we have the password
+            cursor.execute("UPDATE users SET password_hash = %s WHERE id = %s", (new_hash, user["id"]))
+            conn.commit()
 
         if user["status"] == "pending":
             return jsonify({"error": "Your account is pending approval"}), 403
@@ -67,7 +71,7 @@ def register():
         return jsonify({"error": "Invalid role"}), 400
 
     status = "active" if role == "user" else "pending"
-    password_hash = generate_password_hash(password)
+    password_hash = passwords.hash_password(password)
 
     conn = _get_db()
     cursor = conn.cursor()
@@ -77,6 +81,7 @@ def register():
                VALUES (%s, %s, %s, %s, %s, %s, %s, %s)""",
             (username, email, mobile_number, finance_name, owner_name, password_hash, role, status),
         )
+        platform_stats.bump(cursor, **platform_stats.user_deltas(None, {"role": role, "status": status}))
         conn.commit()
 
         if role == "office":
@@ -141,21 +146,10 @@ def get_profile():
             stats["recent_bids"] = serialize_rows(cursor.fetchall())
 
         elif user["role"] == "office":
-            cursor.execute(
-                "SELECT COUNT(*) as product_count FROM products WHERE office_id = %s",
-                (user["id"],),
-            )
-            stats["product_count"] = cursor.fetchone()["product_count"] or 0
-
-            cursor.execute(
-                """SELECT COUNT(*) as total_bids, COALESCE(SUM(b.amount), 0) as bid_volume
-                   FROM bids b JOIN products p ON b.product_id = p.id
-                   WHERE p.office_id = %s""",
-                (user["id"],),
-            )
-            bid_stats = cursor.fetchone()
-            stats["total_bids"] = bid_stats["total_bids"] or 0
-            stats["bid_volume"] = float(bid_stats["bid_volume"] or 0)
+            office = office_stats.get_office_stats(cursor, user["id"])
+            stats["product_count"] = office["total_products"]
+            stats["total_bids"] = office["total_bids"]
+            stats["bid_volume"] = office["total_volume"]
 
         return jsonify({"user": user_data, "stats": stats})
     finally:
@@ -188,11 +182,11 @@ def update_profile():
         current_password = data.get("current_password")
         new_password = data.get("new_password")
         if current_password and new_password:
-            if not check_password_hash(user["password_hash"], current_password):
+            if not passwords.verify_password(user["password_hash"], current_password)[0]:
                 return jsonify({"error": "Current password is incorrect"}), 400
             cursor.execute(
                 "UPDATE users SET password_hash = %s WHERE id = %s",
-                (generate_password_hash(new_password), user["id"]),
+                (passwords.hash_password(new_password), user["id"]),
             )
 
         conn.commit()
@@ -200,3 +194,10 @@ def update_profile():
     finally:
         cursor.close()
         conn.close()
+
+
+@auth_bp.route("/password-hash/stats", methods=["GET"])
+@role_required("admin")
+def password_hash_stats():
+    """Admin-only: password hashing slots, queue depth and wait / hash times."""
+    return jsonify(passwords.stats()), 200
@@ -1,6 +1,6 @@
 from flask import Blueprint, jsonify, request
 
-from ..utils import role_required, serialize_rows
+from ..utils import office_stats, platform_stats, role_required, serialize_rows
 
 dashboard_bp = Blueprint("dashboard", __name__)
 
@@ -17,62 +17,12 @@ def get_stats():
     conn = _get_db()
     cursor = conn.cursor()
     try:
-        # Total users
-        cursor.execute("SELECT COUNT(*) as count FROM users WHERE role = 'user'")
-        total_users = cursor.fetchone()["count"]
-
-        # Total offices
-        cursor.execute("SELECT COUNT(*) as count FROM users WHERE role = 'office' AND status = 'active'")
-        total_offices = cursor.fetchone()["count"]
-
-        # Products by status
-        cursor.execute("SELECT COUNT(*) as count FROM products WHERE status = 'approved'")
-        live_auctions = cursor.fetchone()["count"]
-
-        cursor.execute("SELECT COUNT(*) as count FROM products WHERE status = 'pending'")
-        pending_auctions = cursor.fetchone()["count"]
-
-        cursor.execute("SELECT COUNT(*) as count FROM products WHERE status = 'rejected'")
-        closed_auctions = cursor.fetchone()["count"]
-
-        cursor.execute("SELECT COUNT(*) as count FROM products")
-        total_products = cursor.fetchone()["count"]
-
-        # Total bid volume
-        cursor.execute("SELECT COALESCE(SUM(amount), 0) as total FROM bids")
-        total_volume = float(cursor.fetchone()["total"])
-
-        # Total auction value
-        cursor.execute("""
-            SELECT COALESCE(SUM(
-                CASE WHEN max_bid.current_bid IS NOT NULL THEN max_bid.current_bid
-                     ELSE p.starting_price END
-            ), 0) as total_value
-            FROM products p
-            LEFT JOIN (
-                SELECT product_id, MAX(amount) as current_bid FROM bids GROUP BY product_id
-            ) max_bid ON p.id = max_bid.product_id
-            WHERE p.status = 'approved'
-        """)
-        total_auction_value = float(cursor.fetchone()["total_value"])
-
-        # Vehicle type counts
-        cursor.execute("""
-            SELECT
-                COUNT(CASE WHEN name LIKE '%%car%%' OR name LIKE '%%suv%%' OR name LIKE '%%sedan%%' THEN 1 END) as four_wheeler,
-                COUNT(CASE WHEN name LIKE '%%auto%%' OR name LIKE '%%rickshaw%%' THEN 1 END) as three_wheeler,
-                COUNT(CASE WHEN name LIKE '%%bike%%' OR name LIKE '%%motorcycle%%' OR name LIKE '%%scooter%%' THEN 1 END) as two_wheeler
-            FROM products WHERE status = 'approved'
-        """)
-        vehicle_counts = cursor.fetchone()
-
-        # Pending approvals
-        cursor.execute("SELECT COUNT(*) as count FROM users WHERE role = 'office' AND status = 'pending'")
-        pending_offices = cursor.fetchone()["count"]
-
-        # Pending payments
-        cursor.execute("SELECT COUNT(*) as count FROM transactions WHERE payment_status = 'verifying'")
-        pending_payments = cursor.fetchone()["count"]
+        # Counters come from the platform_stats rollup (one row, kept current
+        # by the write paths and periodically reconciled)
+        row = platform_stats.read(cursor)
+        stats = {}
+        for key in platform_stats.COUNTERS:
+            stats[key] = float(row[key]) if key in ("total_volume", "total_auction_value") else int(row[key])
 
         # Recent activity
         cursor.execute("""
@@ -85,21 +35,7 @@ def get_stats():
         recent_activity = serialize_rows(cursor.fetchall())
 
         return jsonify({
-            "stats": {
-                "total_users": total_users,
-                "total_offices": total_offices,
-                "live_auctions": live_auctions,
-                "pending_auctions": pending_auctions,
-                "closed_auctions": closed_auctions,
-                "total_products": total_products,
-                "total_volume": total_volume,
-                "total_auction_value": total_auction_value,
-                "two_wheeler": vehicle_counts["two_wheeler"],
-                "three_wheeler": vehicle_counts["three_wheeler"],
-                "four_wheeler": vehicle_counts["four_wheeler"],
-                "pending_offices": pending_offices,
-                "pending_payments": pending_payments,
-            },
+            "stats": stats,
             "recent_activity": recent_activity,
         })
     finally:
@@ -183,38 +119,7 @@ def get_office_stats():
     conn = _get_db()
     cursor = conn.cursor()
     try:
-        cursor.execute("SELECT COUNT(*) as count FROM products WHERE office_id = %s", (user_id,))
-        total_products = cursor.fetchone()["count"]
-
-        cursor.execute(
-            "SELECT COUNT(*) as count FROM products WHERE office_id = %s AND status = 'approved'",
-            (user_id,),
-        )
-        approved = cursor.fetchone()["count"]
-
-        cursor.execute(
-            "SELECT COUNT(*) as count FROM products WHERE office_id = %s AND status = 'pending'",
-            (user_id,),
-        )
-        pending = cursor.fetchone()["count"]
-
-        cursor.execute(
-            """SELECT COUNT(b.id) as total_bids, COALESCE(SUM(b.amount), 0) as total_volume
-               FROM bids b JOIN products p ON b.product_id = p.id
-               WHERE p.office_id = %s""",
-            (user_id,),
-        )
-        bid_stats = cursor.fetchone()
-
-        return jsonify({
-            "stats": {
-                "total_products": total_products,
-                "approved_products": approved,
-                "pending_products": pending,
-                "total_bids": bid_stats["total_bids"] or 0,
-                "total_volume": float(bid_stats["total_volume"] or 0),
-            }
-        })
+        return jsonify({"stats": office_stats.get_office_stats(cursor, user_id)})
     finally:
         cursor.close()
         conn.close()
@@ -1,9 +1,16 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, request, jsonify
 import json
-from ..utils import login_required, serialize_rows, serialize_row
+from ..utils import error_groups, error_queue, login_required, platform_stats, saved_searches, serialize_rows, serialize_row
+from ..utils.facets import FacetError
+from ..utils.pagination import CursorError, page_params, paginate
+from ..utils.projections import FieldsError, resolve_fields, select_columns
+from ..utils import wishlist_alerts  # noqa: F401 — connects the bid_placed price alerts
 
 features_bp = Blueprint("features", __name__)
 
+# Product ids one /wishlist/contains request may ask about
+MAX_CONTAINS_IDS = 200
+
 def _get_db():
     from .. import db
     return db.get_db()
@@ -11,21 +18,23 @@ def _get_db():
 @features_bp.route("/wishlist", methods=["GET"])
 @login_required
 def get_wishlist():
+    try:
+        columns = resolve_fields(request.args.get("fields"))
+    except FieldsError as e:
+        return jsonify({"error": str(e)}), 400
+
     conn = _get_db()
     cursor = conn.cursor()
     try:
-        cursor.execute("SELECT items FROM wishlists WHERE user_id = %s", (request.current_user["user_id"],))
-        row = cursor.fetchone()
-        
-        items = json.loads(row["items"]) if row and row["items"] else []
-        
-        if not items:
-            return jsonify({"wishlist": []}), 200
-            
-        format_strings = ','.join(['%s'] * len(items))
-        cursor.execute(f"SELECT * FROM products WHERE id IN ({format_strings})", tuple(items))
+        cursor.execute(f"""
+            SELECT {select_columns(columns)}
+            FROM wishlist_items w
+            JOIN products p ON p.id = w.product_id
+            WHERE w.user_id = %s
+            ORDER BY w.created_at DESC
+        """, (request.current_user["user_id"],))
         products = cursor.fetchall()
-        
+
         return jsonify({"wishlist": serialize_rows(products)}), 200
     finally:
         cursor.close()
@@ -39,33 +48,72 @@ def toggle_wishlist():
     
     if not product_id:
         return jsonify({"error": "Product ID is required"}), 400
+    try:
+        product_id = int(product_id)
+    except (TypeError, ValueError):
+        return jsonify({"error": "Product ID must be a number"}), 400
         
     conn = _get_db()
     cursor = conn.cursor()
     try:
         user_id = request.current_user["user_id"]
-        cursor.execute("SELECT items FROM wishlists WHERE user_id = %s", (user_id,))
-        row = cursor.fetchone()
-        
-        items = json.loads(row["items"]) if row and row["items"] else []
-        product_id = int(product_id)
-        
-        if product_id in items:
-            items.remove(product_id)
+        # Toggle on the primary key: remove if present, otherwise add
+        cursor.execute(
+            "DELETE FROM wishlist_items WHERE user_id = %s AND product_id = %s",
+            (user_id, product_id),
+        )
+        if cursor.rowcount:
+            wishlisted = False
             message = "Removed from wishlist"
         else:
-            items.append(product_id)
+            cursor.execute("SELECT id FROM products WHERE id = %s", (product_id,))
+            if not cursor.fetchone():
+                return jsonify({"error": "Product not found"}), 404
+            cursor.execute(
+                "INSERT IGNORE INTO wishlist_items (user_id, product_id) VALUES (%s, %s)",
+                (user_id, product_id),
+            )
+            wishlisted = True
             message = "Added to wishlist"
-            
-        items_json = json.dumps(items)
-        
-        if row:
-            cursor.execute("UPDATE wishlists SET items = %s WHERE user_id = %s", (items_json, user_id))
-        else:
-            cursor.execute("INSERT INTO wishlists (user_id, items) VALUES (%s, %s)", (user_id, items_json))
-            
+
         conn.commit()
-        return jsonify({"message": message, "wishlist_items": items}), 200
+        return jsonify({"message": message, "product_id": product_id, "wishlisted": wishlisted}), 200
+    finally:
+        cursor.close()
+        conn.close()
+
+@features_bp.route("/wishlist/contains", methods=["GET", "POST"])
+@login_required
+def wishlist_contains():
+    """
+    Which of the given products are in the current user's wishlist — for
+    marking cards on listing pages in one query.
+    GET ?ids=1,2,3 or POST {"ids": [1, 2, 3]} (max MAX_CONTAINS_IDS ids).
+    """
+    if request.method == "POST":
+        ids = (request.get_json() or {}).get("ids") or []
+    else:
+        ids = [v for v in request.args.get("ids", "").split(",") if v.strip()]
+    if not isinstance(ids, list):
+        return jsonify({"error": "ids must be a list"}), 400
+    try:
+        ids = sorted({int(v) for v in ids})
+    except (TypeError, ValueError):
+        return jsonify({"error": "ids must be numbers"}), 400
+    if len(ids) > MAX_CONTAINS_IDS:
+        return jsonify({"error": f"At most {MAX_CONTAINS_IDS} ids per request"}), 400
+    if not ids:
+        return jsonify({"wishlisted": []}), 200
+
+    conn = _get_db()
+    cursor = conn.cursor()
+    try:
+        cursor.execute(
+            f"""SELECT product_id FROM wishlist_items
+                WHERE user_id = %s AND product_id IN ({', '.join(['%s'] * len(ids))})""",
+            [request.current_user["user_id"]] + ids,
+        )
+        return jsonify({"wishlisted": sorted(row["product_id"] for row in cursor.fetchall())}), 200
     finally:
         cursor.close()
         conn.close()
@@ -141,9 +189,262 @@ def get_winnings():
         conn.close()
 
 
+# ─────────────────────────────────────────────────────────────────────────────
+# Saved searches — stored get_auctions filters; new approvals that match them
+# become notifications (see utils/saved_searches.py)
+# ─────────────────────────────────────────────────────────────────────────────
+@features_bp.route("/saved-searches", methods=["GET"])
+@login_required
+def get_saved_searches():
+    conn = _get_db()
+    cursor = conn.cursor()
+    try:
+        cursor.execute(
+            "SELECT * FROM saved_searches WHERE user_id = %s ORDER BY created_at DESC",
+            (request.current_user["user_id"],),
+        )
+        searches = serialize_rows(cursor.fetchall())
+        for search in searches:
+            search["query"] = json.loads(search["query"]) if search["query"] else {}
+        return jsonify({"saved_searches": searches}), 200
+    finally:
+        cursor.close()
+        conn.close()
+
+
+@features_bp.route("/saved-searches", methods=["POST"])
+@login_required
+def create_saved_search():
+    """Body: {name, query: {category, state, fuel_type, transmission, year, price, search}, notify}"""
+    data = request.get_json() or {}
+    name = (data.get("name") or "").strip()[:100]
+    try:
+        query = saved_searches.normalize_query(data.get("query"))
+    except FacetError as e:
+        return jsonify({"error": str(e)}), 400
+    if not name:
+        name = query.get("search") or "Saved search"
+    notify = bool(data.get("notify", True))
+
+    conn = _get_db()
+    cursor = conn.cursor()
+    try:
+        user_id = request.current_user["user_id"]
+        cursor.execute("SELECT COUNT(*) as c FROM saved_searches WHERE user_id = %s", (user_id,))
+        if cursor.fetchone()["c"] >= saved_searches.MAX_PER_USER:
+            return jsonify({"error": f"You can keep up to {saved_searches.MAX_PER_USER} saved searches"}), 400
+        cursor.execute(
+            "INSERT INTO saved_searches (user_id, name, query, notify) VALUES (%s, %s, %s, %s)",
+            (user_id, name, json.dumps(query), notify),
+        )
+        search_id = cursor.lastrowid
+        conn.commit()
+        if notify:
+            saved_searches.percolator.add(search_id, user_id, name, query)
+        return jsonify({"message": "Search saved", "id": search_id, "query": query}), 201
+    finally:
+        cursor.close()
+        conn.close()
+
+
+@features_bp.route("/saved-searches/<int:search_id>", methods=["DELETE"])
+@login_required
+def delete_saved_search(search_id):
+    conn = _get_db()
+    cursor = conn.cursor()
+    try:
+        cursor.execute(
+            "DELETE FROM saved_searches WHERE id = %s AND user_id = %s",
+            (search_id, request.current_user["user_id"]),
+        )
+        deleted = cursor.rowcount
+        conn.commit()
+        if deleted == 0:
+            return jsonify({"error": "Saved search not found"}), 404
+        saved_searches.percolator.remove(search_id)
+        return jsonify({"message": "Saved search deleted"}), 200
+    finally:
+        cursor.close()
+        conn.close()
+
+
+@features_bp.route("/notifications", methods=["GET"])
+@login_required
+def get_notifications():
+    """Newest first. ?unread=1 for unread only; ?after=<id> pages older ones."""
+    try:
+        limit = min(max(int(request.args.get("limit", 20)), 1), 100)
+        after = int(request.args["after"]) if request.args.get("after") else None
+    except ValueError:
+        return jsonify({"error": "limit and after must be numbers"}), 400
+    conn = _get_db()
+    cursor = conn.cursor()
+    try:
+        user_id = request.current_user["user_id"]
+        query = "SELECT * FROM notifications WHERE user_id = %s"
+        params = [user_id]
+        if request.args.get("unread") in ("1", "true"):
+            query += " AND is_read = FALSE"
+        if after is not None:
+            query += " AND id < %s"
+            params.append(after)
+        cursor.execute(query + " ORDER BY id DESC LIMIT %s", params + [limit])
+        notifications = serialize_rows(cursor.fetchall())
+        cursor.execute(
+            "SELECT COUNT(*) as c FROM notifications WHERE user_id = %s AND is_read = FALSE", (user_id,)
+        )
+        unread = cursor.fetchone()["c"]
+        return jsonify({"notifications": notifications, "unread": unread}), 200
+    finally:
+        cursor.close()
+        conn.close()
+
+
+@features_bp.route("/notifications/read", methods=["POST"])
+@login_required
+def mark_notifications_read():
+    """Body: {ids: [...]} marks those read; no ids marks all read."""
+    data = request.get_json() or {}
+    ids = data.get("ids") or []
+    if not isinstance(ids, list):
+        return jsonify({"error": "ids must be a list"}), 400
+    try:
+        ids = [int(i) for i in ids]
+    except (TypeError, ValueError):
+        return jsonify({"error": "ids must be numbers"}), 400
+    conn = _get_db()
+    cursor = conn.cursor()
+    try:
+        user_id = request.current_user["user_id"]
+        if ids:
+            cursor.execute(
+                f"""UPDATE notifications SET is_read = TRUE
+                    WHERE user_id = %s AND id IN ({', '.join(['%s'] * len(ids))})""",
+                [user_id] + ids,
+            )
+        else:
+            cursor.execute("UPDATE notifications SET is_read = TRUE WHERE user_id = %s AND is_read = FALSE", (user_id,))
+        updated = cursor.rowcount
+        conn.commit()
+        return jsonify({"message": "Notifications marked as read", "updated": updated}), 200
+    finally:
+        cursor.close()
+        conn.close()
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # Payment — user submits UPI screenshot + transaction ID
 # ─────────────────────────────────────────────────────────────────────────────
+# Screenshot hashes are split into PHASH_BANDS equal bands, each indexed. Two
+# hashes within PHASH_BANDS - 1 bits of each other must share at least one
+# band exactly, so candidate lookup is a handful of index probes.
+#
+# Receipts from the same UPI app share nearly all of their layout, so only a
+# near-identical image (re-encoded / re-captured) counts as reused on its
+# own; up to PHASH_SAME_UTR_DISTANCE bits also flags it when the submitted
+# UPI transaction id (UTR) is the same.
+PHASH_BITS = 256
+PHASH_BANDS = 8
+PHASH_DUPLICATE_DISTANCE = 2
+PHASH_SAME_UTR_DISTANCE = 6
+
+
+def _phash_bands(value):
+    width = PHASH_BITS // PHASH_BANDS
+    mask = (1 << width) - 1
+    return [(value >> (i * width)) & mask for i in range(PHASH_BANDS)]
+
+
+def _normalize_utr(value):
+    """UTR for comparison: alphanumerics only, uppercased; None when empty."""
+    return "".join(ch for ch in (value or "") if ch.isalnum()).upper() or None
+
+
+def _discard_payment_screenshot(txn_id, raw_path, final_path):
+    """Processing failed: delete the upload and return the transaction to
+    'pending' so the user can submit a new screenshot."""
+    import os
+
+    for path in {raw_path, final_path}:
+        if os.path.exists(path):
+            os.remove(path)
+    conn = _get_db()
+    cursor = conn.cursor()
+    try:
+        # Only if it still points at this upload (not a newer resubmission)
+        cursor.execute(
+            """UPDATE transactions SET payment_status = 'pending', payment_screenshot = NULL
+               WHERE id = %s AND payment_status = 'verifying' AND payment_screenshot = %s""",
+            (txn_id, f"payments/{os.path.basename(raw_path)}"),
+        )
+        if cursor.rowcount:
+            platform_stats.bump(cursor, **platform_stats.payment_deltas("verifying", "pending"))
+        conn.commit()
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def _process_payment_screenshot(txn_id, raw_path, final_path, screenshot_path):
+    """Background task: normalise the raw upload to WebP, index its perceptual
+    hash and flag the transaction if another one already used the same image."""
+    from ..utils.background import run_blocking
+    from ..utils.images import normalize_screenshot
+    import os
+
+    try:
+        phash = run_blocking(normalize_screenshot, raw_path, final_path)
+    except Exception:
+        _discard_payment_screenshot(txn_id, raw_path, final_path)
+        raise
+    if os.path.exists(raw_path) and raw_path != final_path:
+        os.remove(raw_path)
+
+    bands = _phash_bands(phash)
+    phash_hex = format(phash, f"0{PHASH_BITS // 4}x")
+    band_cols = ", ".join(f"band{i}" for i in range(PHASH_BANDS))
+
+    conn = _get_db()
+    cursor = conn.cursor()
+    try:
+        cursor.execute(
+            f"""REPLACE INTO payment_screenshot_hashes (transaction_id, phash, {band_cols})
+                VALUES (%s, %s, {", ".join(["%s"] * PHASH_BANDS)})""",
+            [txn_id, phash_hex] + bands,
+        )
+
+        cursor.execute("SELECT upi_transaction_id FROM transactions WHERE id = %s", (txn_id,))
+        own = cursor.fetchone()
+        utr = _normalize_utr(own["upi_transaction_id"]) if own else None
+
+        band_match = " OR ".join(f"h.band{i} = %s" for i in range(PHASH_BANDS))
+        cursor.execute(
+            f"""SELECT h.transaction_id, h.phash, t.upi_transaction_id
+                FROM payment_screenshot_hashes h
+                LEFT JOIN transactions t ON t.id = h.transaction_id
+                WHERE h.transaction_id != %s AND ({band_match})""",
+            [txn_id] + bands,
+        )
+        duplicate_of, distance = None, None
+        for row in cursor.fetchall():
+            d = bin(int(row["phash"], 16) ^ phash).count("1")
+            same_utr = utr is not None and _normalize_utr(row["upi_transaction_id"]) == utr
+            limit = PHASH_SAME_UTR_DISTANCE if same_utr else PHASH_DUPLICATE_DISTANCE
+            if d <= limit and (distance is None or (d, row["transaction_id"]) < (distance, duplicate_of)):
+                duplicate_of, distance = row["transaction_id"], d
+
+        cursor.execute(
+            """UPDATE transactions
+               SET payment_screenshot = %s, duplicate_of = %s, duplicate_distance = %s
+               WHERE id = %s""",
+            (screenshot_path, duplicate_of, distance, txn_id),
+        )
+        conn.commit()
+    finally:
+        cursor.close()
+        conn.close()
+
+
 @features_bp.route("/transactions/<int:txn_id>/pay", methods=["POST"])
 @login_required
 def submit_payment(txn_id):
@@ -151,6 +452,7 @@ def submit_payment(txn_id):
     from werkzeug.utils import secure_filename
     from PIL import Image
     from flask import current_app
+    from ..utils.background import spawn
 
     user_id = request.current_user["user_id"]
     conn = _get_db()
@@ -170,29 +472,35 @@ def submit_payment(txn_id):
         if not screenshot:
             return jsonify({"error": "Payment screenshot is required"}), 400
 
+        # Header-only check — the full decode + re-encode happens in the background
+        try:
+            with Image.open(screenshot.stream) as probe:
+                ext = "." + (probe.format or "img").lower()
+            screenshot.stream.seek(0)
+        except Exception as e:
+            return jsonify({"error": f"Invalid image file: {str(e)}"}), 400
+
         upload_dir = os.path.join(current_app.config["UPLOAD_FOLDER"], "payments")
         os.makedirs(upload_dir, exist_ok=True)
 
         filename = secure_filename(f"pay_{txn_id}_{user_id}.webp")
         filepath = os.path.join(upload_dir, filename)
+        raw_filename = secure_filename(f"pay_{txn_id}_{user_id}_raw{ext}")
+        raw_path = os.path.join(upload_dir, raw_filename)
+        screenshot.save(raw_path)
 
-        try:
-            img = Image.open(screenshot)
-            if img.mode in ("RGBA", "P"):
-                img = img.convert("RGB")
-            img.save(filepath, "WEBP", quality=80)
-        except Exception as e:
-            return jsonify({"error": f"Invalid image file: {str(e)}"}), 400
-
-        screenshot_path = f"payments/{filename}"
-
+        # Admins can already open the original; the WebP path replaces it once processed
         cursor.execute(
             """UPDATE transactions
-               SET payment_status = 'verifying', payment_screenshot = %s, upi_transaction_id = %s
+               SET payment_status = 'verifying', payment_screenshot = %s, upi_transaction_id = %s,
+                   duplicate_of = NULL, duplicate_distance = NULL
                WHERE id = %s""",
-            (screenshot_path, upi_txn_id, txn_id),
+            (f"payments/{raw_filename}", upi_txn_id, txn_id),
         )
+        platform_stats.bump(cursor, **platform_stats.payment_deltas(txn.get("payment_status"), "verifying"))
         conn.commit()
+
+        spawn(_process_payment_screenshot, txn_id, raw_path, filepath, f"payments/{filename}")
         return jsonify({"message": "Payment submitted for verification", "payment_status": "verifying"}), 200
     finally:
         cursor.close()
@@ -212,14 +520,19 @@ def get_pending_payments():
     cursor = conn.cursor()
     try:
         status_filter = request.args.get("status", "verifying")
+        # duplicate_of / duplicate_distance are filled at submit time by the
+        # screenshot hash index, so flagging reused screenshots costs nothing here
         cursor.execute("""
             SELECT t.*, p.name as product_name, p.image_path as product_image,
                    u.username as winner_name, u.email as winner_email, u.mobile_number as winner_mobile,
-                   o.username as office_name
+                   o.username as office_name,
+                   dt.user_id as duplicate_user_id, du.username as duplicate_username
             FROM transactions t
             JOIN products p ON t.product_id = p.id
             JOIN users u ON t.user_id = u.id
             JOIN users o ON p.office_id = o.id
+            LEFT JOIN transactions dt ON t.duplicate_of = dt.id
+            LEFT JOIN users du ON dt.user_id = du.id
             WHERE t.payment_status = %s
             ORDER BY t.transaction_date DESC
         """, (status_filter,))
@@ -248,14 +561,18 @@ def verify_payment(txn_id):
     cursor = conn.cursor()
     try:
         import datetime
+        cursor.execute("SELECT payment_status FROM transactions WHERE id = %s", (txn_id,))
+        txn = cursor.fetchone()
+        if not txn:
+            return jsonify({"error": "Transaction not found"}), 404
+
         cursor.execute(
             """UPDATE transactions
                SET payment_status = %s, verified_by = %s, verified_at = %s
                WHERE id = %s""",
             (new_status, request.current_user["user_id"], datetime.datetime.utcnow(), txn_id),
         )
-        if cursor.rowcount == 0:
-            return jsonify({"error": "Transaction not found"}), 404
+        platform_stats.bump(cursor, **platform_stats.payment_deltas(txn["payment_status"], new_status))
 
         if new_status == "verified":
             cursor.execute("UPDATE transactions SET status = 'completed' WHERE id = %s", (txn_id,))
@@ -271,7 +588,7 @@ def verify_payment(txn_id):
 def log_error():
     """
     Public endpoint — accepts a rich error payload from the frontend
-    and stores it in the error_logs table.
+    and queues it for the error_logs table (written in batches).
     """
     try:
         data = request.get_json() or {}
@@ -282,6 +599,14 @@ def log_error():
                 val = str(val)[:limit]
             return val
 
+        def _px(key):
+            # SMALLINT column; anything else the client sends is dropped
+            try:
+                val = int(data.get(key))
+            except (TypeError, ValueError, OverflowError):
+                return None
+            return val if 0 <= val <= 32767 else None
+
         # ── Try to resolve user from JWT (optional) ──────────────────────────
         user_id = None
         username = None
@@ -306,86 +631,160 @@ def log_error():
         )
 
         # ── occurred_at: use client-sent ISO timestamp or fallback to now ──────
-        from datetime import datetime as _dt
+        from datetime import datetime as _dt, timezone as _tz
         occurred_at_raw = data.get("occurred_at")
         try:
             occurred_at = _dt.fromisoformat(occurred_at_raw.replace("Z", "+00:00")) if occurred_at_raw else _dt.utcnow()
+            if occurred_at.tzinfo is not None:
+                # DATETIME column: store naive UTC
+                occurred_at = occurred_at.astimezone(_tz.utc).replace(tzinfo=None)
         except Exception:
             occurred_at = _dt.utcnow()
 
-        conn = _get_db()
-        cursor = conn.cursor()
-        try:
-            cursor.execute("""
-                INSERT INTO error_logs (
-                    user_id, username,
-                    error_type, error_message, error_stack, component_name,
-                    page_url, page_title, referrer_url,
-                    device_type, device_model,
-                    os_name, os_version,
-                    browser_name, browser_version, user_agent,
-                    screen_width, screen_height,
-                    viewport_width, viewport_height,
-                    language, timezone,
-                    ip_address, app_version,
-                    occurred_at
-                ) VALUES (
-                    %s, %s,
-                    %s, %s, %s, %s,
-                    %s, %s, %s,
-                    %s, %s,
-                    %s, %s,
-                    %s, %s, %s,
-                    %s, %s,
-                    %s, %s,
-                    %s, %s,
-                    %s, %s,
-                    %s
-                )
-            """, (
-                user_id, username,
-                _s("error_type", 50) or "frontend",
-                _s("error_message", 5000),
-                _s("error_stack", 10000),
-                _s("component_name", 255),
-                _s("page_url", 1000),
-                _s("page_title", 500),
-                _s("referrer_url", 1000),
-                _s("device_type", 50),
-                _s("device_model", 255),
-                _s("os_name", 100),
-                _s("os_version", 100),
-                _s("browser_name", 100),
-                _s("browser_version", 100),
-                _s("user_agent", 5000),
-                data.get("screen_width"),
-                data.get("screen_height"),
-                data.get("viewport_width"),
-                data.get("viewport_height"),
-                _s("language", 20),
-                _s("timezone", 100),
-                ip[:45] if ip else None,
-                _s("app_version", 50),
-                occurred_at,
-            ))
-            conn.commit()
-        finally:
-            cursor.close()
-            conn.close()
-
-        return jsonify({"logged": True}), 200
+        # Queued; a background flusher batches the INSERTs (utils/error_queue.py)
+        accepted = error_queue.queue.put((
+            user_id, username,
+            _s("error_type", 50) or "frontend",
+            _s("error_message", 5000),
+            _s("error_stack", 10000),
+            _s("component_name", 255),
+            _s("page_url", 1000),
+            _s("page_title", 500),
+            _s("referrer_url", 1000),
+            _s("device_type", 50),
+            _s("device_model", 255),
+            _s("os_name", 100),
+            _s("os_version", 100),
+            _s("browser_name", 100),
+            _s("browser_version", 100),
+            _s("user_agent", 5000),
+            _px("screen_width"),
+            _px("screen_height"),
+            _px("viewport_width"),
+            _px("viewport_height"),
+            _s("language", 20),
+            _s("timezone", 100),
+            ip[:45] if ip else None,
+            _s("app_version", 50),
+            occurred_at,
+        ))
+
+        return jsonify({"logged": accepted}), 200
 
     except Exception as e:
         print(f"[error_logs] Failed to log error: {e}")
         return jsonify({"logged": False}), 200  # Always 200 — never break the client
 
 
+@features_bp.route("/log-error/stats", methods=["GET"])
+@login_required
+def get_error_log_stats():
+    """Admin-only: ingestion queue depth and accepted / sampled / dropped / flushed counters."""
+    if request.current_user.get("role") != "admin":
+        return jsonify({"error": "Forbidden"}), 403
+    return jsonify(error_queue.queue.stats()), 200
+
+
+@features_bp.route("/log-error/groups", methods=["GET"])
+@login_required
+def get_error_groups():
+    """
+    Admin-only: aggregated error groups (utils/error_groups.py).
+    Query params: error_type, component, since (last seen at or after),
+    sort (recent | frequent), page / per_page / after.
+    Raw occurrences of a group: GET /log-error?fingerprint=<fingerprint>
+    """
+    if request.current_user.get("role") != "admin":
+        return jsonify({"error": "Forbidden"}), 403
+
+    from_where = "FROM error_groups g WHERE 1=1"
+    params = []
+    if request.args.get("error_type"):
+        from_where += " AND g.error_type = %s"
+        params.append(request.args["error_type"])
+    if request.args.get("component"):
+        from_where += " AND g.component_name = %s"
+        params.append(request.args["component"])
+    if request.args.get("since"):
+        from_where += " AND g.last_seen >= %s"
+        params.append(request.args["since"])
+    if request.args.get("sort") == "frequent":
+        order = (("g.occurrences", "occurrences"), ("g.id", "id"))
+    else:
+        order = (("g.last_seen", "last_seen"), ("g.id", "id"))
+
+    conn = _get_db()
+    cursor = conn.cursor()
+    try:
+        page = paginate(
+            cursor,
+            select="g.*",
+            from_where=from_where,
+            params=params,
+            order=order,
+            **page_params(request.args, default_per_page=50),
+        )
+        for row in page.rows:
+            row["affected_users"] = error_groups.estimate_users(row["affected_users"])
+        return jsonify({"groups": serialize_rows(page.rows), **page.meta()}), 200
+    except CursorError as e:
+        return jsonify({"error": str(e)}), 400
+    finally:
+        cursor.close()
+        conn.close()
+
+
+@features_bp.route("/log-error/daily", methods=["GET"])
+@login_required
+def get_error_log_daily():
+    """
+    Admin-only: daily error counts from the error_log_daily rollup, which
+    outlives raw error_logs retention.
+    Query params: days (default 90, max 730), by (error_type | browser_name | os_name),
+    error_type
+    """
+    if request.current_user.get("role") != "admin":
+        return jsonify({"error": "Forbidden"}), 403
+
+    by = request.args.get("by")
+    if by not in (None, "", "error_type", "browser_name", "os_name"):
+        return jsonify({"error": "by must be one of error_type, browser_name, os_name"}), 400
+    try:
+        days = min(max(int(request.args.get("days", 90)), 1), 730)
+    except ValueError:
+        return jsonify({"error": "days must be a number"}), 400
+
+    where = "WHERE day >= CURDATE() - INTERVAL %s DAY"
+    params = [days - 1]
+    if request.args.get("error_type"):
+        where += " AND error_type = %s"
+        params.append(request.args["error_type"])
+    group = f"day, {by}" if by else "day"
+
+    conn = _get_db()
+    cursor = conn.cursor()
+    try:
+        cursor.execute(f"""
+            SELECT {group}, SUM(occurrences) as occurrences
+            FROM error_log_daily
+            {where}
+            GROUP BY {group}
+            ORDER BY {group}
+        """, params)
+        return jsonify({"days": serialize_rows(cursor.fetchall())}), 200
+    finally:
+        cursor.close()
+        conn.close()
+
+
 @features_bp.route("/log-error", methods=["GET"])
 @login_required
 def get_error_logs():
     """
     Admin-only endpoint to fetch error logs.
-    Query params: error_type, user_id, date_from, date_to, limit (max 500)
+    Query params: error_type, user_id, fingerprint, date_from, date_to, limit (max 500)
+    Without date_from only the last ERROR_LOG_DEFAULT_DAYS days are searched,
+    so the query stays within a few day partitions.
     """
     from ..utils import role_required
     if request.current_user.get("role") != "admin":
@@ -405,9 +804,16 @@ def get_error_logs():
             filters.append("user_id = %s")
             params.append(request.args["user_id"])
 
+        if request.args.get("fingerprint"):
+            filters.append("fingerprint = %s")
+            params.append(request.args["fingerprint"])
+
         if request.args.get("date_from"):
             filters.append("occurred_at >= %s")
             params.append(request.args["date_from"])
+        else:
+            filters.append("occurred_at >= NOW() - INTERVAL %s DAY")
+            params.append(current_app.config["ERROR_LOG_DEFAULT_DAYS"])
 
         if request.args.get("date_to"):
             filters.append("occurred_at <= %s")
@@ -1,5 +1,4 @@
 from flask import Blueprint, request, jsonify
-from werkzeug.security import generate_password_hash
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
@@ -9,6 +8,8 @@ import string
 import uuid
 from datetime import datetime, timedelta
 
+from ..utils import passwords
+
 forgot_password_bp = Blueprint("forgot_password", __name__)
 
 def _get_db():
@@ -193,7 +194,7 @@ def reset_password():
             conn.commit()
             return jsonify({"error": "Session expired. Please request a new OTP."}), 400
 
-        hashed = generate_password_hash(new_password)
+        hashed = passwords.hash_password(new_password)
         cursor.execute("UPDATE users SET password_hash = %s WHERE id = %s", (hashed, reset_entry["user_id"]))
         cursor.execute("DELETE FROM password_resets WHERE user_id = %s", (reset_entry["user_id"],))
         conn.commit()
@@ -1,7 +1,8 @@
 from flask import Blueprint, request, jsonify
-from werkzeug.security import generate_password_hash
 
-from ..utils import login_required, role_required, serialize_row, serialize_rows
+from ..utils import login_required, passwords, platform_stats, role_required, serialize_row, serialize_rows
+from ..utils.pagination import CursorError, page_params, paginate
+from ..utils.search import boolean_query, match_expr
 
 offices_bp = Blueprint("offices", __name__)
 
@@ -16,14 +17,11 @@ def _get_db():
 def get_offices():
     status_filter = request.args.get("status")
     search = request.args.get("search", "")
-    page = int(request.args.get("page", 1))
-    per_page = int(request.args.get("per_page", 20))
 
     conn = _get_db()
     cursor = conn.cursor()
     try:
-        query = """
-            SELECT u.*, COUNT(p.id) as product_count
+        from_where = """
             FROM users u
             LEFT JOIN products p ON u.id = p.office_id
             WHERE u.role = 'office'
@@ -31,31 +29,40 @@ def get_offices():
         params = []
 
         if status_filter:
-            query += " AND u.status = %s"
+            from_where += " AND u.status = %s"
             params.append(status_filter)
-        if search:
-            query += " AND (u.username LIKE %s OR u.finance_name LIKE %s OR u.owner_name LIKE %s)"
-            params.extend([f"%{search}%", f"%{search}%", f"%{search}%"])
-
-        query += " GROUP BY u.id ORDER BY u.created_at DESC"
-
-        count_query = f"SELECT COUNT(*) as total FROM ({query}) as sub"
-        cursor.execute(count_query, params)
-        total = cursor.fetchone()["total"]
-
-        offset = (page - 1) * per_page
-        query += " LIMIT %s OFFSET %s"
-        params.extend([per_page, offset])
-        cursor.execute(query, params)
-        offices = serialize_rows(cursor.fetchall())
+        select = "u.*, COUNT(p.id) as product_count"
+        order = (("u.created_at", "created_at"), ("u.id", "id"))
+        query = boolean_query(search)
+        search = search.strip()
+        # Substring LIKE keeps partial names ("mesh" in "ramesh") and input
+        # FULLTEXT can't tokenize (non-Latin script) matching; the office
+        # list is small enough to scan
+        like = "(u.username LIKE %s OR u.finance_name LIKE %s OR u.owner_name LIKE %s)"
+        if query:
+            # FULLTEXT ft_office_search ranks word matches first
+            score = match_expr("u.username, u.finance_name, u.owner_name", query)
+            from_where += f" AND ({score} OR {like})"
+            params.extend([f"%{search}%"] * 3)
+            select += f", {score} as relevance"
+            order = ((score, "relevance"), ("u.id", "id"))
+        elif search:
+            from_where += f" AND {like}"
+            params.extend([f"%{search}%"] * 3)
+
+        page = paginate(
+            cursor,
+            select=select,
+            from_where=from_where,
+            params=params,
+            group_by="GROUP BY u.id",
+            order=order,
+            **page_params(request.args),
+        )
 
-        return jsonify({
-            "offices": offices,
-            "total": total,
-            "page": page,
-            "per_page": per_page,
-            "pages": (total + per_page - 1) // per_page,
-        })
+        return jsonify({"offices": serialize_rows(page.rows), **page.meta()})
+    except CursorError as e:
+        return jsonify({"error": str(e)}), 400
     finally:
         cursor.close()
         conn.close()
@@ -77,7 +84,7 @@ def create_office():
     if not username or not email or not password:
         return jsonify({"error": "Username, email and password are required"}), 400
 
-    hashed = generate_password_hash(password)
+    hashed = passwords.hash_password(password)
     conn = _get_db()
     cursor = conn.cursor()
     try:
@@ -86,8 +93,10 @@ def create_office():
                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, 'office', 'active')""",
             (username, email, mobile_number, finance_name, owner_name, state, location, hashed),
         )
+        office_id = cursor.lastrowid
+        platform_stats.bump(cursor, **platform_stats.user_deltas(None, {"role": "office", "status": "active"}))
         conn.commit()
-        return jsonify({"message": "Office created successfully", "id": cursor.lastrowid}), 201
+        return jsonify({"message": "Office created successfully", "id": office_id}), 201
     except Exception as e:
         err = str(e)
         if "Duplicate" in err:
@@ -135,9 +144,13 @@ def approve_office(office_id):
     conn = _get_db()
     cursor = conn.cursor()
     try:
+        before = platform_stats.user_snapshot(cursor, office_id)
         cursor.execute("UPDATE users SET status = 'active' WHERE id = %s AND role = 'office'", (office_id,))
+        updated = cursor.rowcount
+        if updated:
+            platform_stats.bump(cursor, **platform_stats.user_deltas(before, dict(before, status="active")))
         conn.commit()
-        if cursor.rowcount == 0:
+        if updated == 0:
             return jsonify({"error": "Office not found"}), 404
         return jsonify({"message": "Office approved successfully"})
     finally:
@@ -151,9 +164,14 @@ def delete_office(office_id):
     conn = _get_db()
     cursor = conn.cursor()
     try:
+        before = platform_stats.user_snapshot(cursor, office_id)
         cursor.execute("DELETE FROM users WHERE id = %s AND role = 'office'", (office_id,))
+        deleted = cursor.rowcount
+        if deleted:
+            # Cascaded products/bids are picked up by the next reconcile
+            platform_stats.bump(cursor, **platform_stats.user_deltas(before, None))
         conn.commit()
-        if cursor.rowcount == 0:
+        if deleted == 0:
             return jsonify({"error": "Office not found"}), 404
         return jsonify({"message": "Office deleted successfully"})
     finally:
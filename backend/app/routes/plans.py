@@ -1,6 +1,7 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 import json
 
+from ..signals import plan_changed
 from ..utils import login_required, role_required, serialize_row, serialize_rows
 
 plans_bp = Blueprint("plans", __name__)
@@ -80,6 +81,7 @@ def create_plan():
             (name, price, duration, period, features_json, popular, sort_order),
         )
         conn.commit()
+        plan_changed.send(current_app._get_current_object(), plan_id=cursor.lastrowid)
         return jsonify({"message": "Plan created successfully", "id": cursor.lastrowid}), 201
     finally:
         cursor.close()
@@ -124,6 +126,7 @@ def update_plan(plan_id):
             (name, price, duration, period, features_json, popular, is_active, sort_order, plan_id),
         )
         conn.commit()
+        plan_changed.send(current_app._get_current_object(), plan_id=plan_id)
         return jsonify({"message": "Plan updated successfully"})
     finally:
         cursor.close()
@@ -141,6 +144,7 @@ def delete_plan(plan_id):
         conn.commit()
         if cursor.rowcount == 0:
             return jsonify({"error": "Plan not found"}), 404
+        plan_changed.send(current_app._get_current_object(), plan_id=plan_id)
         return jsonify({"message": "Plan deleted successfully"})
     finally:
         cursor.close()
@@ -1,25 +1,59 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 import json
 
-from ..utils import serialize_rows
+from ..signals import bid_placed, plan_changed, product_changed
+from ..utils import serialize_rows, suggest
+from ..utils.cache import ResponseCache
+from ..utils.projections import FieldsError, resolve_fields, select_columns
 
 public_bp = Blueprint("public", __name__)
 
+# Shared landing-page response; TTLs come from HOME_CACHE_TTL / HOME_CACHE_STALE_TTL
+_home_cache = ResponseCache()
+
 
 def _get_db():
     from .. import db
     return db.get_db()
 
 
+@product_changed.connect
+@bid_placed.connect
+@plan_changed.connect
+def _invalidate_home_cache(sender, **extra):
+    _home_cache.invalidate()
+
+
 @public_bp.route("/home", methods=["GET"])
 def home_data():
-    """Public homepage data — stats, live auctions for the landing page."""
+    """Public homepage data — stats, live auctions for the landing page.
+    Served from a stale-while-revalidate cache; one recompute per expiry."""
+    _home_cache.configure(
+        ttl=current_app.config["HOME_CACHE_TTL"],
+        stale_ttl=current_app.config["HOME_CACHE_STALE_TTL"],
+    )
+    # Named projections only, so the cache holds at most one body per projection
+    fields = request.args.get("fields", "")
+    try:
+        columns = resolve_fields(fields, named_only=True)
+    except FieldsError as e:
+        return jsonify({"error": str(e)}), 400
+    # Key on the resolved projection, not the raw arg (" card" == "card")
+    body, state = _home_cache.get(f"home:{fields.strip() or 'all'}", lambda: _build_home_payload(columns))
+    resp = current_app.response_class(body, mimetype="application/json")
+    resp.headers["X-Cache"] = state
+    return resp
+
+
+def _build_home_payload(columns=None):
+    """Run the landing-page queries and return the encoded JSON body.
+    `columns` narrows the product columns (None = all)."""
     conn = _get_db()
     cursor = conn.cursor()
     try:
         # Approved products with bids
-        cursor.execute("""
-            SELECT p.*,
+        cursor.execute(f"""
+            SELECT {select_columns(columns)},
                    u.username as office_name,
                    COALESCE(p.state, u.state) as state,
                    COALESCE(u.location, '') as location,
@@ -50,42 +84,13 @@ def home_data():
         cursor.execute("SELECT COUNT(*) as c FROM products WHERE status = 'rejected'")
         closed_auctions = cursor.fetchone()["c"]
 
-        # Vehicle-type counts (category column first, then broad name-matching fallback)
+        # Vehicle-type counts (category is set on write by utils.vehicle_category)
         cursor.execute("""
-            SELECT
-                COUNT(CASE WHEN category = '4W' OR (category IS NULL AND (
-                    name LIKE '%%car%%' OR name LIKE '%%suv%%' OR name LIKE '%%sedan%%'
-                    OR name LIKE '%%hatchback%%' OR name LIKE '%%jeep%%' OR name LIKE '%%innova%%'
-                    OR name LIKE '%%swift%%' OR name LIKE '%%fortuner%%' OR name LIKE '%%creta%%'
-                    OR name LIKE '%%nexon%%' OR name LIKE '%%brezza%%' OR name LIKE '%%ertiga%%'
-                    OR name LIKE '%%wagon%%' OR name LIKE '%%alto%%' OR name LIKE '%%i20%%'
-                    OR name LIKE '%%i10%%' OR name LIKE '%%dzire%%' OR name LIKE '%%verna%%'
-                    OR name LIKE '%%city%%' OR name LIKE '%%polo%%' OR name LIKE '%%baleno%%'
-                )) THEN 1 END) as four_wheeler,
-                COUNT(CASE WHEN category = '3W' OR (category IS NULL AND (
-                    name LIKE '%%auto%%' OR name LIKE '%%rickshaw%%'
-                    OR name LIKE '%%three%%wheeler%%' OR name LIKE '%%3 wheeler%%'
-                    OR name LIKE '%%ape%%' OR name LIKE '%%tuk%%'
-                )) THEN 1 END) as three_wheeler,
-                COUNT(CASE WHEN category = '2W' OR (category IS NULL AND (
-                    name LIKE '%%bike%%' OR name LIKE '%%motorcycle%%' OR name LIKE '%%scooter%%'
-                    OR name LIKE '%%bullet%%' OR name LIKE '%%activa%%' OR name LIKE '%%pulsar%%'
-                    OR name LIKE '%%splendor%%' OR name LIKE '%%royal enfield%%'
-                    OR name LIKE '%%yamaha%%' OR name LIKE '%%tvs%%' OR name LIKE '%%bajaj%%'
-                    OR name LIKE '%%hero%%' OR name LIKE '%%ktm%%' OR name LIKE '%%duke%%'
-                    OR name LIKE '%%honda%%cb%%' OR name LIKE '%%honda%%shine%%'
-                    OR name LIKE '%%access%%' OR name LIKE '%%jupiter%%'
-                )) THEN 1 END) as two_wheeler,
-                COUNT(CASE WHEN category = 'Commercial' OR (category IS NULL AND (
-                    name LIKE '%%truck%%' OR name LIKE '%%bus%%' OR name LIKE '%%tempo%%'
-                    OR name LIKE '%%van%%' OR name LIKE '%%lorry%%' OR name LIKE '%%tractor%%'
-                    OR name LIKE '%%tipper%%' OR name LIKE '%%commercial%%'
-                    OR name LIKE '%%bolero%%pickup%%' OR name LIKE '%%dost%%'
-                    OR name LIKE '%%eicher%%' OR name LIKE '%%tata ace%%'
-                )) THEN 1 END) as commercial
-            FROM products WHERE status = 'approved'
+            SELECT category, COUNT(*) as c FROM products
+            WHERE status = 'approved' AND category IS NOT NULL
+            GROUP BY category
         """)
-        vc = cursor.fetchone()
+        vc = {r["category"]: r["c"] for r in cursor.fetchall()}
 
         # Total auction value
         cursor.execute("""
@@ -122,17 +127,17 @@ def home_data():
         except Exception:
             plans = []
 
-        return jsonify({
+        return current_app.json.dumps({
             "products": products,
             "stats": {
                 "total_users": total_users,
                 "live_auctions": live_auctions,
                 "pending_auctions": pending_auctions,
                 "closed_auctions": closed_auctions,
-                "two_wheeler": vc["two_wheeler"],
-                "three_wheeler": vc["three_wheeler"],
-                "four_wheeler": vc["four_wheeler"],
-                "commercial": vc["commercial"],
+                "two_wheeler": vc.get("2W", 0),
+                "three_wheeler": vc.get("3W", 0),
+                "four_wheeler": vc.get("4W", 0),
+                "commercial": vc.get("Commercial", 0),
                 "total_auction_value": total_auction_value,
             },
             "recent_activity": recent_activity,
@@ -143,6 +148,35 @@ def home_data():
         conn.close()
 
 
+@public_bp.route("/suggest", methods=["GET"])
+def suggest_terms():
+    """Typeahead for the public search box: ?q=<prefix>&limit=8 (max 20).
+    Served from the in-memory prefix index; MySQL is only touched to build
+    it or apply pending product changes."""
+    q = request.args.get("q", "")
+    try:
+        limit = min(max(int(request.args.get("limit", 8)), 1), 20)
+    except ValueError:
+        return jsonify({"error": "limit must be a number"}), 400
+
+    conn = cursor = None
+
+    def get_cursor():
+        nonlocal conn, cursor
+        if cursor is None:
+            conn = _get_db()
+            cursor = conn.cursor()
+        return cursor
+
+    try:
+        suggest.index.ensure_fresh(get_cursor)
+    finally:
+        if cursor is not None:
+            cursor.close()
+            conn.close()
+    return jsonify({"suggestions": suggest.index.suggest(q, limit)})
+
+
 @public_bp.route("/contact", methods=["POST"])
 def submit_contact():
     """Save contact form submission."""
@@ -1,6 +1,7 @@
 from flask import Blueprint, request, jsonify
 
-from ..utils import role_required, login_required, serialize_row, serialize_rows
+from ..utils import role_required, login_required, platform_stats, serialize_row, serialize_rows
+from ..utils.pagination import CursorError, page_params, paginate
 
 users_bp = Blueprint("users", __name__)
 
@@ -13,58 +14,69 @@ def _get_db():
 @users_bp.route("/", methods=["GET"])
 @role_required("admin")
 def get_users():
+    """Admin user list with per-user product / bid counters.
+
+    The page of users is selected first and the counters are aggregated for
+    just those ids, so products and bids are never joined against each other
+    (which multiplied rows and inflated the sums).
+    """
     role_filter = request.args.get("role")
     status_filter = request.args.get("status")
     search = request.args.get("search", "")
-    page = int(request.args.get("page", 1))
-    per_page = int(request.args.get("per_page", 20))
 
     conn = _get_db()
     cursor = conn.cursor()
     try:
-        query = """
-            SELECT u.*,
-                   COUNT(DISTINCT p.id) as product_count,
-                   COUNT(DISTINCT b.id) as bid_count,
-                   COALESCE(SUM(b.amount), 0) as total_bids
-            FROM users u
-            LEFT JOIN products p ON u.id = p.office_id
-            LEFT JOIN bids b ON u.id = b.user_id
-            WHERE 1=1
-        """
+        from_where = "FROM users u WHERE 1=1"
         params = []
 
         if role_filter:
-            query += " AND u.role = %s"
+            from_where += " AND u.role = %s"
             params.append(role_filter)
         if status_filter:
-            query += " AND u.status = %s"
+            from_where += " AND u.status = %s"
             params.append(status_filter)
         if search:
-            query += " AND (u.username LIKE %s OR u.email LIKE %s)"
+            from_where += " AND (u.username LIKE %s OR u.email LIKE %s)"
             params.extend([f"%{search}%", f"%{search}%"])
 
-        query += " GROUP BY u.id ORDER BY u.created_at DESC"
-
-        # Count query
-        count_query = f"SELECT COUNT(*) as total FROM ({query}) as sub"
-        cursor.execute(count_query, params)
-        total = cursor.fetchone()["total"]
-
-        # Paginate
-        offset = (page - 1) * per_page
-        query += " LIMIT %s OFFSET %s"
-        params.extend([per_page, offset])
-        cursor.execute(query, params)
-        users = serialize_rows(cursor.fetchall())
-
-        return jsonify({
-            "users": users,
-            "total": total,
-            "page": page,
-            "per_page": per_page,
-            "pages": (total + per_page - 1) // per_page,
-        })
+        page = paginate(
+            cursor,
+            select="u.*",
+            from_where=from_where,
+            params=params,
+            order=(("u.created_at", "created_at"), ("u.id", "id")),
+            **page_params(request.args),
+        )
+        rows = page.rows
+
+        # Counters for this page only
+        ids = [row["id"] for row in rows]
+        product_counts, bid_stats = {}, {}
+        if ids:
+            placeholders = ", ".join(["%s"] * len(ids))
+            cursor.execute(
+                f"""SELECT office_id, COUNT(*) as product_count FROM products
+                    WHERE office_id IN ({placeholders}) GROUP BY office_id""",
+                ids,
+            )
+            product_counts = {r["office_id"]: r["product_count"] for r in cursor.fetchall()}
+            cursor.execute(
+                f"""SELECT user_id, COUNT(*) as bid_count, SUM(amount) as total_bids FROM bids
+                    WHERE user_id IN ({placeholders}) GROUP BY user_id""",
+                ids,
+            )
+            bid_stats = {r["user_id"]: r for r in cursor.fetchall()}
+
+        for row in rows:
+            bids = bid_stats.get(row["id"])
+            row["product_count"] = product_counts.get(row["id"], 0)
+            row["bid_count"] = bids["bid_count"] if bids else 0
+            row["total_bids"] = float(bids["total_bids"]) if bids else 0.0
+
+        return jsonify({"users": serialize_rows(rows), **page.meta()})
+    except CursorError as e:
+        return jsonify({"error": str(e)}), 400
     finally:
         cursor.close()
         conn.close()
@@ -102,9 +114,13 @@ def block_user(user_id):
     conn = _get_db()
     cursor = conn.cursor()
     try:
+        before = platform_stats.user_snapshot(cursor, user_id)
         cursor.execute("UPDATE users SET status = 'blocked' WHERE id = %s AND role != 'admin'", (user_id,))
+        updated = cursor.rowcount
+        if updated:
+            platform_stats.bump(cursor, **platform_stats.user_deltas(before, dict(before, status="blocked")))
         conn.commit()
-        if cursor.rowcount == 0:
+        if updated == 0:
             return jsonify({"error": "User not found or is admin"}), 404
         return jsonify({"message": "User blocked successfully"})
     finally:
@@ -118,9 +134,13 @@ def unblock_user(user_id):
     conn = _get_db()
     cursor = conn.cursor()
     try:
+        before = platform_stats.user_snapshot(cursor, user_id)
         cursor.execute("UPDATE users SET status = 'active' WHERE id = %s", (user_id,))
+        updated = cursor.rowcount
+        if updated:
+            platform_stats.bump(cursor, **platform_stats.user_deltas(before, dict(before, status="active")))
         conn.commit()
-        if cursor.rowcount == 0:
+        if updated == 0:
             return jsonify({"error": "User not found"}), 404
         return jsonify({"message": "User unblocked successfully"})
     finally:
@@ -134,9 +154,14 @@ def delete_user(user_id):
     conn = _get_db()
     cursor = conn.cursor()
     try:
+        before = platform_stats.user_snapshot(cursor, user_id)
         cursor.execute("DELETE FROM users WHERE id = %s AND role != 'admin'", (user_id,))
+        deleted = cursor.rowcount
+        if deleted:
+            # Cascaded products/bids are picked up by the next reconcile
+            platform_stats.bump(cursor, **platform_stats.user_deltas(before, None))
         conn.commit()
-        if cursor.rowcount == 0:
+        if deleted == 0:
             return jsonify({"error": "User not found or is admin"}), 404
         return jsonify({"message": "User deleted successfully"})
     finally:
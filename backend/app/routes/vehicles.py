@@ -3,9 +3,16 @@ import time
 import json
 from flask import Blueprint, request, jsonify, current_app, send_from_directory
 from werkzeug.utils import secure_filename
-from PIL import Image
 
+from ..signals import bid_placed, product_changed
 from ..utils import login_required, role_required, allowed_file, serialize_row, serialize_rows
+from ..utils import chunked_upload, platform_stats, saved_searches
+from ..utils.vehicle_category import resolve_category
+from ..utils.images import CONVERTIBLE_EXTENSIONS, build_image_meta, convert_to_webp, parse_image_paths
+from ..utils.bids import attach_bid_summary, bid_summary, top_bids
+from ..utils.pagination import CursorError, page_params, paginate
+from ..utils.projections import FieldsError, resolve_fields, select_columns
+from ..utils.search import boolean_query, build_search_text, match_expr
 
 vehicles_bp = Blueprint("vehicles", __name__)
 
@@ -17,21 +24,14 @@ def _get_db():
 
 def _convert_to_webp(file_path):
     """Convert an image file to WebP format for smaller file size.
+    Large camera JPEGs take the fast draft-decode path, capped at IMAGE_MAX_EDGE.
     Returns the new file path (with .webp extension)."""
     try:
-        img = Image.open(file_path)
-        # Convert RGBA to RGB if needed (WebP supports RGBA but some modes cause issues)
-        if img.mode in ('RGBA', 'LA', 'P'):
-            img = img.convert('RGBA')
-        else:
-            img = img.convert('RGB')
-        webp_path = os.path.splitext(file_path)[0] + '.webp'
-        img.save(webp_path, 'WEBP', quality=85, optimize=True)
-        img.close()
-        # Remove the original file if conversion succeeded and it's a different file
-        if webp_path != file_path and os.path.exists(webp_path):
-            os.remove(file_path)
-        return webp_path
+        return convert_to_webp(
+            file_path,
+            quality=current_app.config.get("WEBP_QUALITY", 85),
+            max_edge=current_app.config.get("IMAGE_MAX_EDGE") or None,
+        )
     except Exception as e:
         current_app.logger.warning(f"WebP conversion failed for {file_path}: {e}")
         return file_path  # Return original if conversion fails
@@ -42,56 +42,55 @@ def _convert_to_webp(file_path):
 def get_vehicles():
     status_filter = request.args.get("status")
     search = request.args.get("search", "")
-    page = int(request.args.get("page", 1))
-    per_page = int(request.args.get("per_page", 20))
+    try:
+        columns = resolve_fields(request.args.get("fields"))
+    except FieldsError as e:
+        return jsonify({"error": str(e)}), 400
 
     conn = _get_db()
     cursor = conn.cursor()
     try:
-        query = """
-            SELECT p.*, u.username as office_name,
-                   COALESCE(MAX(b.amount), 0) as current_bid,
-                   COUNT(b.id) as bid_count
+        from_where = """
             FROM products p
             JOIN users u ON p.office_id = u.id
-            LEFT JOIN bids b ON p.id = b.product_id
             WHERE 1=1
         """
         params = []
 
         # Office users can only see their own products
         if request.current_user.get("role") == "office":
-            query += " AND p.office_id = %s"
+            from_where += " AND p.office_id = %s"
             params.append(request.current_user["user_id"])
 
         if status_filter:
-            query += " AND p.status = %s"
+            from_where += " AND p.status = %s"
             params.append(status_filter)
-        if search:
-            query += " AND (p.name LIKE %s OR p.description LIKE %s)"
-            params.extend([f"%{search}%", f"%{search}%"])
-
-        query += " GROUP BY p.id ORDER BY p.created_at DESC"
-
-        # Count
-        count_query = f"SELECT COUNT(*) as total FROM ({query}) as sub"
-        cursor.execute(count_query, params)
-        total = cursor.fetchone()["total"]
-
-        # Paginate
-        offset = (page - 1) * per_page
-        query += " LIMIT %s OFFSET %s"
-        params.extend([per_page, offset])
-        cursor.execute(query, params)
-        vehicles = serialize_rows(cursor.fetchall())
-
-        return jsonify({
-            "vehicles": vehicles,
-            "total": total,
-            "page": page,
-            "per_page": per_page,
-            "pages": (total + per_page - 1) // per_page,
-        })
+        select = select_columns(columns, required=("id", "created_at")) + ", u.username as office_name"
+        order = (("p.created_at", "created_at"), ("p.id", "id"))
+        query = boolean_query(search)
+        if query:
+            # FULLTEXT on products.search_text, best matches first
+            score = match_expr("p.search_text", query)
+            from_where += f" AND {score}"
+            select += f", {score} as relevance"
+            order = ((score, "relevance"), ("p.id", "id"))
+        elif search.strip():
+            # Nothing searchable in the input (symbols, non-Latin script): no matches
+            from_where += " AND 1 = 0"
+
+        page = paginate(
+            cursor,
+            select=select,
+            from_where=from_where,
+            params=params,
+            order=order,
+            **page_params(request.args),
+        )
+        attach_bid_summary(cursor, page.rows)
+
+        return jsonify({"vehicles": serialize_rows(page.rows), **page.meta()})
+    except CursorError as e:
+        return jsonify({"error": str(e)}), 400
     finally:
         cursor.close()
         conn.close()
@@ -112,21 +111,14 @@ def get_vehicle(vehicle_id):
         if not vehicle:
             return jsonify({"error": "Vehicle not found"}), 404
 
-        # Get bids
-        cursor.execute(
-            """SELECT b.*, u.username as bidder_name
-               FROM bids b JOIN users u ON b.user_id = u.id
-               WHERE b.product_id = %s ORDER BY b.amount DESC""",
-            (vehicle_id,),
-        )
-        bids = serialize_rows(cursor.fetchall())
-
-        # Current highest bid
-        current_bid = bids[0]["amount"] if bids else float(vehicle["starting_price"])
+        # Price and count from the aggregate; only the top bids are returned,
+        # the full history is paged via GET /api/auctions/<id>/bids
+        summary = bid_summary(cursor, [vehicle_id]).get(vehicle_id)
+        bids = serialize_rows(top_bids(cursor, vehicle_id, current_app.config["DETAIL_TOP_BIDS"]))
 
         vehicle_data = serialize_row(vehicle)
-        vehicle_data["current_bid"] = current_bid
-        vehicle_data["bid_count"] = len(bids)
+        vehicle_data["current_bid"] = summary["current_bid"] if summary else float(vehicle["starting_price"])
+        vehicle_data["bid_count"] = summary["bid_count"] if summary else 0
 
         return jsonify({"vehicle": vehicle_data, "bids": bids})
     finally:
@@ -134,21 +126,9 @@ def get_vehicle(vehicle_id):
         conn.close()
 
 
-@vehicles_bp.route("/upload-image", methods=["POST"])
-@role_required("office", "admin")
-def upload_single_image():
-    """Upload a single image and return its path.
-    Used by the frontend to upload images one-by-one before form submission."""
-    category = request.form.get("category", "").strip() or "uncategorized"
-    image_type = request.form.get("type", "vehicle")  # vehicle | rc | insurance
-    file = request.files.get("image")
-
-    if not file or not file.filename:
-        return jsonify({"error": "No image provided"}), 400
-    if not allowed_file(file.filename):
-        return jsonify({"error": "File type not allowed"}), 400
-
-    office_id = request.current_user["user_id"]
+def _officer_upload_folder(office_id, category):
+    """Resolve uploads/{officer_mobile}/{category}/ for an office, creating it.
+    Returns (upload_subfolder, upload_path)."""
     conn = _get_db()
     cursor = conn.cursor()
     try:
@@ -165,20 +145,160 @@ def upload_single_image():
     upload_subfolder = os.path.join(officer_mobile, category)
     upload_path = os.path.join(current_app.config["UPLOAD_FOLDER"], upload_subfolder)
     os.makedirs(upload_path, exist_ok=True)
+    return upload_subfolder, upload_path
+
 
-    original = secure_filename(file.filename)
+def _upload_filename(original_name, image_type):
+    """Build the stored filename for an uploaded image. Returns (filename, ext)."""
+    original = secure_filename(original_name)
     name_part, ext = os.path.splitext(original)
     prefix = {"rc": "rc_", "insurance": "ins_"}.get(image_type, "")
-    filename = f"{prefix}{name_part}_{int(time.time())}{ext}"
+    return f"{prefix}{name_part}_{int(time.time())}{ext}", ext
+
+
+def _finalize_upload(saved_file_path, upload_subfolder, ext):
+    """Convert a saved upload to WebP and return its public 'uploads/...' path."""
+    filename = os.path.basename(saved_file_path)
+    if ext.lower() in CONVERTIBLE_EXTENSIONS:
+        converted_path = _convert_to_webp(saved_file_path)
+        filename = os.path.basename(converted_path)
+    return f"uploads/{upload_subfolder}/{filename}".replace("\\", "/")
+
+
+@vehicles_bp.route("/upload-image", methods=["POST"])
+@role_required("office", "admin")
+def upload_single_image():
+    """Upload a single image and return its path.
+    Used by the frontend to upload images one-by-one before form submission."""
+    category = request.form.get("category", "").strip() or "uncategorized"
+    image_type = request.form.get("type", "vehicle")  # vehicle | rc | insurance
+    file = request.files.get("image")
+
+    if not file or not file.filename:
+        return jsonify({"error": "No image provided"}), 400
+    if not allowed_file(file.filename):
+        return jsonify({"error": "File type not allowed"}), 400
+
+    office_id = request.current_user["user_id"]
+    upload_subfolder, upload_path = _officer_upload_folder(office_id, category)
+
+    filename, ext = _upload_filename(file.filename, image_type)
     saved_file_path = os.path.join(upload_path, filename)
     file.save(saved_file_path)
 
     # Convert to WebP for smaller file size
-    if ext.lower() in ('.png', '.jpg', '.jpeg', '.gif', '.bmp', '.tiff'):
-        converted_path = _convert_to_webp(saved_file_path)
-        filename = os.path.basename(converted_path)
+    saved_path = _finalize_upload(saved_file_path, upload_subfolder, ext)
+
+    return jsonify({"path": saved_path}), 201
+
+
+# ── Resumable chunked uploads (init → PUT chunks → complete) ──────────────
+
+
+def _chunk_error(e):
+    body = {"error": str(e)}
+    if e.offset is not None:
+        body["offset"] = e.offset
+    resp = jsonify(body)
+    resp.status_code = e.status
+    if e.status == 503:
+        resp.headers["Retry-After"] = "2"
+    return resp
+
+
+@vehicles_bp.route("/uploads", methods=["POST"])
+@role_required("office", "admin")
+def init_chunked_upload():
+    """Start a resumable upload.
+    Body: { filename, size, category?, type?, sha256? }"""
+    data = request.get_json() or {}
+    filename = (data.get("filename") or "").strip()
+    try:
+        size = int(data.get("size") or 0)
+    except (ValueError, TypeError):
+        size = 0
+
+    if not filename or not allowed_file(filename):
+        return jsonify({"error": "File type not allowed"}), 400
+    max_size = current_app.config["CHUNKED_UPLOAD_MAX_SIZE"]
+    if size <= 0 or size > max_size:
+        return jsonify({"error": f"File size must be between 1 byte and {max_size // (1024 * 1024)} MB"}), 400
+
+    upload_folder = current_app.config["UPLOAD_FOLDER"]
+    chunked_upload.sweep_expired(upload_folder, current_app.config["CHUNKED_UPLOAD_TTL"])
+    upload_id = chunked_upload.init_session(
+        upload_folder,
+        request.current_user["user_id"],
+        filename,
+        size,
+        sha256=data.get("sha256"),
+        category=(data.get("category") or "").strip() or "uncategorized",
+        image_type=data.get("type", "vehicle"),
+    )
+    return jsonify({
+        "upload_id": upload_id,
+        "chunk_size": current_app.config["UPLOAD_CHUNK_SIZE"],
+        "offset": 0,
+    }), 201
+
+
+@vehicles_bp.route("/uploads/<upload_id>", methods=["GET"])
+@role_required("office", "admin")
+def get_chunked_upload(upload_id):
+    """Resume point for an upload: how many bytes the server already has."""
+    try:
+        meta, offset = chunked_upload.get_session(
+            current_app.config["UPLOAD_FOLDER"], upload_id, request.current_user["user_id"]
+        )
+    except chunked_upload.ChunkError as e:
+        return _chunk_error(e)
+    return jsonify({"upload_id": upload_id, "offset": offset, "size": meta["size"]})
 
-    saved_path = f"uploads/{upload_subfolder}/{filename}".replace("\\", "/")
+
+@vehicles_bp.route("/uploads/<upload_id>", methods=["PUT"])
+@role_required("office", "admin")
+def upload_chunk(upload_id):
+    """Append one chunk. Query: ?offset=N. Header: X-Chunk-Checksum (sha256 hex).
+    Body: raw chunk bytes."""
+    offset = request.args.get("offset", type=int)
+    if offset is None:
+        return jsonify({"error": "offset is required"}), 400
+    try:
+        new_offset = chunked_upload.append_chunk(
+            current_app.config["UPLOAD_FOLDER"],
+            upload_id,
+            request.current_user["user_id"],
+            offset,
+            request.get_data(cache=False),
+            request.headers.get("X-Chunk-Checksum", ""),
+            current_app.config["UPLOAD_CHUNK_SIZE"],
+        )
+    except chunked_upload.ChunkError as e:
+        return _chunk_error(e)
+    return jsonify({"upload_id": upload_id, "offset": new_offset})
+
+
+@vehicles_bp.route("/uploads/<upload_id>/complete", methods=["POST"])
+@role_required("office", "admin")
+def complete_chunked_upload(upload_id):
+    """Assemble a finished upload into the officer's folder; returns { path }
+    exactly like /upload-image."""
+    upload_folder = current_app.config["UPLOAD_FOLDER"]
+    office_id = request.current_user["user_id"]
+    try:
+        meta, _offset = chunked_upload.get_session(upload_folder, upload_id, office_id)
+        upload_subfolder, upload_path = _officer_upload_folder(office_id, meta["category"])
+        filename, ext = _upload_filename(meta["filename"], meta["image_type"])
+        saved_file_path = os.path.join(upload_path, filename)
+        # The WebP conversion runs inside the assembly slot, so the limit
+        # bounds the CPU-heavy part too
+        saved_path = chunked_upload.assemble(
+            upload_folder, upload_id, office_id, saved_file_path,
+            current_app.config["UPLOAD_MAX_CONCURRENT_ASSEMBLIES"],
+            finalize=lambda path: _finalize_upload(path, upload_subfolder, ext),
+        )
+    except chunked_upload.ChunkError as e:
+        return _chunk_error(e)
 
     return jsonify({"path": saved_path}), 201
 
@@ -258,6 +378,8 @@ def create_vehicle():
             image_paths.append(f"uploads/{upload_subfolder}/{filename}".replace("\\", "/"))
 
     image_path = json.dumps(image_paths) if image_paths else None
+    # Dimensions + inline placeholder per photo so grids can reserve space on first paint
+    image_meta = build_image_meta(current_app.config["UPLOAD_FOLDER"], image_paths)
 
     # ── RC image (pre-uploaded path or legacy file) ──
     rc_image_path = request.form.get("uploaded_rc_path", "").strip() or None
@@ -289,18 +411,27 @@ def create_vehicle():
                 ins_filename = os.path.basename(converted_path)
             insurance_image_path = f"uploads/{upload_subfolder}/{ins_filename}".replace("\\", "/")
 
+    category = resolve_category(category, name, description)
+    search_text = build_search_text({
+        "name": name, "description": description, "registration_number": registration_number,
+        "category": category, "state": state, "fuel_type": fuel_type,
+        "transmission": transmission, "vehicle_year": vehicle_year,
+    })
     try:
         cursor.execute(
-            """INSERT INTO products (office_id, name, description, category, state, image_path, starting_price, quoted_price, 
+            """INSERT INTO products (office_id, name, description, category, state, image_path, image_meta, starting_price, quoted_price, 
                bid_end_date, vehicle_year, mileage, fuel_type, transmission, owner_name, registration_number,
-               rc_available, rc_image, insurance_available, insurance_image, status)
-               VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, 'pending')""",
-            (office_id, name, description, category or None, state or None, image_path, starting_price, quoted_price,
+               rc_available, rc_image, insurance_available, insurance_image, search_text, status)
+               VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, 'pending')""",
+            (office_id, name, description, category, state or None, image_path, image_meta, starting_price, quoted_price,
              bid_end_date, vehicle_year, mileage, fuel_type, transmission, owner_name, registration_number,
-             rc_available, rc_image_path, insurance_available, insurance_image_path),
+             rc_available, rc_image_path, insurance_available, insurance_image_path, search_text),
         )
+        product_id = cursor.lastrowid
+        platform_stats.bump(cursor, **platform_stats.product_deltas(None, platform_stats.product_snapshot(cursor, product_id)))
         conn.commit()
-        return jsonify({"message": "Vehicle added! Waiting for admin approval.", "id": cursor.lastrowid}), 201
+        product_changed.send(current_app._get_current_object(), product_id=product_id, office_id=office_id)
+        return jsonify({"message": "Vehicle added! Waiting for admin approval.", "id": product_id}), 201
     finally:
         cursor.close()
         conn.close()
@@ -399,6 +530,12 @@ def update_vehicle(vehicle_id):
                 if new_paths:
                     image_path = json.dumps(new_paths)
 
+        image_meta = vehicle.get("image_meta")
+        if image_path != vehicle["image_path"]:
+            image_meta = build_image_meta(
+                current_app.config["UPLOAD_FOLDER"], parse_image_paths(image_path), existing=image_meta
+            )
+
         # ── RC image (pre-uploaded or legacy) ──
         uploaded_rc = request.form.get("uploaded_rc_path", "").strip()
         if uploaded_rc:
@@ -437,18 +574,30 @@ def update_vehicle(vehicle_id):
         else:
             insurance_image_path = None
 
+        category = resolve_category(category, name, description)
+        search_text = build_search_text({
+            "name": name, "description": description, "registration_number": registration_number,
+            "category": category, "state": state, "fuel_type": fuel_type,
+            "transmission": transmission, "vehicle_year": vehicle_year,
+        })
+        before = platform_stats.product_snapshot(cursor, vehicle_id)
         cursor.execute(
             """UPDATE products SET name = %s, description = %s, category = %s, state = %s,
-               starting_price = %s, quoted_price = %s, image_path = %s, status = %s,
+               starting_price = %s, quoted_price = %s, image_path = %s, image_meta = %s, status = %s,
                bid_end_date = %s, vehicle_year = %s, mileage = %s, fuel_type = %s, 
                transmission = %s, owner_name = %s, registration_number = %s,
-               rc_available = %s, rc_image = %s, insurance_available = %s, insurance_image = %s
+               rc_available = %s, rc_image = %s, insurance_available = %s, insurance_image = %s,
+               search_text = %s
                WHERE id = %s""",
-            (name, description, category or None, state or None, starting_price, quoted_price, image_path, status,
+            (name, description, category, state or None, starting_price, quoted_price, image_path, image_meta, status,
              bid_end_date, vehicle_year, mileage, fuel_type, transmission, owner_name, registration_number,
-             rc_available, rc_image_path, insurance_available, insurance_image_path, vehicle_id),
+             rc_available, rc_image_path, insurance_available, insurance_image_path, search_text, vehicle_id),
         )
+        platform_stats.bump(cursor, **platform_stats.product_deltas(before, platform_stats.product_snapshot(cursor, vehicle_id)))
         conn.commit()
+        product_changed.send(current_app._get_current_object(), product_id=vehicle_id, office_id=vehicle["office_id"])
+        if status == "approved" and vehicle["status"] != "approved":
+            saved_searches.notify_matches(vehicle_id)
         return jsonify({"message": "Vehicle updated successfully"})
     finally:
         cursor.close()
@@ -460,10 +609,20 @@ def delete_vehicle(vehicle_id):
     conn = _get_db()
     cursor = conn.cursor()
     try:
+        before = platform_stats.product_snapshot(cursor, vehicle_id)
+        # Its bids cascade with it
+        cursor.execute("SELECT COALESCE(SUM(amount), 0) as total FROM bids WHERE product_id = %s", (vehicle_id,))
+        bid_volume = float(cursor.fetchone()["total"])
         cursor.execute("DELETE FROM products WHERE id = %s", (vehicle_id,))
+        deleted = cursor.rowcount
+        if deleted:
+            deltas = platform_stats.product_deltas(before, None)
+            deltas["total_volume"] = -bid_volume
+            platform_stats.bump(cursor, **deltas)
         conn.commit()
-        if cursor.rowcount == 0:
+        if deleted == 0:
             return jsonify({"error": "Vehicle not found"}), 404
+        product_changed.send(current_app._get_current_object(), product_id=vehicle_id, office_id=before["office_id"])
         return jsonify({"message": "Vehicle deleted successfully"})
     finally:
         cursor.close()
@@ -476,10 +635,16 @@ def approve_vehicle(vehicle_id):
     conn = _get_db()
     cursor = conn.cursor()
     try:
+        before = platform_stats.product_snapshot(cursor, vehicle_id)
         cursor.execute("UPDATE products SET status = 'approved' WHERE id = %s", (vehicle_id,))
+        updated = cursor.rowcount
+        if updated:
+            platform_stats.bump(cursor, **platform_stats.product_deltas(before, dict(before, status="approved")))
         conn.commit()
-        if cursor.rowcount == 0:
+        if updated == 0:
             return jsonify({"error": "Vehicle not found"}), 404
+        product_changed.send(current_app._get_current_object(), product_id=vehicle_id, office_id=before["office_id"])
+        saved_searches.notify_matches(vehicle_id)
         return jsonify({"message": "Vehicle approved successfully"})
     finally:
         cursor.close()
@@ -492,10 +657,15 @@ def reject_vehicle(vehicle_id):
     conn = _get_db()
     cursor = conn.cursor()
     try:
+        before = platform_stats.product_snapshot(cursor, vehicle_id)
         cursor.execute("UPDATE products SET status = 'rejected' WHERE id = %s", (vehicle_id,))
+        updated = cursor.rowcount
+        if updated:
+            platform_stats.bump(cursor, **platform_stats.product_deltas(before, dict(before, status="rejected")))
         conn.commit()
-        if cursor.rowcount == 0:
+        if updated == 0:
             return jsonify({"error": "Vehicle not found"}), 404
+        product_changed.send(current_app._get_current_object(), product_id=vehicle_id, office_id=before["office_id"])
         return jsonify({"message": "Vehicle rejected"})
     finally:
         cursor.close()
@@ -551,7 +721,14 @@ def place_bid(vehicle_id):
             "INSERT INTO bids (product_id, user_id, amount) VALUES (%s, %s, %s)",
             (vehicle_id, request.current_user["user_id"], bid_amount),
         )
+        # Product is approved, so its auction value moves from current_max to the new bid
+        platform_stats.bump(cursor, total_volume=bid_amount, total_auction_value=bid_amount - current_max)
         conn.commit()
+        bid_placed.send(
+            current_app._get_current_object(),
+            product_id=vehicle_id, office_id=product["office_id"],
+            amount=bid_amount, user_id=request.current_user["user_id"],
+        )
 
         # ── WebSocket: broadcast live bid update to all watchers of this auction ──
         import datetime
@@ -639,6 +816,7 @@ def close_auction(vehicle_id):
             )
 
         conn.commit()
+        product_changed.send(current_app._get_current_object(), product_id=vehicle_id, office_id=product["office_id"])
 
         # Broadcast auction closed via WebSocket
         try:
@@ -684,6 +862,7 @@ def reopen_auction(vehicle_id):
         conn.commit()
         if cursor.rowcount == 0:
             return jsonify({"error": "Vehicle not found"}), 404
+        product_changed.send(current_app._get_current_object(), product_id=vehicle_id)
         return jsonify({"message": "Auction reopened"})
     finally:
         cursor.close()
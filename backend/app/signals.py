@@ -0,0 +1,22 @@
+"""
+Domain signals (blinker, as used by Flask itself).
+
+Write paths send these after committing; caches and derived indexes
+subscribe to them instead of being called from every route.
+
+    from ..signals import product_changed
+    product_changed.send(current_app._get_current_object(), product_id=42)
+"""
+from blinker import Namespace
+
+_signals = Namespace()
+
+# A product row was created, edited, approved/rejected, closed/reopened or deleted.
+# kwargs: product_id, office_id (omitted when the sender doesn't have it)
+product_changed = _signals.signal("product-changed")
+
+# A bid was committed. kwargs: product_id, office_id, amount, user_id
+bid_placed = _signals.signal("bid-placed")
+
+# A subscription plan was created, edited or deleted. kwargs: plan_id
+plan_changed = _signals.signal("plan-changed")
@@ -62,6 +62,15 @@ def broadcast_bid_update(auction_id, bid_data):
     socketio.emit("bid_update", bid_data, room=room)
 
 
+# ────────────────────────────────────────────────────────────────────────────
+# Helper — push an event to one user's private room ("user_{id}")
+# Joined by the client with "join_user" (see below); used for notifications.
+# ────────────────────────────────────────────────────────────────────────────
+def notify_user(user_id, event, data):
+    """Push `event` with `data` to every open tab of user `user_id`."""
+    socketio.emit(event, data, room=f"user_{user_id}")
+
+
 # ────────────────────────────────────────────────────────────────────────────
 # SocketIO event handlers
 # ────────────────────────────────────────────────────────────────────────────
@@ -109,3 +118,21 @@ def on_leave_auction(data):
         room = f"auction_{auction_id}"
         leave_room(room)
         emit("left_auction", {"auction_id": auction_id})
+
+
+@socketio.on("join_user")
+def on_join_user(data):
+    """
+    Client sends: { "token": "<JWT>" }
+    Server responds: joins the caller's private room "user_{id}" for
+    notifications. The token is verified, so a client can only join its own.
+    """
+    from .utils import decode_token
+    payload = decode_token((data or {}).get("token") or "")
+    if not payload:
+        emit("error", {"message": "Invalid or expired token"})
+        return
+
+    room = f"user_{payload['user_id']}"
+    join_room(room)
+    emit("joined_user", {"room": room})
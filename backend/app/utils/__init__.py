@@ -4,9 +4,8 @@ from .helpers import (
     login_required,
     role_required,
     allowed_file,
-    serialize_row,
-    serialize_rows,
 )
+from .serialization import serialize_row, serialize_rows
 
 __all__ = [
     "generate_token",
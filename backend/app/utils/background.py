@@ -0,0 +1,36 @@
+"""
+Background work helpers.
+
+The API runs on a single eventlet hub (see run.py), so anything slow must
+either run as a separate green thread (I/O-bound) or on a native OS thread
+(CPU-bound: Pillow, hashing) — otherwise it stalls every request and socket.
+"""
+from flask import current_app
+
+
+def spawn(fn, *args, **kwargs):
+    """Run `fn(*args, **kwargs)` as a background task inside an app context.
+    Returns immediately; exceptions are logged, never raised to the caller."""
+    app = current_app._get_current_object()
+
+    def runner():
+        with app.app_context():
+            try:
+                fn(*args, **kwargs)
+            except Exception:
+                app.logger.exception(f"Background task {getattr(fn, '__name__', fn)} failed")
+
+    from ..socket_events import socketio
+    return socketio.start_background_task(runner)
+
+
+def run_blocking(fn, *args, **kwargs):
+    """Call a CPU-bound `fn` on a native thread when the eventlet hub is
+    active (the calling green thread yields while it runs); plain call otherwise."""
+    try:
+        from eventlet import patcher, tpool
+    except ImportError:
+        return fn(*args, **kwargs)
+    if patcher.is_monkey_patched("thread"):
+        return tpool.execute(fn, *args, **kwargs)
+    return fn(*args, **kwargs)
@@ -0,0 +1,72 @@
+"""
+Bid aggregates for product lists.
+
+List endpoints select their page of products first and then aggregate bids
+for just those ids, so paging walks the products index (seek or offset)
+without dragging a products × bids GROUP BY along.
+"""
+
+
+def bid_summary(cursor, product_ids):
+    """Return {product_id: {"current_bid", "bid_count"}} for the given ids.
+    Products without bids are absent from the result."""
+    if not product_ids:
+        return {}
+    placeholders = ", ".join(["%s"] * len(product_ids))
+    cursor.execute(
+        f"""SELECT product_id, MAX(amount) as current_bid, COUNT(*) as bid_count
+            FROM bids WHERE product_id IN ({placeholders})
+            GROUP BY product_id""",
+        list(product_ids),
+    )
+    return {
+        row["product_id"]: {"current_bid": float(row["current_bid"]), "bid_count": row["bid_count"]}
+        for row in cursor.fetchall()
+    }
+
+
+def attach_bid_summary(cursor, rows, count_key="bid_count"):
+    """Set current_bid (0 when unbid) and `count_key` on each product row."""
+    summary = bid_summary(cursor, [row["id"] for row in rows])
+    for row in rows:
+        stats = summary.get(row["id"])
+        row["current_bid"] = stats["current_bid"] if stats else 0
+        row[count_key] = stats["bid_count"] if stats else 0
+    return rows
+
+
+# user id -> username. Usernames are never edited, so entries don't go stale;
+# the map is simply reset when it reaches _NAME_CACHE_MAX.
+_names = {}
+_NAME_CACHE_MAX = 50000
+
+
+def display_names(cursor, user_ids):
+    """Return {user_id: username}, reading only ids not already cached."""
+    missing = [uid for uid in set(user_ids) if uid not in _names]
+    if missing:
+        placeholders = ", ".join(["%s"] * len(missing))
+        cursor.execute(f"SELECT id, username FROM users WHERE id IN ({placeholders})", missing)
+        fetched = {row["id"]: row["username"] for row in cursor.fetchall()}
+        if len(_names) + len(fetched) > _NAME_CACHE_MAX:
+            _names.clear()
+        _names.update(fetched)
+    return {uid: _names.get(uid) for uid in user_ids}
+
+
+def attach_bidder_names(cursor, bids):
+    names = display_names(cursor, [bid["user_id"] for bid in bids])
+    for bid in bids:
+        bid["bidder_name"] = names.get(bid["user_id"])
+    return bids
+
+
+def top_bids(cursor, product_id, limit):
+    """The `limit` highest bids for a product (with bidder_name), newest id
+    first among equal amounts."""
+    cursor.execute(
+        """SELECT * FROM bids WHERE product_id = %s
+           ORDER BY amount DESC, id DESC LIMIT %s""",
+        (product_id, limit),
+    )
+    return attach_bidder_names(cursor, list(cursor.fetchall()))
@@ -0,0 +1,111 @@
+"""
+In-process response cache with stale-while-revalidate and single-flight refresh.
+
+Each worker process keeps its own copy; explicit invalidation (see
+app/signals.py) covers writes made in this process and the short TTL bounds
+staleness for writes made in the others.
+"""
+import threading
+import time
+
+from .background import spawn
+
+HIT, STALE, MISS = "HIT", "STALE", "MISS"
+
+
+class _Entry:
+    __slots__ = ("value", "fresh_until", "stale_until", "refreshing", "ready")
+
+    def __init__(self):
+        self.value = None
+        self.fresh_until = 0.0
+        self.stale_until = 0.0
+        self.refreshing = False
+        self.ready = threading.Event()
+
+
+class ResponseCache:
+    """Cache `compute()` results per key.
+
+    - fresh:  served as-is.
+    - stale:  served as-is while one background task recomputes it.
+    - cold:   the first caller computes; concurrent callers wait for that
+              result instead of recomputing (single-flight).
+    """
+
+    def __init__(self, ttl=30, stale_ttl=300):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._entries = {}
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def configure(self, ttl=None, stale_ttl=None):
+        if ttl is not None:
+            self.ttl = ttl
+        if stale_ttl is not None:
+            self.stale_ttl = stale_ttl
+
+    def get(self, key, compute):
+        """Return (value, state) where state is HIT, STALE or MISS."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or (entry.ready.is_set() and now >= entry.stale_until):
+                entry = self._entries[key] = _Entry()
+                entry.refreshing = True
+                leader = True
+            else:
+                leader = False
+
+        if leader:
+            self._refresh(key, entry, compute)
+            return entry.value, MISS
+
+        if not entry.ready.is_set():
+            entry.ready.wait()
+            if self._entries.get(key) is not entry:
+                return self.get(key, compute)  # leader failed — try again
+            return entry.value, MISS
+
+        if now < entry.fresh_until:
+            return entry.value, HIT
+
+        with self._lock:
+            start_refresh = not entry.refreshing
+            entry.refreshing = True
+        if start_refresh:
+            spawn(self._refresh, key, entry, compute)
+        return entry.value, STALE
+
+    def _refresh(self, key, entry, compute):
+        version = self._versions.get(key, 0)
+        try:
+            value = compute()
+        except Exception:
+            with self._lock:
+                entry.refreshing = False
+                if not entry.ready.is_set():
+                    # Let waiters retry instead of blocking forever
+                    self._entries.pop(key, None)
+                    entry.ready.set()
+            raise
+        now = time.monotonic()
+        with self._lock:
+            entry.value = value
+            # An invalidation during compute means `value` may predate the write
+            entry.fresh_until = now + self.ttl if self._versions.get(key, 0) == version else 0.0
+            entry.stale_until = now + self.ttl + self.stale_ttl
+            entry.refreshing = False
+            entry.ready.set()
+
+    def invalidate(self, key=None):
+        """Mark one key (or everything) stale. The old value is still served
+        until the single background refresh replaces it."""
+        with self._lock:
+            keys = [key] if key is not None else list(self._entries)
+            for k in keys:
+                self._versions[k] = self._versions.get(k, 0) + 1
+                entry = self._entries.get(k)
+                if entry is not None:
+                    entry.fresh_until = 0.0
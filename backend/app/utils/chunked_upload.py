@@ -0,0 +1,164 @@
+"""
+Resumable chunked uploads (init / upload chunk / complete).
+
+Each session lives in UPLOAD_FOLDER/.chunks/<upload_id>/:
+    meta.json   — owner, target filename, declared size, optional sha256
+    data.part   — bytes received so far, appended strictly in order
+
+The size of data.part is the authoritative "last good offset": a client
+that lost its connection asks for the session status and resends from there.
+"""
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+
+CHUNK_DIR = ".chunks"
+
+_write_lock = threading.Lock()
+_assembly_slots = None
+_assembly_slots_lock = threading.Lock()
+
+
+class ChunkError(Exception):
+    """Raised for protocol violations; carries the HTTP status to return."""
+
+    def __init__(self, message, status=400, offset=None):
+        super().__init__(message)
+        self.status = status
+        self.offset = offset
+
+
+def _session_dir(upload_folder, upload_id):
+    # upload_id is always a uuid4 hex we generated — reject anything else
+    if len(upload_id) != 32 or not all(c in "0123456789abcdef" for c in upload_id):
+        raise ChunkError("Upload not found", 404)
+    return os.path.join(upload_folder, CHUNK_DIR, upload_id)
+
+
+def _read_meta(session_dir):
+    try:
+        with open(os.path.join(session_dir, "meta.json")) as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        raise ChunkError("Upload not found", 404)
+
+
+def _last_activity(session_dir):
+    """Latest write to a session. Appends to data.part don't touch the
+    directory's own mtime, so look at the files."""
+    times = []
+    for name in ("data.part", "meta.json"):
+        try:
+            times.append(os.path.getmtime(os.path.join(session_dir, name)))
+        except OSError:
+            pass
+    return max(times) if times else os.path.getmtime(session_dir)
+
+
+def sweep_expired(upload_folder, ttl):
+    """Delete sessions idle for more than `ttl` seconds."""
+    root = os.path.join(upload_folder, CHUNK_DIR)
+    if not os.path.isdir(root):
+        return
+    cutoff = time.time() - ttl
+    for name in os.listdir(root):
+        path = os.path.join(root, name)
+        try:
+            if _last_activity(path) < cutoff:
+                shutil.rmtree(path, ignore_errors=True)
+        except OSError:
+            pass
+
+
+def init_session(upload_folder, owner_id, filename, size, sha256=None, **extra):
+    """Create a new upload session and return its id."""
+    upload_id = uuid.uuid4().hex
+    session_dir = os.path.join(upload_folder, CHUNK_DIR, upload_id)
+    os.makedirs(session_dir)
+    meta = dict(extra, owner_id=owner_id, filename=filename, size=size,
+                sha256=(sha256 or "").lower() or None, created_at=time.time())
+    with open(os.path.join(session_dir, "meta.json"), "w") as fh:
+        json.dump(meta, fh)
+    open(os.path.join(session_dir, "data.part"), "wb").close()
+    return upload_id
+
+
+def get_session(upload_folder, upload_id, owner_id):
+    """Return (meta, offset) for a session owned by `owner_id`."""
+    session_dir = _session_dir(upload_folder, upload_id)
+    meta = _read_meta(session_dir)
+    if meta["owner_id"] != owner_id:
+        raise ChunkError("Upload not found", 404)
+    return meta, os.path.getsize(os.path.join(session_dir, "data.part"))
+
+
+def append_chunk(upload_folder, upload_id, owner_id, offset, data, checksum, max_chunk):
+    """Append one chunk at `offset` after verifying its sha256.
+    Returns the new offset."""
+    meta, current = get_session(upload_folder, upload_id, owner_id)
+    if not checksum:
+        raise ChunkError("X-Chunk-Checksum header (sha256) is required")
+    if len(data) == 0 or len(data) > max_chunk:
+        raise ChunkError(f"Chunk must be between 1 and {max_chunk} bytes")
+    if hashlib.sha256(data).hexdigest() != checksum.lower():
+        raise ChunkError("Chunk checksum mismatch — resend this chunk", 422, offset=current)
+
+    part_path = os.path.join(_session_dir(upload_folder, upload_id), "data.part")
+    with _write_lock:
+        current = os.path.getsize(part_path)
+        if offset != current:
+            raise ChunkError("Offset mismatch — resume from the returned offset", 409, offset=current)
+        if current + len(data) > meta["size"]:
+            raise ChunkError("Chunk exceeds declared file size")
+        with open(part_path, "ab") as fh:
+            fh.write(data)
+            fh.flush()
+            os.fsync(fh.fileno())
+        return current + len(data)
+
+
+def _slots(limit):
+    global _assembly_slots
+    with _assembly_slots_lock:
+        if _assembly_slots is None:
+            _assembly_slots = threading.BoundedSemaphore(limit)
+    return _assembly_slots
+
+
+def assemble(upload_folder, upload_id, owner_id, dest_path, max_concurrent, finalize=None):
+    """Verify a finished session and move its data to `dest_path`, then run
+    `finalize(dest_path)` (e.g. the WebP conversion) and return its result;
+    without `finalize` the session meta is returned. At most
+    `max_concurrent` assemblies, finalize included, run at once per process;
+    extra callers get a 503 and should retry."""
+    meta, offset = get_session(upload_folder, upload_id, owner_id)
+    if offset != meta["size"]:
+        raise ChunkError("Upload incomplete", 409, offset=offset)
+
+    slots = _slots(max_concurrent)
+    if not slots.acquire(blocking=False):
+        raise ChunkError("Server busy assembling uploads, retry shortly", 503, offset=offset)
+    try:
+        session_dir = _session_dir(upload_folder, upload_id)
+        part_path = os.path.join(session_dir, "data.part")
+        try:
+            if meta.get("sha256"):
+                digest = hashlib.sha256()
+                with open(part_path, "rb") as fh:
+                    for block in iter(lambda: fh.read(1024 * 1024), b""):
+                        digest.update(block)
+                if digest.hexdigest() != meta["sha256"]:
+                    shutil.rmtree(session_dir, ignore_errors=True)
+                    raise ChunkError("File checksum mismatch — upload discarded", 422)
+            os.replace(part_path, dest_path)
+        except FileNotFoundError:
+            # A concurrent complete of the same session got there first
+            raise ChunkError("Upload not found", 404)
+        shutil.rmtree(session_dir, ignore_errors=True)
+        return finalize(dest_path) if finalize else meta
+    finally:
+        slots.release()
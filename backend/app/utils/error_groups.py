@@ -0,0 +1,166 @@
+"""
+Error fingerprinting and aggregated error groups.
+
+Every frontend error is reduced at ingest (in the error_queue flusher) to a
+fingerprint: error type + component + the message with volatile parts
+(numbers, ids, quoted values, URLs) masked + the top stack frames with line
+numbers and bundle hashes stripped. One error_groups row per fingerprint
+holds occurrence counts, first/last seen, a sample message/stack and a
+linear-counting bitmap of affected users (user id, or client IP for
+anonymous reports, hashed to one of AFFECTED_BITS bits; the estimate is
+-m·ln(zero bits / m)).
+
+Raw error_logs rows are kept for the first ERROR_GROUP_RAW_QUOTA occurrences
+of a group; beyond that only ERROR_GROUP_SAMPLE_RATE of them are stored, so
+a crash loop grows one counter instead of the table.
+"""
+import hashlib
+import math
+import random
+import re
+
+# Linear counting bitmap size; accurate to roughly m·ln(m) ≈ 30k distinct users
+AFFECTED_BITS = 4096
+_BITMAP_BYTES = AFFECTED_BITS // 8
+
+STACK_FRAMES = 3
+
+_MASKS = (
+    (re.compile(r"https?://\S+"), "<url>"),
+    (re.compile(r"\b[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\b", re.I), "<uuid>"),
+    (re.compile(r"\b0x[0-9a-f]+\b|\b[0-9a-f]{12,}\b", re.I), "<hex>"),
+    (re.compile(r"'[^']*'|\"[^\"]*\"|`[^`]*`"), "<str>"),
+    (re.compile(r"\d+(\.\d+)?"), "<n>"),
+)
+_FRAME_RE = re.compile(r"^\s*(at\s+)?(?P<frame>.+?)\s*$")
+_LOCATION_RE = re.compile(r":\d+(:\d+)?\)?$|\?[^\s:)]*")
+_BUNDLE_HASH_RE = re.compile(r"\.[0-9a-f]{6,}(?=\.(js|mjs|css)\b)", re.I)
+
+
+def normalize_message(message):
+    text = (message or "").strip()[:1000]
+    for pattern, replacement in _MASKS:
+        text = pattern.sub(replacement, text)
+    return " ".join(text.split())
+
+
+def top_frames(stack, count=STACK_FRAMES):
+    """First `count` stack frames without line/column numbers, query strings
+    or bundle content hashes (so a redeploy doesn't split a group)."""
+    frames = []
+    for line in (stack or "").splitlines():
+        match = _FRAME_RE.match(line)
+        if not match or not match.group("frame"):
+            continue
+        frame = match.group("frame")
+        if not (match.group(1) or "@" in frame):
+            continue  # the "TypeError: ..." header line, not a frame
+        frame = _BUNDLE_HASH_RE.sub("", _LOCATION_RE.sub("", frame))
+        frames.append(frame)
+        if len(frames) == count:
+            break
+    return frames
+
+
+def fingerprint(error_type, message, stack, component):
+    parts = [error_type or "", component or "", normalize_message(message), *top_frames(stack)]
+    return hashlib.blake2b("\n".join(parts).encode(), digest_size=16).hexdigest()
+
+
+def user_bit(user_id, ip):
+    """Bit index of the reporting user (or IP for anonymous reports)."""
+    key = f"u{user_id}" if user_id else f"ip{ip or ''}"
+    digest = hashlib.blake2b(key.encode(), digest_size=4).digest()
+    return int.from_bytes(digest, "big") % AFFECTED_BITS
+
+
+def empty_bitmap():
+    return bytes(_BITMAP_BYTES)
+
+
+def set_bits(bitmap, bits):
+    data = bytearray(bitmap or empty_bitmap())
+    for bit in bits:
+        data[bit >> 3] |= 1 << (bit & 7)
+    return bytes(data)
+
+
+def estimate_users(bitmap):
+    """Linear counting estimate of distinct users from the bitmap."""
+    if not bitmap:
+        return 0
+    ones = sum(bin(b).count("1") for b in bitmap)
+    zeros = AFFECTED_BITS - ones
+    if zeros == 0:
+        return int(AFFECTED_BITS * math.log(AFFECTED_BITS))  # saturated; lower bound
+    return int(round(-AFFECTED_BITS * math.log(zeros / AFFECTED_BITS)))
+
+
+def record_batch(cursor, rows, columns, raw_quota, sample_rate):
+    """Group a batch of error_logs rows (tuples in `columns` order), upsert
+    their error_groups and return the raw rows to store, each with its
+    fingerprint appended. Runs inside the caller's transaction."""
+    idx = {name: i for i, name in enumerate(columns)}
+    groups = {}
+    for row in rows:
+        fp = fingerprint(
+            row[idx["error_type"]], row[idx["error_message"]],
+            row[idx["error_stack"]], row[idx["component_name"]],
+        )
+        group = groups.setdefault(fp, {"rows": [], "bits": set()})
+        group["rows"].append(row)
+        group["bits"].add(user_bit(row[idx["user_id"]], row[idx["ip_address"]]))
+
+    placeholders = ", ".join(["%s"] * len(groups))
+    cursor.execute(
+        f"""SELECT fingerprint, raw_count, affected_users FROM error_groups
+            WHERE fingerprint IN ({placeholders}) FOR UPDATE""",
+        list(groups),
+    )
+    existing = {}
+    for row in cursor.fetchall():
+        if isinstance(row, dict):
+            existing[row["fingerprint"]] = (row["raw_count"], row["affected_users"])
+        else:
+            existing[row[0]] = (row[1], row[2])
+
+    keep, upserts = [], []
+    for fp, group in groups.items():
+        raw_count, bitmap = existing.get(fp, (0, None))
+        stored = 0
+        for row in group["rows"]:
+            if raw_count + stored < raw_quota or random.random() < sample_rate:
+                keep.append(row + (fp,))
+                stored += 1
+        first, last = group["rows"][0], group["rows"][-1]
+        occurred = [r[idx["occurred_at"]] for r in group["rows"]]
+        upserts.append((
+            fp,
+            first[idx["error_type"]],
+            first[idx["component_name"]],
+            normalize_message(first[idx["error_message"]])[:500],
+            last[idx["error_message"]],
+            last[idx["error_stack"]],
+            len(group["rows"]),
+            stored,
+            set_bits(bitmap, group["bits"]),
+            min(occurred),
+            max(occurred),
+        ))
+
+    cursor.executemany(
+        """INSERT INTO error_groups (fingerprint, error_type, component_name, title,
+                                     sample_message, sample_stack, occurrences, raw_count,
+                                     affected_users, first_seen, last_seen)
+           VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+           ON DUPLICATE KEY UPDATE
+               occurrences = occurrences + VALUES(occurrences),
+               raw_count = raw_count + VALUES(raw_count),
+               affected_users = VALUES(affected_users),
+               sample_message = VALUES(sample_message),
+               sample_stack = VALUES(sample_stack),
+               first_seen = LEAST(first_seen, VALUES(first_seen)),
+               last_seen = GREATEST(last_seen, VALUES(last_seen))""",
+        upserts,
+    )
+    return keep
@@ -0,0 +1,258 @@
+"""
+Buffered ingestion for frontend error reports (/api/features/log-error).
+
+The endpoint appends a row tuple to an in-process bounded queue and returns;
+one background flusher groups each batch into error_groups, adds it to the
+error_log_daily rollup and writes the raw rows it keeps to error_logs with a
+multi-row INSERT (MySQLdb's executemany) every ERROR_LOG_FLUSH_MS or as soon
+as ERROR_LOG_BATCH_SIZE rows are waiting. A bad deploy that throws on every
+page load therefore costs one connection and a few statements per interval
+instead of one connection per error.
+
+Overload handling:
+
+- above half capacity new reports are sampled, keeping a shrinking share
+  (down to 10% just below full), so a flood still leaves a representative
+  trail;
+- at capacity reports are dropped;
+- when a batch write fails its rows are retried one by one, so one bad row
+  can't sink the rest; rows that still fail are put back (if they fit) and
+  discarded after MAX_ROW_ATTEMPTS failed flushes;
+- what is still buffered at interpreter exit is flushed once, best effort.
+
+Counters (stats()) cover accepted, sampled out, dropped and flushed rows
+(flushed includes reports only counted in their group, "grouped_only"),
+plus rows in failed writes and rows discarded after repeated failures; the
+admin stats endpoint returns them with the current queue depth.
+"""
+import atexit
+import collections
+import datetime
+import random
+import threading
+
+from flask import current_app
+
+from . import error_groups, log_retention
+
+COLUMNS = (
+    "user_id", "username",
+    "error_type", "error_message", "error_stack", "component_name",
+    "page_url", "page_title", "referrer_url",
+    "device_type", "device_model",
+    "os_name", "os_version",
+    "browser_name", "browser_version", "user_agent",
+    "screen_width", "screen_height",
+    "viewport_width", "viewport_height",
+    "language", "timezone",
+    "ip_address", "app_version",
+    "occurred_at",
+)
+
+# Raw rows are written with their group fingerprint (see error_groups.py)
+INSERT_SQL = (
+    f"INSERT INTO error_logs ({', '.join(COLUMNS)}, fingerprint) "
+    f"VALUES ({', '.join(['%s'] * (len(COLUMNS) + 1))})"
+)
+
+# Sampling kicks in above this share of capacity
+SAMPLE_FROM = 0.5
+MIN_KEEP_RATE = 0.1
+
+# Failed flushes a row survives before it is discarded
+MAX_ROW_ATTEMPTS = 3
+
+
+class ErrorLogQueue:
+    """Bounded buffer of error_logs rows plus the flusher that drains it."""
+
+    def __init__(self):
+        self._rows = collections.deque()
+        self._lock = threading.Lock()
+        self._started = False
+        self._counters = collections.Counter()
+        self._last_flush = None
+        self._capacity = 5000
+        self._attempts = collections.Counter()  # row -> failed flushes so far
+
+    def _keep_rate(self, depth):
+        fill = depth / self._capacity
+        if fill < SAMPLE_FROM:
+            return 1.0
+        # Linear from 1.0 at SAMPLE_FROM down to MIN_KEEP_RATE at full
+        span = (fill - SAMPLE_FROM) / (1 - SAMPLE_FROM)
+        return max(MIN_KEEP_RATE, 1.0 - span * (1 - MIN_KEEP_RATE))
+
+    def put(self, row):
+        """Queue one row (a tuple in COLUMNS order). Returns False if the row
+        was sampled out or dropped. Never blocks, never raises."""
+        self._ensure_flusher()
+        with self._lock:
+            depth = len(self._rows)
+            if depth >= self._capacity:
+                self._counters["dropped"] += 1
+                return False
+            if random.random() >= self._keep_rate(depth):
+                self._counters["sampled_out"] += 1
+                return False
+            self._rows.append(row)
+            self._counters["accepted"] += 1
+            return True
+
+    def _take(self, limit):
+        with self._lock:
+            return [self._rows.popleft() for _ in range(min(limit, len(self._rows)))]
+
+    def _requeue(self, rows):
+        """Put failed rows back at the front, discarding those that have
+        failed MAX_ROW_ATTEMPTS times (or don't fit)."""
+        with self._lock:
+            retry = []
+            for row in rows:
+                self._attempts[row] += 1
+                if self._attempts[row] >= MAX_ROW_ATTEMPTS:
+                    del self._attempts[row]
+                    self._counters["discarded"] += 1
+                else:
+                    retry.append(row)
+            room = self._capacity - len(self._rows)
+            kept = retry[:max(room, 0)]
+            for row in retry[len(kept):]:
+                self._attempts.pop(row, None)
+            self._rows.extendleft(reversed(kept))
+            self._counters["dropped"] += len(retry) - len(kept)
+
+    def _write(self, conn, cursor, rows, config):
+        """Group and insert `rows` in one transaction. Returns the number of
+        raw rows stored; raises (after rollback) if the write fails."""
+        try:
+            raw = error_groups.record_batch(
+                cursor, rows, COLUMNS,
+                config["ERROR_GROUP_RAW_QUOTA"], config["ERROR_GROUP_SAMPLE_RATE"],
+            )
+            log_retention.bump_daily(cursor, rows, COLUMNS)
+            if raw:
+                cursor.executemany(INSERT_SQL, raw)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        return len(raw)
+
+    def _write_each(self, conn, cursor, rows, config):
+        """Retry a failed batch row by row. Returns (written, failed rows)."""
+        written, failed = [], []
+        for row in rows:
+            try:
+                stored = self._write(conn, cursor, [row], config)
+            except Exception:
+                failed.append(row)
+                continue
+            written.append(row)
+            self._counters["sampled_raw"] += 1 - stored
+        return written, failed
+
+    def flush(self, batch_size=None):
+        """Write everything queued right now. Returns the number of rows written."""
+        from .. import db
+        config = current_app.config
+        batch_size = batch_size or config["ERROR_LOG_BATCH_SIZE"]
+        written = 0
+        if not self._rows:
+            return 0
+        # Connect before taking rows: if the DB is down they stay queued
+        conn = db.get_db()
+        try:
+            cursor = conn.cursor()
+        except Exception:
+            conn.close()
+            raise
+        try:
+            rows = self._take(batch_size)
+            while rows:
+                failed = []
+                try:
+                    stored = self._write(conn, cursor, rows, config)
+                    self._counters["sampled_raw"] += len(rows) - stored
+                    done = rows
+                except Exception:
+                    current_app.logger.exception(f"Writing {len(rows)} error log rows failed; retrying one by one")
+                    done, failed = self._write_each(conn, cursor, rows, config)
+                if self._attempts:
+                    with self._lock:
+                        for row in done:
+                            self._attempts.pop(row, None)
+                written += len(done)
+                self._counters["flushed"] += len(done)
+                self._counters["batches"] += 1 if done else 0
+                if failed:
+                    self._counters["failed"] += len(failed)
+                    self._requeue(failed)
+                    break
+                rows = self._take(batch_size)
+        finally:
+            cursor.close()
+            conn.close()
+        self._last_flush = datetime.datetime.utcnow().isoformat()
+        return written
+
+    def _run(self, app):
+        from ..socket_events import socketio
+        with app.app_context():
+            interval = app.config["ERROR_LOG_FLUSH_MS"] / 1000
+            batch_size = app.config["ERROR_LOG_BATCH_SIZE"]
+            waited = 0.0
+            tick = min(interval, 0.05)
+            while True:
+                socketio.sleep(tick)
+                waited += tick
+                if len(self._rows) >= batch_size or (waited >= interval and self._rows):
+                    try:
+                        self.flush(batch_size)
+                    except Exception:
+                        app.logger.exception("Error log flusher failed")
+                    waited = 0.0
+                elif waited >= interval:
+                    waited = 0.0
+
+    def _ensure_flusher(self):
+        if self._started:
+            return
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        from ..socket_events import socketio
+        app = current_app._get_current_object()
+        self._capacity = app.config["ERROR_LOG_QUEUE_SIZE"]
+        socketio.start_background_task(self._run, app)
+        atexit.register(self._flush_at_exit, app)
+
+    def _flush_at_exit(self, app):
+        # Best effort: whatever is still buffered when the process stops
+        if self._rows:
+            with app.app_context():
+                try:
+                    self.flush()
+                except Exception:
+                    pass
+
+    def stats(self):
+        with self._lock:
+            return {
+                "queued": len(self._rows),
+                "capacity": self._capacity,
+                "keep_rate": round(self._keep_rate(len(self._rows)), 3),
+                "accepted": self._counters["accepted"],
+                "sampled_out": self._counters["sampled_out"],
+                "dropped": self._counters["dropped"],
+                "flushed": self._counters["flushed"],
+                "failed": self._counters["failed"],
+                "discarded": self._counters["discarded"],
+                "grouped_only": self._counters["sampled_raw"],
+                "batches": self._counters["batches"],
+                "last_flush_at": self._last_flush,
+            }
+
+
+queue = ErrorLogQueue()
@@ -69,26 +69,3 @@ def allowed_file(filename):
     allowed = current_app.config.get("ALLOWED_EXTENSIONS", {"png", "jpg", "jpeg", "gif", "webp"})
     return "." in filename and filename.rsplit(".", 1)[1].lower() in allowed
 
-
-def serialize_row(row):
-    """Convert a database row dict to JSON-serializable format."""
-    if row is None:
-        return None
-    result = {}
-    for key, value in row.items():
-        if isinstance(value, datetime.datetime):
-            result[key] = value.isoformat()
-        elif isinstance(value, datetime.date):
-            result[key] = value.isoformat()
-        elif hasattr(value, "__float__"):
-            result[key] = float(value)
-        else:
-            result[key] = value
-    # Never expose password hash
-    result.pop("password_hash", None)
-    return result
-
-
-def serialize_rows(rows):
-    """Convert a list of database rows to JSON-serializable format."""
-    return [serialize_row(r) for r in rows]
@@ -0,0 +1,164 @@
+import base64
+import io
+import json
+import os
+
+from PIL import Image, ImageOps
+
+# Extensions that are re-encoded to WebP after upload
+CONVERTIBLE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".gif", ".bmp", ".tiff")
+
+# Longest edge of the inline low-quality placeholder (LQIP)
+PLACEHOLDER_EDGE = 20
+
+_EXIF_ORIENTATION = 0x0112
+
+
+def _target_size(size, max_edge):
+    """Return the (w, h) that fits `size` inside a `max_edge` square,
+    or None if the image is already small enough."""
+    width, height = size
+    longest = max(width, height)
+    if not max_edge or longest <= max_edge:
+        return None
+    scale = max_edge / float(longest)
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def open_for_webp(file_path, max_edge=None):
+    """Open an image and prepare it for WebP encoding.
+
+    With `max_edge` set this is the fast path for large camera photos:
+      - JPEGs are decoded at 1/2, 1/4 or 1/8 scale via draft() so a 48 MP
+        photo never gets fully decoded,
+      - the result is resampled so the longest edge is at most `max_edge`,
+      - EXIF orientation is applied on the already-reduced pixels.
+    EXIF/metadata is never copied to the output (see save_webp).
+
+    Without `max_edge` the image is decoded at native resolution (legacy).
+    """
+    img = Image.open(file_path)
+    if max_edge:
+        target = _target_size(img.size, max_edge)
+        if target:
+            # No-op for non-JPEG formats; keeps the decoder at >= target size
+            img.draft("RGB", target)
+            img.thumbnail((max_edge, max_edge), Image.LANCZOS, reducing_gap=2.0)
+        img = ImageOps.exif_transpose(img)
+
+    # Convert RGBA to RGB if needed (WebP supports RGBA but some modes cause issues)
+    if img.mode in ("RGBA", "LA", "P"):
+        return img.convert("RGBA")
+    if img.mode != "RGB":
+        return img.convert("RGB")
+    return img
+
+
+def save_webp(img, fp, quality=85):
+    """Encode `img` as WebP into a path or file object (metadata stripped)."""
+    img.save(fp, "WEBP", quality=quality, optimize=True)
+
+
+def convert_to_webp(file_path, quality=85, max_edge=None, remove_original=True):
+    """Convert an image file to WebP format for smaller file size.
+    Returns the new file path (with .webp extension).
+    Raises on failure — callers decide whether to fall back to the original."""
+    webp_path = os.path.splitext(file_path)[0] + ".webp"
+    img = open_for_webp(file_path, max_edge=max_edge)
+    try:
+        save_webp(img, webp_path, quality=quality)
+    finally:
+        img.close()
+    # Remove the original file if conversion succeeded and it's a different file
+    if remove_original and webp_path != file_path and os.path.exists(webp_path):
+        os.remove(file_path)
+    return webp_path
+
+
+def placeholder_data_uri(img, edge=PLACEHOLDER_EDGE):
+    """Return a tiny blurred-up WebP of `img` as a data: URI (~200-400 bytes)."""
+    thumb = img.copy()
+    thumb.thumbnail((edge, edge), Image.BILINEAR, reducing_gap=2.0)
+    buf = io.BytesIO()
+    thumb.save(buf, "WEBP", quality=30)
+    return "data:image/webp;base64," + base64.b64encode(buf.getvalue()).decode("ascii")
+
+
+def describe_image(file_path):
+    """Pixel dimensions + inline placeholder for a stored image.
+    Returns {"width", "height", "placeholder"}."""
+    with Image.open(file_path) as img:
+        width, height = img.size
+        # EXIF orientations 5-8 are rotated 90°: displayed width is the stored height
+        if img.getexif().get(_EXIF_ORIENTATION) in (5, 6, 7, 8):
+            width, height = height, width
+        # JPEGs can decode straight at placeholder scale
+        img.draft("RGB", (PLACEHOLDER_EDGE * 4, PLACEHOLDER_EDGE * 4))
+        upright = ImageOps.exif_transpose(img)
+        small = upright.convert("RGBA" if upright.mode in ("RGBA", "LA", "P") else "RGB")
+    return {"width": width, "height": height, "placeholder": placeholder_data_uri(small)}
+
+
+def parse_image_paths(image_path):
+    """products.image_path holds either a JSON array or a single path."""
+    if not image_path:
+        return []
+    if image_path.lstrip().startswith("["):
+        try:
+            paths = json.loads(image_path)
+        except (json.JSONDecodeError, TypeError):
+            return []
+        return [p for p in paths if isinstance(p, str)]
+    return [image_path]
+
+
+def build_image_meta(upload_folder, paths, existing=None):
+    """Map each public 'uploads/...' path to its describe_image() result.
+
+    Entries already present in `existing` (a dict or its JSON text) are reused,
+    so only newly uploaded photos get decoded. Missing or unreadable files are
+    skipped. Returns the JSON text for products.image_meta, or None.
+    """
+    if isinstance(existing, str):
+        try:
+            existing = json.loads(existing)
+        except (json.JSONDecodeError, TypeError):
+            existing = None
+    existing = existing if isinstance(existing, dict) else {}
+
+    meta = {}
+    for path in paths:
+        if not path:
+            continue
+        if path in existing:
+            meta[path] = existing[path]
+            continue
+        rel = path[len("uploads/"):] if path.startswith("uploads/") else path
+        try:
+            meta[path] = describe_image(os.path.join(upload_folder, rel))
+        except Exception:
+            continue
+    return json.dumps(meta) if meta else None
+
+
+def dhash(img, size=16):
+    """Difference hash: `size`² bits comparing horizontally adjacent pixels of
+    a grayscale thumbnail. Near-identical images differ in only a few bits."""
+    gray = img.convert("L").resize((size + 1, size), Image.BILINEAR)
+    pixels = list(gray.getdata())
+    value = 0
+    for row in range(size):
+        offset = row * (size + 1)
+        for col in range(size):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return value
+
+
+def normalize_screenshot(src_path, dest_path, quality=80):
+    """Re-encode an uploaded payment screenshot to WebP and return its dhash()."""
+    with Image.open(src_path) as img:
+        img = ImageOps.exif_transpose(img)
+        if img.mode != "RGB":
+            img = img.convert("RGB")
+        img.save(dest_path, "WEBP", quality=quality)
+        return dhash(img)
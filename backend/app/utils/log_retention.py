@@ -0,0 +1,149 @@
+"""
+Time-partitioned retention and daily rollups for the log tables.
+
+Log tables are RANGE-partitioned by day on their timestamp column
+(p20261019 holds 2026-10-19, p_history anything before the conversion,
+pmax anything later), so:
+
+- expiring a day is ALTER TABLE ... DROP PARTITION — a metadata operation,
+  not a DELETE scan;
+- queries with a date range only open the partitions it covers;
+- partitions are created ahead of time by REORGANIZE-ing the (empty) pmax.
+
+MySQL requires the partitioning column in every unique key, so converting a
+table changes its primary key to (id, <column>). The conversion rebuilds the
+table once and is done by the maintenance CLI (maintain_logs.py --partition),
+never at app start.
+
+Daily rollups (error_log_daily: day × error_type × browser × OS) are bumped at
+ingest by the error-log flusher, so they stay exact even though raw rows are
+sampled (error_groups.py) and expire; they are kept indefinitely for
+long-range reporting.
+"""
+import datetime
+
+# table -> partitioning column. auth_logs is only handled where it exists.
+PARTITIONED_TABLES = {
+    "error_logs": "occurred_at",
+    "auth_logs": "created_at",
+}
+
+ROLLUP_SQL = """
+    INSERT INTO error_log_daily (day, error_type, browser_name, os_name, occurrences)
+    VALUES (%s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE occurrences = occurrences + VALUES(occurrences)
+"""
+
+
+def _partition_name(day):
+    return f"p{day:%Y%m%d}"
+
+
+def _day_of(name):
+    try:
+        return datetime.datetime.strptime(name[1:], "%Y%m%d").date()
+    except ValueError:
+        return None
+
+
+def _value(row, key, index):
+    return row[key] if isinstance(row, dict) else row[index]
+
+
+def table_exists(cursor, table):
+    cursor.execute(
+        "SELECT COUNT(*) as c FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+        (table,),
+    )
+    return _value(cursor.fetchone(), "c", 0) > 0
+
+
+def partitions(cursor, table):
+    """Day partitions of `table` as {date: name}; None if not partitioned."""
+    cursor.execute(
+        """SELECT PARTITION_NAME as name FROM information_schema.PARTITIONS
+           WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND PARTITION_NAME IS NOT NULL""",
+        (table,),
+    )
+    names = [_value(row, "name", 0) for row in cursor.fetchall()]
+    if not names:
+        return None
+    return {day: name for name in names if (day := _day_of(name))}
+
+
+def partition_table(cursor, table, column, today, days_ahead):
+    """Convert `table` to daily RANGE partitions (one-off; rebuilds the table).
+    Existing rows before today land in p_history, which retention empties
+    once it is entirely past the cutoff."""
+    cursor.execute(f"ALTER TABLE {table} DROP PRIMARY KEY, ADD PRIMARY KEY (id, {column})")
+    specs = [f"PARTITION p_history VALUES LESS THAN (TO_DAYS('{today:%Y-%m-%d}'))"]
+    for offset in range(days_ahead + 1):
+        day = today + datetime.timedelta(days=offset)
+        upper = day + datetime.timedelta(days=1)
+        specs.append(f"PARTITION {_partition_name(day)} VALUES LESS THAN (TO_DAYS('{upper:%Y-%m-%d}'))")
+    specs.append("PARTITION pmax VALUES LESS THAN MAXVALUE")
+    cursor.execute(f"ALTER TABLE {table} PARTITION BY RANGE (TO_DAYS({column})) ({', '.join(specs)})")
+
+
+def add_future_partitions(cursor, table, today, days_ahead):
+    """Split pmax so every day up to today + days_ahead has its own partition.
+    Returns the names added."""
+    existing = partitions(cursor, table) or {}
+    last = max(existing) if existing else today - datetime.timedelta(days=1)
+    specs, added = [], []
+    day = last + datetime.timedelta(days=1)
+    while day <= today + datetime.timedelta(days=days_ahead):
+        upper = day + datetime.timedelta(days=1)
+        specs.append(f"PARTITION {_partition_name(day)} VALUES LESS THAN (TO_DAYS('{upper:%Y-%m-%d}'))")
+        added.append(_partition_name(day))
+        day = upper
+    if specs:
+        specs.append("PARTITION pmax VALUES LESS THAN MAXVALUE")
+        cursor.execute(f"ALTER TABLE {table} REORGANIZE PARTITION pmax INTO ({', '.join(specs)})")
+    return added
+
+
+def drop_expired(cursor, table, column, today, retention_days):
+    """Drop partitions older than the retention window. Falls back to a
+    batched DELETE for tables that haven't been partitioned yet. Returns a
+    description of what was removed."""
+    cutoff = today - datetime.timedelta(days=retention_days)
+    existing = partitions(cursor, table)
+    if existing is None:
+        deleted = 0
+        while True:
+            cursor.execute(f"DELETE FROM {table} WHERE {column} < %s LIMIT 10000", (cutoff,))
+            deleted += cursor.rowcount
+            cursor.connection.commit()
+            if cursor.rowcount < 10000:
+                break
+        return f"{deleted} rows deleted (table not partitioned)"
+
+    expired = [name for day, name in sorted(existing.items()) if day < cutoff]
+    if expired:
+        cursor.execute(f"ALTER TABLE {table} DROP PARTITION {', '.join(expired)}")
+    # p_history holds rows from before partitioning (and client timestamps
+    # from before it). It is emptied, not dropped: without a lowest partition
+    # such rows would have nowhere to go and fail the insert.
+    if existing and min(existing) <= cutoff:
+        cursor.execute(f"ALTER TABLE {table} TRUNCATE PARTITION p_history")
+    return f"{len(expired)} partitions dropped" + (f" ({expired[0]} … {expired[-1]})" if expired else "")
+
+
+def bump_daily(cursor, rows, columns):
+    """Add a batch of error_logs rows (tuples in `columns` order) to the
+    daily rollup. Runs inside the caller's transaction."""
+    idx = {name: i for i, name in enumerate(columns)}
+    counts = {}
+    for row in rows:
+        occurred = row[idx["occurred_at"]]
+        day = occurred.date() if isinstance(occurred, datetime.datetime) else datetime.date.today()
+        key = (
+            day,
+            (row[idx["error_type"]] or "")[:50],
+            (row[idx["browser_name"]] or "")[:100],
+            (row[idx["os_name"]] or "")[:100],
+        )
+        counts[key] = counts.get(key, 0) + 1
+    if counts:
+        cursor.executemany(ROLLUP_SQL, [key + (n,) for key, n in counts.items()])
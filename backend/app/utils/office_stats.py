@@ -0,0 +1,77 @@
+"""
+Per-office product/bid counters for the office dashboard and profile.
+
+One grouped query (products LEFT JOIN bids) replaces the separate COUNT /
+SUM round trips, and results are cached per office for OFFICE_STATS_CACHE_TTL
+seconds. product_changed / bid_placed drop the affected office's entry, so an
+office sees its own writes immediately.
+"""
+import threading
+import time
+
+from flask import current_app
+
+from ..signals import bid_placed, product_changed
+
+_cache = {}
+_lock = threading.Lock()
+
+# Expired entries are swept once the cache grows past this many offices
+_SWEEP_THRESHOLD = 1024
+
+
+def _query(cursor, office_id):
+    cursor.execute(
+        """SELECT COUNT(DISTINCT p.id) as total_products,
+                  COUNT(DISTINCT CASE WHEN p.status = 'approved' THEN p.id END) as approved_products,
+                  COUNT(DISTINCT CASE WHEN p.status = 'pending' THEN p.id END) as pending_products,
+                  COUNT(b.id) as total_bids,
+                  COALESCE(SUM(b.amount), 0) as total_volume
+           FROM products p
+           LEFT JOIN bids b ON b.product_id = p.id
+           WHERE p.office_id = %s""",
+        (office_id,),
+    )
+    row = cursor.fetchone()
+    return {
+        "total_products": row["total_products"] or 0,
+        "approved_products": row["approved_products"] or 0,
+        "pending_products": row["pending_products"] or 0,
+        "total_bids": row["total_bids"] or 0,
+        "total_volume": float(row["total_volume"] or 0),
+    }
+
+
+def get_office_stats(cursor, office_id):
+    """Return {total_products, approved_products, pending_products,
+    total_bids, total_volume} for one office (cached)."""
+    now = time.monotonic()
+    with _lock:
+        hit = _cache.get(office_id)
+    if hit and hit[0] > now:
+        return dict(hit[1])
+
+    stats = _query(cursor, office_id)
+    ttl = current_app.config["OFFICE_STATS_CACHE_TTL"]
+    with _lock:
+        if len(_cache) >= _SWEEP_THRESHOLD:
+            for key in [k for k, (expires, _) in _cache.items() if expires <= now]:
+                del _cache[key]
+        _cache[office_id] = (now + ttl, stats)
+    return dict(stats)
+
+
+def invalidate(office_id=None):
+    """Drop one office's cached stats, or all of them."""
+    with _lock:
+        if office_id is None:
+            _cache.clear()
+        else:
+            _cache.pop(office_id, None)
+
+
+@product_changed.connect
+@bid_placed.connect
+def _on_change(sender, **kwargs):
+    # Senders that don't know the office fall back to clearing everything
+    invalidate(kwargs.get("office_id"))
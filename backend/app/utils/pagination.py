@@ -0,0 +1,195 @@
+"""
+Shared list pagination for the admin/public list endpoints.
+
+    page = paginate(
+        cursor,
+        select="p.*, u.username as office_name",
+        from_where="FROM products p JOIN users u ON p.office_id = u.id WHERE p.status = %s",
+        params=["approved"],
+        order=(("p.created_at", "created_at"), ("p.id", "id")),
+        **page_params(request.args),
+    )
+    return jsonify({"auctions": serialize_rows(page.rows), **page.meta()})
+
+Totals come back in the same round trip as the rows (COUNT(*) OVER ()), so
+the filtered join is no longer executed twice per page. Keyset requests
+(?after=<next_cursor>) seek past the last row instead of using OFFSET; their
+total comes from a short-lived per-filter count cache. ?total=approx uses the
+optimizer's row estimate and ?total=none skips counting altogether.
+"""
+import base64
+import datetime
+import json
+import threading
+import time
+
+from flask import current_app
+
+TOTAL_MODES = ("exact", "approx", "none")
+
+_count_cache = {}
+_count_lock = threading.Lock()
+
+# Flipped off the first time the server rejects a window function (MySQL < 8.0)
+_window_supported = True
+
+
+class CursorError(ValueError):
+    """Malformed ?after= cursor."""
+
+
+class Page:
+    """One page of rows plus the pagination fields returned to the client."""
+
+    def __init__(self, rows, total, page, per_page, next_cursor):
+        self.rows = rows
+        self.total = total
+        self.page = page
+        self.per_page = per_page
+        self.next_cursor = next_cursor
+
+    def meta(self):
+        return {
+            "total": self.total,
+            "page": self.page,
+            "per_page": self.per_page,
+            "pages": (self.total + self.per_page - 1) // self.per_page if self.total is not None else None,
+            "next_cursor": self.next_cursor,
+        }
+
+
+def encode_cursor(values):
+    """Opaque keyset cursor for the sort-key values of a page's last row."""
+    values = [v.isoformat(sep=" ") if isinstance(v, (datetime.datetime, datetime.date)) else
+              float(v) if hasattr(v, "__float__") and not isinstance(v, int) else v
+              for v in values]
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip("=")
+
+
+def decode_cursor(token, size):
+    """Inverse of encode_cursor. Raises CursorError if malformed."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+    except (ValueError, TypeError):
+        raise CursorError("Invalid cursor")
+    if not isinstance(values, list) or len(values) != size:
+        raise CursorError("Invalid cursor")
+    return values
+
+
+def page_params(args, default_per_page=20):
+    """Read page / per_page / after / total from request args."""
+    total = args.get("total", "exact")
+    return {
+        "page": max(int(args.get("page", 1)), 1),
+        "per_page": max(int(args.get("per_page", default_per_page)), 1),
+        "after": args.get("after") or None,
+        "total": total if total in TOTAL_MODES else "exact",
+    }
+
+
+def _seek_clause(order, values, descending):
+    """(a, b, c) < (x, y, z) expanded so MySQL can range-scan the index."""
+    op = "<" if descending else ">"
+    clauses, params = [], []
+    for i, (expr, _key) in enumerate(order):
+        parts = [f"{order[j][0]} = %s" for j in range(i)] + [f"{expr} {op} %s"]
+        clauses.append("(" + " AND ".join(parts) + ")")
+        params.extend(values[:i] + [values[i]])
+    return "(" + " OR ".join(clauses) + ")", params
+
+
+def _count_sql(from_where, group_by):
+    if group_by:
+        return f"SELECT COUNT(*) as total FROM (SELECT 1 {from_where} {group_by}) as sub"
+    return f"SELECT COUNT(*) as total {from_where}"
+
+
+def count_rows(cursor, from_where, params, group_by=""):
+    """Exact count for a filter, cached for PAGINATION_COUNT_TTL seconds."""
+    sql = _count_sql(from_where, group_by)
+    key = (sql, tuple(params))
+    now = time.monotonic()
+    with _count_lock:
+        hit = _count_cache.get(key)
+    if hit and hit[0] > now:
+        return hit[1]
+    cursor.execute(sql, list(params))
+    total = cursor.fetchone()["total"]
+    ttl = current_app.config["PAGINATION_COUNT_TTL"]
+    with _count_lock:
+        if len(_count_cache) >= 1024:
+            for k in [k for k, (expires, _) in _count_cache.items() if expires <= now]:
+                del _count_cache[k]
+        _count_cache[key] = (now + ttl, total)
+    return total
+
+
+def estimate_rows(cursor, from_where, params):
+    """Optimizer row estimate for the driving table of a filter."""
+    cursor.execute(f"EXPLAIN SELECT 1 {from_where}", list(params))
+    plan = cursor.fetchall()
+    if not plan:
+        return 0
+    first = plan[0]
+    return int((first.get("rows") or 0) * float(first.get("filtered") or 100) / 100)
+
+
+def paginate(cursor, select, from_where, params, order, page=1, per_page=20, after=None,
+             total="exact", group_by="", descending=True):
+    """Fetch one page of `SELECT {select} {from_where} {group_by}`.
+
+    `from_where` must include a WHERE clause (keyset predicates are ANDed
+    onto it). `order` is a sequence of (sql_expr, row_key) pairs; the last
+    one must be unique (the primary key) so keyset cursors are stable.
+    Raises CursorError for a malformed `after`.
+    """
+    global _window_supported
+    params = list(params)
+    direction = "DESC" if descending else "ASC"
+    order_sql = "ORDER BY " + ", ".join(f"{expr} {direction}" for expr, _key in order)
+
+    where_sql, query_params = from_where, list(params)
+    if after:
+        seek_sql, seek_params = _seek_clause(order, decode_cursor(after, len(order)), descending)
+        where_sql += f" AND {seek_sql}"
+        query_params += seek_params
+
+    # The window count is only the total when no seek predicate narrows the rows
+    use_window = total == "exact" and not after and _window_supported
+    window_sql = "COUNT(*) OVER () as _total, " if use_window else ""
+    sql = f"SELECT {window_sql}{select} {where_sql} {group_by} {order_sql} LIMIT %s"
+    query_params.append(per_page)
+    if not after:
+        sql += " OFFSET %s"
+        query_params.append((page - 1) * per_page)
+
+    try:
+        cursor.execute(sql, query_params)
+    except Exception as e:
+        # 1064 = syntax error: server without window functions
+        if not use_window or e.args[:1] != (1064,):
+            raise
+        _window_supported = False
+        current_app.logger.warning("Window functions unavailable; pagination falls back to COUNT queries")
+        return paginate(cursor, select, from_where, params, order, page, per_page, after, total, group_by, descending)
+    rows = list(cursor.fetchall())
+
+    if use_window:
+        count = rows[0]["_total"] if rows else None
+        for row in rows:
+            del row["_total"]
+        if count is None:
+            # Page past the end; the window had no rows to report on
+            count = count_rows(cursor, from_where, params, group_by)
+    elif total == "exact":
+        count = count_rows(cursor, from_where, params, group_by)
+    elif total == "approx":
+        count = estimate_rows(cursor, from_where, params)
+    else:
+        count = None
+
+    next_cursor = None
+    if len(rows) == per_page:
+        next_cursor = encode_cursor([rows[-1][key] for _expr, key in order])
+    return Page(rows, count, page, per_page, next_cursor)
@@ -0,0 +1,143 @@
+"""
+Password hashing off the eventlet hub.
+
+Werkzeug's scrypt / PBKDF2 are deliberately slow, CPU-bound calls: made
+directly from a request they stall the single hub, and with it every socket,
+for the whole hash. Here every hash and check:
+
+- runs on a native thread (background.run_blocking: eventlet's tpool when the
+  hub is monkey-patched, a plain call otherwise);
+- takes one of PASSWORD_HASH_WORKERS slots first, so a login burst can't
+  occupy every native thread. Waiters park as green threads, and once
+  PASSWORD_HASH_MAX_WAITING are queued further requests fail fast with
+  HashPoolBusy (a 503) instead of piling up.
+
+The hash method is PASSWORD_HASH_METHOD (any Werkzeug method string, e.g.
+"scrypt" or "pbkdf2:sha256:600000"). A successful login whose stored hash
+uses different parameters gets a fresh hash (verify_password returns it),
+so tuning the cost migrates users as they sign in.
+
+stats() reports slots in use, queue depth and wait / hash times; see
+GET /api/auth/password-hash/stats.
+"""
+import collections
+import threading
+import time
+
+from flask import current_app
+from werkzeug.security import check_password_hash, generate_password_hash
+
+from .background import run_blocking
+
+
+class HashPoolBusy(Exception):
+    """Too many password hashes are already waiting for a worker."""
+
+
+class HashPool:
+    """Bounded slots for password hashing plus their metrics."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._slots = None
+        self._size = 0
+        self._waiting = 0
+        self._active = 0
+        self._counters = collections.Counter()
+        self._method_tags = {}  # configured method -> "<method>:<params>" prefix of its hashes
+
+    def _ensure_slots(self):
+        if self._slots is None:
+            with self._lock:
+                if self._slots is None:
+                    self._size = current_app.config["PASSWORD_HASH_WORKERS"]
+                    self._slots = threading.BoundedSemaphore(self._size)
+        return self._slots
+
+    def run(self, fn, *args):
+        """Call `fn(*args)` on a native thread once a slot is free."""
+        slots = self._ensure_slots()
+        with self._lock:
+            if self._waiting >= current_app.config["PASSWORD_HASH_MAX_WAITING"]:
+                self._counters["rejected"] += 1
+                raise HashPoolBusy("Too many sign-in attempts in progress, please retry")
+            self._waiting += 1
+            self._counters["max_waiting"] = max(self._counters["max_waiting"], self._waiting)
+        queued = time.perf_counter()
+        try:
+            slots.acquire()
+        finally:
+            # Also when the waiting green thread is killed or times out,
+            # or every waiting slot would leak and all logins get 503
+            with self._lock:
+                self._waiting -= 1
+        started = time.perf_counter()
+        with self._lock:
+            self._active += 1
+        try:
+            return run_blocking(fn, *args)
+        finally:
+            finished = time.perf_counter()
+            slots.release()
+            with self._lock:
+                self._active -= 1
+                self._counters["completed"] += 1
+                self._counters["wait_us"] += int((started - queued) * 1e6)
+                self._counters["hash_us"] += int((finished - started) * 1e6)
+
+    def method_tag(self, method):
+        """Method-and-parameters prefix Werkzeug writes for `method`
+        ("scrypt" -> "scrypt:32768:8:1"); one hash per process to learn it."""
+        tag = self._method_tags.get(method)
+        if tag is None:
+            tag = self.run(generate_password_hash, "", method).split("$", 1)[0]
+            self._method_tags[method] = tag
+        return tag
+
+    def count(self, name):
+        with self._lock:
+            self._counters[name] += 1
+
+    def stats(self):
+        with self._lock:
+            completed = self._counters["completed"]
+            return {
+                "workers": self._size,
+                "active": self._active,
+                "waiting": self._waiting,
+                "max_waiting": self._counters["max_waiting"],
+                "completed": completed,
+                "rejected": self._counters["rejected"],
+                "rehashed": self._counters["rehashed"],
+                "avg_wait_ms": round(self._counters["wait_us"] / completed / 1000, 2) if completed else 0,
+                "avg_hash_ms": round(self._counters["hash_us"] / completed / 1000, 2) if completed else 0,
+            }
+
+
+pool = HashPool()
+
+
+def hash_password(password):
+    """Hash with the configured PASSWORD_HASH_METHOD. Raises HashPoolBusy."""
+    return pool.run(generate_password_hash, password, current_app.config["PASSWORD_HASH_METHOD"])
+
+
+def needs_rehash(stored_hash):
+    method = current_app.config["PASSWORD_HASH_METHOD"]
+    return (stored_hash or "").split("$", 1)[0] != pool.method_tag(method)
+
+
+def verify_password(stored_hash, password):
+    """(matches, new_hash). new_hash is set when the password matched but
+    the stored hash uses outdated parameters; the caller should store it.
+    Raises HashPoolBusy."""
+    if not stored_hash or not pool.run(check_password_hash, stored_hash, password):
+        return False, None
+    if not needs_rehash(stored_hash):
+        return True, None
+    pool.count("rehashed")
+    return True, hash_password(password)
+
+
+def stats():
+    return pool.stats()
@@ -0,0 +1,174 @@
+"""
+platform_stats — single-row rollup behind the admin dashboard.
+
+Write paths apply deltas inside their own transaction (bump / product_deltas
+/ user_deltas), so the dashboard read is one primary-key lookup. Anything the
+deltas don't see (FK cascades on user delete, manual SQL) is corrected by
+reconcile(), which recomputes every counter from the base tables; the
+dashboard triggers it in the background once the last reconcile is older
+than STATS_RECONCILE_INTERVAL.
+"""
+import threading
+
+from flask import current_app
+
+from .background import spawn
+
+COUNTERS = (
+    "total_users", "total_offices", "pending_offices",
+    "live_auctions", "pending_auctions", "closed_auctions", "total_products",
+    "two_wheeler", "three_wheeler", "four_wheeler", "commercial",
+    "total_volume", "total_auction_value", "pending_payments",
+)
+
+_STATUS_COUNTER = {"approved": "live_auctions", "pending": "pending_auctions", "rejected": "closed_auctions"}
+_CATEGORY_COUNTER = {"2W": "two_wheeler", "3W": "three_wheeler", "4W": "four_wheeler", "Commercial": "commercial"}
+
+_reconciling = threading.Lock()
+
+
+def bump(cursor, **deltas):
+    """Apply counter deltas (e.g. total_volume=1500.0) to the rollup row."""
+    deltas = {k: v for k, v in deltas.items() if v}
+    if not deltas:
+        return
+    unknown = set(deltas) - set(COUNTERS)
+    if unknown:
+        raise ValueError(f"Unknown platform_stats counters: {sorted(unknown)}")
+    set_clause = ", ".join(f"{k} = {k} + %s" for k in deltas)
+    cursor.execute(f"UPDATE platform_stats SET {set_clause} WHERE id = 1", list(deltas.values()))
+
+
+def _add(deltas, key, amount):
+    if key:
+        deltas[key] = deltas.get(key, 0) + amount
+
+
+def product_snapshot(cursor, product_id):
+    """The fields of a product that feed the rollup, or None if it doesn't exist."""
+    cursor.execute(
+        """SELECT p.office_id, p.status, p.category,
+                  COALESCE((SELECT MAX(b.amount) FROM bids b WHERE b.product_id = p.id), p.starting_price) AS value
+           FROM products p WHERE p.id = %s""",
+        (product_id,),
+    )
+    return cursor.fetchone()
+
+
+def product_deltas(before, after):
+    """Counter deltas for a product going from `before` to `after`
+    (product_snapshot dicts; None for insert/delete)."""
+    deltas = {}
+    for snap, sign in ((before, -1), (after, 1)):
+        if not snap:
+            continue
+        _add(deltas, "total_products", sign)
+        _add(deltas, _STATUS_COUNTER.get(snap["status"]), sign)
+        if snap["status"] == "approved":
+            _add(deltas, _CATEGORY_COUNTER.get(snap["category"]), sign)
+            _add(deltas, "total_auction_value", sign * float(snap["value"] or 0))
+    return deltas
+
+
+def user_snapshot(cursor, user_id):
+    cursor.execute("SELECT role, status FROM users WHERE id = %s", (user_id,))
+    return cursor.fetchone()
+
+
+def user_deltas(before, after):
+    """Counter deltas for a user going from `before` to `after`
+    ({role, status} dicts; None for insert/delete)."""
+    deltas = {}
+    for snap, sign in ((before, -1), (after, 1)):
+        if not snap:
+            continue
+        if snap["role"] == "user":
+            _add(deltas, "total_users", sign)
+        elif snap["role"] == "office" and snap["status"] == "active":
+            _add(deltas, "total_offices", sign)
+        elif snap["role"] == "office" and snap["status"] == "pending":
+            _add(deltas, "pending_offices", sign)
+    return deltas
+
+
+def payment_deltas(before_status, after_status):
+    deltas = {}
+    _add(deltas, "pending_payments", (after_status == "verifying") - (before_status == "verifying"))
+    return deltas
+
+
+def reconcile(cursor):
+    """Recompute every counter from the base tables and overwrite the row."""
+    cursor.execute("""
+        SELECT
+            (SELECT COUNT(*) FROM users WHERE role = 'user') as total_users,
+            (SELECT COUNT(*) FROM users WHERE role = 'office' AND status = 'active') as total_offices,
+            (SELECT COUNT(*) FROM users WHERE role = 'office' AND status = 'pending') as pending_offices,
+            (SELECT COALESCE(SUM(amount), 0) FROM bids) as total_volume,
+            (SELECT COUNT(*) FROM transactions WHERE payment_status = 'verifying') as pending_payments
+    """)
+    values = dict(cursor.fetchone())
+
+    cursor.execute("""
+        SELECT p.status, p.category, COUNT(*) as c,
+               COALESCE(SUM(COALESCE(mb.current_bid, p.starting_price)), 0) as value
+        FROM products p
+        LEFT JOIN (SELECT product_id, MAX(amount) as current_bid FROM bids GROUP BY product_id) mb
+            ON p.id = mb.product_id
+        GROUP BY p.status, p.category
+    """)
+    for key in ("total_products", "total_auction_value", *_STATUS_COUNTER.values(), *_CATEGORY_COUNTER.values()):
+        values[key] = 0
+    for row in cursor.fetchall():
+        values["total_products"] += row["c"]
+        if row["status"] in _STATUS_COUNTER:
+            values[_STATUS_COUNTER[row["status"]]] += row["c"]
+        if row["status"] == "approved":
+            values["total_auction_value"] += float(row["value"])
+            if row["category"] in _CATEGORY_COUNTER:
+                values[_CATEGORY_COUNTER[row["category"]]] += row["c"]
+
+    cols = ", ".join(COUNTERS)
+    placeholders = ", ".join(["%s"] * len(COUNTERS))
+    updates = ", ".join(f"{k} = VALUES({k})" for k in COUNTERS)
+    cursor.execute(
+        f"""INSERT INTO platform_stats (id, {cols}, reconciled_at) VALUES (1, {placeholders}, NOW())
+            ON DUPLICATE KEY UPDATE {updates}, reconciled_at = NOW()""",
+        [values[k] for k in COUNTERS],
+    )
+    return values
+
+
+def _reconcile_in_background():
+    from .. import db
+    if not _reconciling.acquire(blocking=False):
+        return  # another reconcile is already running in this process
+    try:
+        conn = db.get_db()
+        cursor = conn.cursor()
+        try:
+            reconcile(cursor)
+            conn.commit()
+        finally:
+            cursor.close()
+            conn.close()
+    finally:
+        _reconciling.release()
+
+
+def read(cursor):
+    """Return the rollup row, reconciling synchronously if it doesn't exist yet
+    and in the background if it's due."""
+    cursor.execute(
+        """SELECT *, TIMESTAMPDIFF(SECOND, reconciled_at, NOW()) as reconciled_age
+           FROM platform_stats WHERE id = 1"""
+    )
+    row = cursor.fetchone()
+    if not row:
+        reconcile(cursor)
+        cursor.connection.commit()
+        return read(cursor)
+    interval = current_app.config["STATS_RECONCILE_INTERVAL"]
+    if row["reconciled_age"] is None or row["reconciled_age"] >= interval:
+        spawn(_reconcile_in_background)
+    return row
@@ -0,0 +1,63 @@
+"""
+Column projections for product listings (?fields=).
+
+    ?fields=card                      named projection
+    ?fields=name,starting_price,...   explicit column list
+    (no fields)                       every column, as before
+
+Card grids only need a title, thumbnail and price, so skipping description
+TEXT, document paths and owner details cuts DB I/O, serialization time and
+payload size. `id` is always included; list endpoints also force their sort
+keys so keyset cursors keep working.
+"""
+
+PRODUCT_COLUMNS = (
+    "id", "office_id", "name", "description", "image_path", "image_meta",
+    "starting_price", "quoted_price", "category", "state", "bid_end_date",
+    "vehicle_year", "mileage", "fuel_type", "transmission", "owner_name",
+    "registration_number", "rc_available", "rc_image", "insurance_available",
+    "insurance_image", "status", "is_active", "winner_user_id", "closed_at",
+    "created_at",
+)
+
+PROJECTIONS = {
+    # Listing cards: title, thumbnail, price and the filters shown on the card
+    "card": (
+        "id", "office_id", "name", "image_path", "image_meta", "starting_price",
+        "quoted_price", "category", "state", "bid_end_date", "vehicle_year",
+        "mileage", "fuel_type", "transmission", "status", "is_active", "created_at",
+    ),
+    # Public detail view: everything except owner identity and document scans
+    "detail": tuple(c for c in PRODUCT_COLUMNS if c not in (
+        "owner_name", "registration_number", "rc_image", "insurance_image",
+    )),
+    "admin": PRODUCT_COLUMNS,
+}
+
+
+class FieldsError(ValueError):
+    """Unknown projection or column in ?fields=."""
+
+
+def resolve_fields(value, named_only=False):
+    """Columns for a ?fields= value, or None for "all columns"."""
+    value = (value or "").strip()
+    if not value:
+        return None
+    if value in PROJECTIONS:
+        return PROJECTIONS[value]
+    if named_only:
+        raise FieldsError(f"fields must be one of: {', '.join(PROJECTIONS)}")
+    columns = [c.strip() for c in value.split(",") if c.strip()]
+    unknown = [c for c in columns if c not in PRODUCT_COLUMNS]
+    if unknown:
+        raise FieldsError(f"Unknown fields: {', '.join(unknown)}")
+    return tuple(columns)
+
+
+def select_columns(columns, alias="p", required=("id",)):
+    """SQL select list for `columns` (None → alias.*), always including `required`."""
+    if columns is None:
+        return f"{alias}.*"
+    wanted = list(columns) + [c for c in required if c not in columns]
+    return ", ".join(f"{alias}.{c}" for c in wanted)
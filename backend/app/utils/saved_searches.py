@@ -0,0 +1,310 @@
+"""
+Saved searches and the reverse-match (percolator) engine behind their alerts.
+
+A saved search stores the same filters get_auctions takes (the facets from
+utils/facets.py plus an optional ?search= text), as JSON:
+
+    {"category": ["2W"], "year": [2019, 2020], "price": ["50000-100000"], "search": "pulsar"}
+
+When a product is approved it is matched against every saved search without
+evaluating each one:
+
+- each search is filed in an in-process reverse index under composite keys:
+  (its facet constraints as a tuple of (facet, value), one entry per
+  combination of OR-ed values, + the 1–3 char prefix of its longest text
+  term or None); a facet with too many values for the cross product is left
+  out of the key and only verified;
+- a product looks up every subset of its own facet values (at most 2^6)
+  paired with None and with those of its token prefixes that some search
+  uses, so the candidates are searches whose keyed constraints it already
+  satisfies;
+- only the unkeyed parts (remaining terms, dropped facets) are verified, so
+  matching is proportional to the candidates, not to the number of saved
+  searches.
+
+Matches become rows in `notifications` (INSERT IGNORE on (saved_search_id,
+product_id), so re-approving doesn't notify twice) and are pushed to the
+owners' "user_<id>" socket rooms. The index is maintained on create/delete in
+this process and rebuilt every SAVED_SEARCH_REBUILD_INTERVAL seconds.
+"""
+import itertools
+import json
+import threading
+import time
+
+from flask import current_app
+
+from .background import spawn
+from .facets import FACETS, PRICE_BUCKETS, TEXT_FACETS, FacetError, normalize_value, price_bucket
+from .search import MAX_QUERY_TERMS, SEARCH_SOURCE_COLUMNS, build_search_text
+from .vehicle_category import tokenize
+
+# Facet order inside composite keys
+KEY_FACETS = ("category", "state", "fuel_type", "transmission", "year", "price")
+
+# Query terms are keyed on term[:PREFIX]; products generate prefixes up to it
+PREFIX = 3
+
+# Most keys one search may be filed under (product of OR-ed value counts)
+MAX_KEYS = 32
+
+MAX_PER_USER = 20
+
+_PRICE_KEYS = frozenset(key for key, _, _ in PRICE_BUCKETS)
+
+_PRODUCT_SQL = f"""
+    SELECT p.id, p.starting_price, COALESCE(p.state, u.state) as display_state,
+           {", ".join(f"p.{c}" for c in SEARCH_SOURCE_COLUMNS)}
+    FROM products p
+    JOIN users u ON p.office_id = u.id
+    WHERE p.id = %s AND p.status = 'approved'
+"""
+
+
+def normalize_query(data):
+    """Validated, canonical query dict from a request body. Raises FacetError."""
+    if not isinstance(data, dict):
+        raise FacetError("query must be an object")
+    query = {}
+    for facet in FACETS:
+        values = data.get(facet)
+        if values in (None, "", []):
+            continue
+        if not isinstance(values, list):
+            values = [v.strip() for v in str(values).split(",") if v.strip()]
+        if facet == "year":
+            try:
+                values = [int(v) for v in values]
+            except (TypeError, ValueError):
+                raise FacetError("year must be a number")
+        elif facet == "price":
+            values = [str(v) for v in values]
+            if any(v not in _PRICE_KEYS for v in values):
+                raise FacetError("Unknown price range")
+        else:
+            values = [v for v in (normalize_value(v) for v in values) if v is not None]
+            if not values:
+                continue
+        query[facet] = sorted(set(values), key=str)
+    terms = _query_terms(data.get("search"))
+    if terms:
+        query["search"] = " ".join(terms)
+    if not query:
+        raise FacetError("A saved search needs at least one filter or search term")
+    return query
+
+
+def _query_terms(text):
+    terms = []
+    for token in tokenize(text):
+        token = token.replace("-", "")
+        if token and token not in terms:
+            terms.append(token)
+    return terms[:MAX_QUERY_TERMS]
+
+
+def _normalized(query):
+    """`query` with its text facet values normalized like facets.py does, so
+    searches stored before normalization still match."""
+    query = dict(query)
+    for facet in TEXT_FACETS:
+        if query.get(facet):
+            query[facet] = sorted({v for v in map(normalize_value, query[facet]) if v is not None})
+    return query
+
+
+def _product_facts(row):
+    """(facet values, token set) for a product row from _PRODUCT_SQL."""
+    values = {
+        "category": normalize_value(row["category"]),
+        "state": normalize_value(row["display_state"]),
+        "fuel_type": normalize_value(row["fuel_type"]),
+        "transmission": normalize_value(row["transmission"]),
+        "year": row["vehicle_year"],
+        "price": price_bucket(row["starting_price"]),
+    }
+    tokens = {t.rstrip("_") for t in (build_search_text(row) or "").split()}
+    tokens.discard("")
+    return values, tokens
+
+
+def _matches(query, values, tokens):
+    for facet in FACETS:
+        wanted = query.get(facet)
+        if wanted and values[facet] not in wanted:
+            return False
+    for term in _query_terms(query.get("search")):
+        if not any(token.startswith(term) for token in tokens):
+            return False
+    return True
+
+
+def _product_of(numbers):
+    result = 1
+    for n in numbers:
+        result *= n
+    return result
+
+
+class Percolator:
+    """Reverse index: (facet combo, term prefix) -> {saved search id: (user_id, name, query, exact)}."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._rebuilding = threading.Lock()
+        self._postings = {}
+        self._anchors = {}  # saved search id -> keys it is filed under
+        self._prefixes = {}  # term prefix -> number of keys using it
+        self._built_at = None
+
+    @staticmethod
+    def _keys_for(query):
+        facets = [f for f in KEY_FACETS if query.get(f)]
+        # Leave the widest facets out of the key until the cross product fits
+        while facets and _product_of(len(query[f]) for f in facets) > MAX_KEYS:
+            facets.remove(max(facets, key=lambda f: len(query[f])))
+        terms = _query_terms(query.get("search"))
+        # Longest term: fewest products share its prefix
+        prefix = max(terms, key=len)[:PREFIX] if terms else None
+        combos = itertools.product(*[[(f, v) for v in query[f]] for f in facets])
+        # Exact: the key alone proves a match (no terms, no facet left out)
+        exact = not terms and len(facets) == sum(1 for f in KEY_FACETS if query.get(f))
+        return [(combo, prefix) for combo in combos], exact
+
+    def _product_keys(self, values, tokens):
+        items = [(f, values[f]) for f in KEY_FACETS if values[f] is not None]
+        subsets = [combo for n in range(len(items) + 1) for combo in itertools.combinations(items, n)]
+        prefixes = [None] + [
+            p for p in {t[:n] for t in tokens for n in range(1, min(PREFIX, len(t)) + 1)}
+            if p in self._prefixes
+        ]
+        return [(combo, prefix) for combo in subsets for prefix in prefixes]
+
+    def add(self, search_id, user_id, name, query):
+        query = _normalized(query)
+        with self._lock:
+            self._remove(search_id)
+            keys, exact = self._keys_for(query)
+            for key in keys:
+                self._postings.setdefault(key, {})[search_id] = (user_id, name, query, exact)
+                if key[1] is not None:
+                    self._prefixes[key[1]] = self._prefixes.get(key[1], 0) + 1
+            self._anchors[search_id] = keys
+
+    def _remove(self, search_id):
+        for key in self._anchors.pop(search_id, ()):
+            posting = self._postings.get(key)
+            if posting is not None:
+                posting.pop(search_id, None)
+                if not posting:
+                    del self._postings[key]
+            if key[1] is not None:
+                self._prefixes[key[1]] -= 1
+                if not self._prefixes[key[1]]:
+                    del self._prefixes[key[1]]
+
+    def remove(self, search_id):
+        with self._lock:
+            self._remove(search_id)
+
+    def rebuild(self, cursor):
+        """Reload every active saved search. Returns the number indexed."""
+        cursor.execute("SELECT id, user_id, name, query FROM saved_searches WHERE notify = TRUE")
+        rows = cursor.fetchall()
+        fresh = Percolator()
+        for row in rows:
+            try:
+                query = json.loads(row["query"])
+            except (TypeError, ValueError):
+                continue
+            fresh.add(row["id"], row["user_id"], row["name"], query)
+        with self._lock:
+            self._postings, self._anchors, self._prefixes = fresh._postings, fresh._anchors, fresh._prefixes
+            self._built_at = time.monotonic()
+        return len(fresh._anchors)
+
+    def ensure_fresh(self, cursor):
+        if self._built_at is None:
+            with self._rebuilding:
+                if self._built_at is None:
+                    self.rebuild(cursor)
+        elif self._stale():
+            with self._rebuilding:
+                # Another caller may have rebuilt while we waited for the lock
+                if self._stale():
+                    self.rebuild(cursor)
+
+    def _stale(self):
+        built_at = self._built_at
+        return built_at is None or time.monotonic() - built_at >= current_app.config["SAVED_SEARCH_REBUILD_INTERVAL"]
+
+    def match(self, row):
+        """[(search_id, user_id, name)] of saved searches matching a product row."""
+        values, tokens = _product_facts(row)
+        found = []
+        with self._lock:
+            candidates = {}
+            for key in self._product_keys(values, tokens):
+                posting = self._postings.get(key)
+                if posting:
+                    candidates.update(posting)
+        for search_id, (user_id, name, query, exact) in candidates.items():
+            if exact or _matches(query, values, tokens):
+                found.append((search_id, user_id, name))
+        return found
+
+
+percolator = Percolator()
+
+
+def percolate_product(product_id):
+    """Match an approved product against every saved search, store
+    notifications and push them. Runs in the background (see notify_matches)."""
+    from .. import db
+    from ..socket_events import notify_user
+
+    conn = db.get_db()
+    cursor = conn.cursor()
+    try:
+        percolator.ensure_fresh(cursor)
+        cursor.execute(_PRODUCT_SQL, (product_id,))
+        row = cursor.fetchone()
+        if not row:
+            return 0
+        matches = percolator.match(row)
+        if not matches:
+            return 0
+        title = "New match for your saved search"
+        created = []
+        for search_id, user_id, name in matches:
+            cursor.execute(
+                """INSERT IGNORE INTO notifications (user_id, type, title, message, product_id, saved_search_id)
+                   VALUES (%s, 'saved_search', %s, %s, %s, %s)""",
+                (user_id, title, f"{row['name']} matches \"{name}\"", product_id, search_id),
+            )
+            if cursor.rowcount:
+                created.append((cursor.lastrowid, user_id, search_id, name))
+        if created:
+            cursor.execute(
+                f"UPDATE saved_searches SET last_notified_at = NOW() WHERE id IN ({', '.join(['%s'] * len(created))})",
+                [search_id for _, _, search_id, _ in created],
+            )
+        conn.commit()
+        for notification_id, user_id, search_id, name in created:
+            notify_user(user_id, "notification", {
+                "id": notification_id,
+                "type": "saved_search",
+                "title": title,
+                "message": f"{row['name']} matches \"{name}\"",
+                "product_id": product_id,
+                "saved_search_id": search_id,
+            })
+        return len(created)
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def notify_matches(product_id):
+    """Percolate `product_id` in the background; call after committing its approval."""
+    spawn(percolate_product, product_id)
@@ -0,0 +1,114 @@
+"""
+Product / office text search on MySQL FULLTEXT indexes.
+
+products.search_text is a denormalized, pre-tokenized copy of the searchable
+fields, written on every product insert/update and indexed FULLTEXT. It exists
+because InnoDB's parser can't handle vehicle names well by itself:
+
+- tokens shorter than innodb_ft_min_token_size (3) are never indexed, so
+  "RE", "FZ" or "V8" are padded with "_" ("re_") — "_" is a word character
+  for the FULLTEXT parser and queries use prefix terms ("re*"), which match;
+- hyphenated models ("classic-350") are indexed joined and split;
+- registration numbers are indexed compact ("tn09ab1234") and by part, so
+  "TN09AB", "TN 09 AB 1234" and "1234" all match;
+- the name is written twice so it outweighs description matches.
+
+Queries run in BOOLEAN MODE with every term required and prefix-matched
+(search-as-you-type); relevance is MATCH()'s score.
+"""
+import re
+
+from .vehicle_category import tokenize
+
+# innodb_ft_min_token_size default
+MIN_TOKEN_SIZE = 3
+MAX_QUERY_TERMS = 8
+
+_REG_RE = re.compile(r"[^a-z0-9]")
+
+
+def _index_token(token):
+    if len(token) < MIN_TOKEN_SIZE:
+        return token + "_" * (MIN_TOKEN_SIZE - len(token))
+    return token
+
+
+def index_tokens(text):
+    """Tokens to store for `text` (hyphenated tokens joined and split)."""
+    out = []
+    for token in tokenize(text):
+        if "-" in token:
+            out.append(token.replace("-", ""))
+            out.extend(token.split("-"))
+        else:
+            out.append(token)
+    return [_index_token(t) for t in out if t]
+
+
+def build_search_text(product):
+    """products.search_text for a dict with the product's fields (missing keys are fine)."""
+    parts = index_tokens(product.get("name")) * 2
+    registration = _REG_RE.sub("", (product.get("registration_number") or "").lower())
+    if registration:
+        parts.append(registration)
+        parts.extend(index_tokens(product.get("registration_number")))
+    for key in ("category", "state", "fuel_type", "transmission", "vehicle_year"):
+        value = product.get(key)
+        if value not in (None, ""):
+            parts.extend(index_tokens(str(value)))
+    parts.extend(index_tokens(product.get("description")))
+    return " ".join(parts) or None
+
+
+def boolean_query(q):
+    """BOOLEAN MODE query for user input ('+tok* +tok2*'), or None if it has no terms.
+    Terms are [a-z0-9] only, so the result is safe to inline."""
+    terms = []
+    for token in tokenize(q):
+        token = token.replace("-", "")
+        if token and token not in terms:
+            terms.append(token)
+    if not terms:
+        return None
+    return " ".join(f"+{t}*" for t in terms[:MAX_QUERY_TERMS])
+
+
+def match_expr(columns, query):
+    """MATCH ... AGAINST expression for a boolean_query() result."""
+    return f"MATCH({columns}) AGAINST ('{query}' IN BOOLEAN MODE)"
+
+
+# Product columns search_text is built from
+SEARCH_SOURCE_COLUMNS = (
+    "name", "description", "registration_number", "category", "state",
+    "fuel_type", "transmission", "vehicle_year",
+)
+
+
+def backfill_search_text(cursor, batch_size=1000, only_missing=True, on_batch=None):
+    """Fill products.search_text in id order. Works with tuple or dict
+    cursors. `on_batch(last_id, written)` runs after each batch (e.g. to
+    commit); otherwise the caller commits. Returns the number of rows written."""
+    columns = ("id",) + SEARCH_SOURCE_COLUMNS
+    last_id = 0
+    written = 0
+    while True:
+        cursor.execute(
+            f"""SELECT {", ".join(columns)} FROM products
+                WHERE id > %s {"AND search_text IS NULL" if only_missing else ""}
+                ORDER BY id LIMIT %s""",
+            (last_id, batch_size),
+        )
+        rows = cursor.fetchall()
+        if not rows:
+            break
+        rows = [row if isinstance(row, dict) else dict(zip(columns, row)) for row in rows]
+        last_id = rows[-1]["id"]
+        cursor.executemany(
+            "UPDATE products SET search_text = %s WHERE id = %s",
+            [(build_search_text(row), row["id"]) for row in rows],
+        )
+        written += len(rows)
+        if on_batch:
+            on_batch(last_id, written)
+    return written
@@ -0,0 +1,166 @@
+"""
+Row serialization and the app's JSON provider.
+
+serialize_rows() used to run an isinstance / hasattr chain on every value of
+every row. MySQL result columns are homogeneous, so the work per column is
+decided once per result shape (column names + the first row's value types):
+columns holding datetimes, dates or Decimals get a converter, everything
+else is copied as-is. A value whose type differs from its column's planned
+type (an int 0 default in a Decimal SUM column, say) goes through the
+generic per-value rules instead. Compiled plans are cached by shape, so a list endpoint
+pays the sniffing cost once per process. Plain ints now stay ints (they used
+to become floats, which parses to the same JSON number client-side).
+
+FastJSONProvider encodes with orjson when it is installed (stdlib json
+otherwise) and never sorts keys.
+"""
+import datetime
+import decimal
+import json
+import threading
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+# Never sent to clients (search_text is an internal FULLTEXT column)
+HIDDEN_COLUMNS = frozenset({"password_hash", "search_text"})
+
+_CONVERTERS = {
+    datetime.datetime: datetime.datetime.isoformat,
+    datetime.date: datetime.date.isoformat,
+    decimal.Decimal: float,
+    bool: float,  # as before: anything with __float__ except plain int/float
+}
+
+_plans = {}
+_plans_lock = threading.Lock()
+_MAX_PLANS = 512
+
+
+def _generic(value):
+    """Per-value conversion for columns (or rows) without a compiled plan."""
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    if value.__class__ in (int, float, str) or value is None:
+        return value
+    if hasattr(value, "__float__"):
+        return float(value)
+    return value
+
+
+def _compile(keys, rows):
+    """Build (plain, converted) for a result shape: plain columns are
+    (key, type) pairs copied as-is, converted ones (key, fn, type) triples;
+    type is None where any value is accepted. A column whose type can't be
+    seen yet (all NULL so far) falls back to the generic per-value rules."""
+    undecided = {k for k in keys if k not in HIDDEN_COLUMNS}
+    chosen, types = {}, {}
+    for row in rows:
+        for key in list(undecided):
+            value = row[key]
+            if value is not None:
+                cls = value.__class__
+                chosen[key] = _CONVERTERS.get(cls, None if cls in (int, float, str) else _generic)
+                types[key] = None if chosen[key] is _generic else cls
+                undecided.discard(key)
+        if not undecided:
+            break
+    for key in undecided:
+        chosen[key] = _generic
+        types[key] = None
+
+    plain = tuple((k, types[k]) for k in keys if k in chosen and chosen[k] is None)
+    converted = tuple((k, chosen[k], types[k]) for k in keys if chosen.get(k) is not None)
+    # Only cache plans where every column was decided from real values
+    return (plain, converted), not undecided
+
+
+def _plan_for(keys, rows):
+    shape = (keys, tuple(v.__class__ for v in rows[0].values()))
+    plan = _plans.get(shape)
+    if plan is not None:
+        return plan
+    plan, complete = _compile(keys, rows)
+    if complete:
+        with _plans_lock:
+            if len(_plans) >= _MAX_PLANS:
+                _plans.clear()
+            _plans[shape] = plan
+    return plan
+
+
+def serialize_rows(rows):
+    """Convert a list of database rows to JSON-serializable dicts
+    (datetimes/dates → ISO strings, Decimals → float, password_hash dropped)."""
+    if not rows:
+        return []
+    keys = tuple(rows[0])
+    plain, converted = _plan_for(keys, rows)
+    out = []
+    for row in rows:
+        try:
+            if len(row) != len(keys):
+                raise KeyError
+            result = {}
+            for key, cls in plain:
+                value = row[key]
+                result[key] = value if value.__class__ is cls or value is None else _generic(value)
+            for key, fn, cls in converted:
+                value = row[key]
+                if value is None:
+                    result[key] = None
+                elif cls is None or value.__class__ is cls:
+                    result[key] = fn(value)
+                else:
+                    result[key] = _generic(value)
+        except KeyError:
+            result = serialize_row(row)  # differently shaped row; rare
+        out.append(result)
+    return out
+
+
+def serialize_row(row):
+    """Convert a database row dict to JSON-serializable format."""
+    if row is None:
+        return None
+    return {k: _generic(v) for k, v in row.items() if k not in HIDDEN_COLUMNS}
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """JSON provider using orjson when available; keys keep insertion order."""
+
+    sort_keys = False
+
+    def dumps(self, obj, **kwargs):
+        if orjson is not None and not kwargs:
+            return orjson.dumps(
+                obj,
+                default=self.default,
+                option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME,
+            ).decode()
+        kwargs.setdefault("default", self.default)
+        kwargs.setdefault("ensure_ascii", self.ensure_ascii)
+        kwargs.setdefault("sort_keys", self.sort_keys)
+        kwargs.setdefault("separators", (",", ":"))
+        return json.dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        if orjson is not None:
+            body = orjson.dumps(
+                obj,
+                default=self.default,
+                option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME,
+            )
+        else:
+            body = self.dumps(obj)
+        return self._app.response_class(body, mimetype=self.mimetype)
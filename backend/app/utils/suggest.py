@@ -0,0 +1,236 @@
+"""
+Typeahead suggestions for the public search box (/api/public/suggest?q=).
+
+An in-process prefix index over approved product names, the vehicle brands
+they mention (the classifier's brand dictionary), office locations and
+states, so keystrokes never reach MySQL:
+
+- every phrase is stored under each of its word starts ("royal enfield
+  classic 350" is also found by "classic" and "350") in one sorted list of
+  (key, kind, norm) tuples; a lookup is a bisect plus a short forward scan;
+- suggestions are ranked by how many listings / offices carry them;
+- product_changed marks a product dirty; dirty products are re-read in one
+  IN query on the next lookup and their phrases re-counted in place
+  (bisect.insort / del), no rebuild;
+- a full rebuild runs in the background every SUGGEST_REBUILD_INTERVAL
+  seconds for what signals don't cover (office profile edits, cascades).
+"""
+import bisect
+import threading
+import time
+
+from flask import current_app
+
+from ..signals import product_changed
+from .background import spawn
+from .vehicle_category import brand_names, tokenize
+
+KINDS = ("vehicle", "brand", "location", "state")
+
+# Matches looked at per lookup before ranking; bounds short prefixes like "a"
+SCAN_LIMIT = 400
+
+_PRODUCT_SQL = """
+    SELECT p.id, p.name, COALESCE(p.state, u.state) as state
+    FROM products p
+    JOIN users u ON p.office_id = u.id
+    WHERE p.status = 'approved'
+"""
+
+_OFFICE_SQL = """
+    SELECT location, state FROM users
+    WHERE role = 'office' AND status = 'active'
+"""
+
+
+def normalize(text):
+    return " ".join(tokenize(text))
+
+
+_BRANDS = frozenset(brand_names())
+
+
+def _brand_display(brand):
+    return brand.title() if len(brand) > 3 else brand.upper()
+
+
+def _product_phrases(row):
+    phrases = [("vehicle", row["name"]), ("state", row["state"])]
+    phrases.extend(("brand", _brand_display(token)) for token in set(tokenize(row["name"])) & _BRANDS)
+    return phrases
+
+
+class SuggestIndex:
+    """Sorted prefix array of phrases with per-phrase weights."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._rebuilding = threading.Lock()
+        self._keys = []      # sorted (key, kind, norm)
+        self._weights = {}   # (kind, norm) -> count
+        self._display = {}   # (kind, norm) -> text as first seen
+        self._products = {}  # product id -> phrases it contributed
+        self._dirty = set()
+        self._refreshed = set()  # ids refreshed while a rebuild is in flight
+        self._built_at = None
+
+    # ── maintenance ──
+
+    @staticmethod
+    def _word_starts(norm):
+        words = norm.split(" ")
+        return [" ".join(words[i:]) for i in range(len(words))]
+
+    def _add_phrase(self, kind, text, weight=1):
+        norm = normalize(text)
+        if not norm:
+            return
+        entry = (kind, norm)
+        if entry in self._weights:
+            self._weights[entry] += weight
+            return
+        self._weights[entry] = weight
+        self._display[entry] = " ".join((text or "").split())
+        for key in self._word_starts(norm):
+            bisect.insort(self._keys, (key, kind, norm))
+
+    def _remove_phrase(self, kind, text):
+        entry = (kind, normalize(text))
+        if entry not in self._weights:
+            return
+        self._weights[entry] -= 1
+        if self._weights[entry] > 0:
+            return
+        del self._weights[entry]
+        del self._display[entry]
+        for key in self._word_starts(entry[1]):
+            i = bisect.bisect_left(self._keys, (key, kind, entry[1]))
+            if i < len(self._keys) and self._keys[i] == (key, kind, entry[1]):
+                del self._keys[i]
+
+    def rebuild(self, cursor):
+        """Reload every phrase. Returns the number of distinct phrases."""
+        cursor.execute(_PRODUCT_SQL)
+        products = cursor.fetchall()
+        cursor.execute(_OFFICE_SQL)
+        offices = cursor.fetchall()
+
+        weights, display, contributed = {}, {}, {}
+
+        def add(kind, text):
+            norm = normalize(text)
+            if norm:
+                weights[(kind, norm)] = weights.get((kind, norm), 0) + 1
+                display.setdefault((kind, norm), " ".join(text.split()))
+
+        for row in products:
+            phrases = _product_phrases(row)
+            contributed[row["id"]] = phrases
+            for kind, text in phrases:
+                add(kind, text)
+        for row in offices:
+            add("location", row["location"])
+            add("state", row["state"])
+        # Sorted once here; incremental updates keep it sorted with insort
+        keys = sorted(
+            (key, kind, norm) for kind, norm in weights for key in self._word_starts(norm)
+        )
+        with self._lock:
+            self._keys, self._weights, self._display, self._products = keys, weights, display, contributed
+            # Rows refreshed during the rebuild may be newer than the snapshot
+            self._dirty |= self._refreshed
+            self._refreshed = set()
+            self._built_at = time.monotonic()
+        return len(weights)
+
+    def mark_dirty(self, product_id=None):
+        """Re-read `product_id` on next lookup; no id forces a full rebuild."""
+        with self._lock:
+            if product_id is None:
+                self._built_at = None
+            else:
+                self._dirty.add(product_id)
+
+    def _refresh_dirty(self, cursor):
+        with self._lock:
+            ids, self._dirty = list(self._dirty), set()
+        if not ids:
+            return
+        cursor.execute(
+            f"{_PRODUCT_SQL} AND p.id IN ({', '.join(['%s'] * len(ids))})",
+            ids,
+        )
+        rows = cursor.fetchall()
+        with self._lock:
+            for product_id in ids:
+                for kind, text in self._products.pop(product_id, ()):
+                    self._remove_phrase(kind, text)
+            for row in rows:
+                phrases = _product_phrases(row)
+                self._products[row["id"]] = phrases
+                for kind, text in phrases:
+                    self._add_phrase(kind, text)
+            if self._rebuilding.locked():
+                self._refreshed.update(ids)
+
+    def ensure_fresh(self, get_cursor):
+        """Build on first use, apply pending product updates and schedule the
+        periodic background rebuild. `get_cursor()` is only called when the
+        database is actually needed."""
+        if self._built_at is None:
+            with self._rebuilding:
+                if self._built_at is None:
+                    self.rebuild(get_cursor())
+        elif (time.monotonic() - self._built_at >= current_app.config["SUGGEST_REBUILD_INTERVAL"]
+              and not self._rebuilding.locked()):
+            spawn(_rebuild_in_background, self)
+        if self._dirty:
+            self._refresh_dirty(get_cursor())
+
+    # ── queries ──
+
+    def suggest(self, q, limit=8):
+        """Up to `limit` [{text, type, count}] whose words start with `q`."""
+        prefix = normalize(q)
+        if not prefix:
+            return []
+        with self._lock:
+            keys = self._keys
+            seen = {}
+            i = bisect.bisect_left(keys, (prefix,))
+            end = min(len(keys), i + SCAN_LIMIT)
+            while i < end and keys[i][0].startswith(prefix):
+                _key, kind, norm = keys[i]
+                entry = (kind, norm)
+                if entry not in seen:
+                    seen[entry] = self._weights.get(entry, 0)
+                i += 1
+            ranked = sorted(seen.items(), key=lambda kv: (-kv[1], len(kv[0][1]), kv[0][1]))[:limit]
+            return [
+                {"text": self._display[entry], "type": entry[0], "count": count}
+                for entry, count in ranked
+            ]
+
+
+def _rebuild_in_background(index):
+    from .. import db
+    if not index._rebuilding.acquire(blocking=False):
+        return  # a rebuild is already running in this process
+    try:
+        conn = db.get_db()
+        cursor = conn.cursor()
+        try:
+            index.rebuild(cursor)
+        finally:
+            cursor.close()
+            conn.close()
+    finally:
+        index._rebuilding.release()
+
+
+index = SuggestIndex()
+
+
+@product_changed.connect
+def _on_product_changed(sender, **kwargs):
+    index.mark_dirty(kwargs.get("product_id"))
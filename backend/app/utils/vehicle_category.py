@@ -0,0 +1,118 @@
+"""
+Vehicle category classifier (2W / 3W / 4W / Commercial).
+
+One tokenized keyword + brand dictionary used by the write paths to set
+products.category, so stats queries can GROUP BY category instead of
+re-running LIKE chains over product names on every request.
+"""
+import re
+
+CATEGORIES = ("2W", "3W", "4W", "Commercial")
+
+# Aliases seen in the frontend / older rows
+_ALIASES = {
+    "2w": "2W", "two wheeler": "2W", "2 wheeler": "2W",
+    "3w": "3W", "three wheeler": "3W", "3 wheeler": "3W",
+    "4w": "4W", "four wheeler": "4W", "4 wheeler": "4W", "car": "4W",
+    "cv": "Commercial", "commercial": "Commercial", "commercial vehicle": "Commercial",
+}
+
+# Vehicle types and model names — strong evidence (weight 2)
+_MODELS = {
+    "2W": {
+        "bike", "motorbike", "motorcycle", "scooter", "scooty", "moped", "bullet", "activa",
+        "pulsar", "splendor", "passion", "glamour", "shine", "unicorn", "duke", "rc200", "rc390",
+        "apache", "jupiter", "ntorq", "access", "burgman", "fz", "r15", "mt15", "fascino",
+        "classic", "meteor", "himalayan", "dominar", "platina", "discover", "avenger", "xl100",
+    },
+    "3W": {"auto", "rickshaw", "autorickshaw", "ape", "tuk", "tuktuk", "e-rickshaw", "erickshaw", "treo"},
+    "4W": {
+        "car", "suv", "sedan", "hatchback", "muv", "jeep", "innova", "swift", "fortuner", "creta",
+        "nexon", "brezza", "ertiga", "wagon", "wagonr", "alto", "i10", "i20", "dzire", "verna",
+        "city", "polo", "baleno", "xuv500", "xuv700", "scorpio", "thar", "kwid", "celerio", "venue",
+        "seltos", "sonet", "punch", "tiago", "tigor", "amaze", "santro", "eeco", "ciaz", "xylo",
+    },
+    "Commercial": {
+        "truck", "bus", "tempo", "van", "lorry", "tractor", "tipper", "trailer", "commercial",
+        "pickup", "dost", "eicher", "jcb", "excavator", "loader", "canter", "cargo", "tanker",
+    },
+}
+
+# Multi-word names — strongest evidence (weight 3)
+_PHRASES = {
+    "2W": [("royal", "enfield"), ("honda", "cb"), ("honda", "shine"), ("two", "wheeler"), ("2", "wheeler")],
+    "3W": [("three", "wheeler"), ("3", "wheeler"), ("auto", "rickshaw"), ("piaggio", "ape")],
+    "4W": [("four", "wheeler"), ("4", "wheeler"), ("wagon", "r"), ("maruti", "800")],
+    "Commercial": [
+        ("tata", "ace"), ("bolero", "pickup"), ("bolero", "maxx"), ("ashok", "leyland"),
+        ("bharat", "benz"), ("super", "carry"), ("commercial", "vehicle"),
+    ],
+}
+
+# Brands that only (or overwhelmingly) make one category — weak evidence (weight 1)
+_BRANDS = {
+    "2W": {"hero", "tvs", "bajaj", "yamaha", "ktm", "enfield", "ather", "ola", "jawa", "kawasaki", "harley"},
+    "3W": {"piaggio", "atul"},
+    "4W": {"maruti", "hyundai", "toyota", "kia", "skoda", "volkswagen", "vw", "renault", "nissan", "mg", "ford", "fiat"},
+    "Commercial": {"eicher", "leyland", "bharatbenz", "force", "sml", "isuzu"},
+}
+
+_WEIGHTS = ((_PHRASES, 3), (_MODELS, 2), (_BRANDS, 1))
+
+# Tie-break: specific body types win over the generic car/bike buckets
+_PRIORITY = ("Commercial", "3W", "2W", "4W")
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:-[a-z0-9]+)?")
+
+
+def tokenize(text):
+    """Lowercase alphanumeric tokens: 'RE Classic-350 (2019)' → ['re', 'classic-350', '2019']."""
+    return _TOKEN_RE.findall((text or "").lower())
+
+
+def normalize_category(value):
+    """Map a user/legacy category value onto CATEGORIES, or None."""
+    if not value:
+        return None
+    value = value.strip()
+    if value in CATEGORIES:
+        return value
+    return _ALIASES.get(value.lower())
+
+
+def classify_vehicle(name, description=None):
+    """Best-guess category from the product name (description as fallback),
+    or None when nothing in the dictionary matches."""
+    for text in (name, description):
+        tokens = tokenize(text)
+        if not tokens:
+            continue
+        # Hyphenated tokens also count by their parts ('e-rickshaw' and 'rickshaw')
+        words = set(tokens)
+        for tok in tokens:
+            if "-" in tok:
+                words.update(tok.split("-"))
+        pairs = set(zip(tokens, tokens[1:]))
+
+        scores = dict.fromkeys(CATEGORIES, 0)
+        for table, weight in _WEIGHTS:
+            for category, entries in table.items():
+                if table is _PHRASES:
+                    scores[category] += weight * sum(1 for phrase in entries if phrase in pairs)
+                else:
+                    scores[category] += weight * len(words & entries)
+
+        best = max(scores.values())
+        if best:
+            return next(c for c in _PRIORITY if scores[c] == best)
+    return None
+
+
+def resolve_category(category, name, description=None):
+    """Category to store for a product: the (normalized) user choice, else the classifier."""
+    return normalize_category(category) or classify_vehicle(name, description)
+
+
+def brand_names():
+    """Every brand in the classifier dictionary, lowercase and sorted."""
+    return sorted(set().union(*_BRANDS.values()))
@@ -0,0 +1,201 @@
+"""
+Price-change and ending-soon alerts for users who wishlisted a product.
+
+Both fan out over the wishlist_items reverse index (idx_product: product_id,
+user_id), paged by user id in FANOUT_BATCH chunks, so the work is
+proportional to the number of interested users, not to users or products:
+
+- price changes: bid_placed queues the product; bids on it within
+  WISHLIST_PRICE_ALERT_COALESCE seconds are folded into one alert carrying
+  the latest price. Each wishlister (except the bidder) gets one
+  'price_change' notification row, and the previous unread one for that
+  product is replaced, so a bidding war leaves one row per user, not one per
+  bid;
+- ending soon: scan_ending_soon() finds open auctions whose bid_end_date
+  falls within WISHLIST_ENDING_SOON_MINUTES and notifies wishlisters that
+  have no 'ending_soon' row for the product yet (the notifications row is
+  the dedupe marker). It runs from run.py every
+  WISHLIST_ENDING_SOON_SCAN_INTERVAL seconds or from notify_ending_soon.py
+  (cron); a MySQL named lock keeps concurrent scanners from double-sending.
+
+Rows are written with one multi-row INSERT per batch and pushed to the
+users' "user_<id>" socket rooms after commit.
+"""
+import threading
+
+from flask import current_app
+
+from ..signals import bid_placed
+from .background import spawn
+
+# Wishlisters read / notified per round trip
+FANOUT_BATCH = 500
+
+SCAN_LOCK = "autorevive_wishlist_ending_soon"
+
+_INSERT_SQL = """
+    INSERT INTO notifications (user_id, type, title, message, product_id)
+    VALUES (%s, %s, %s, %s, %s)
+"""
+
+_PRICE_USERS_SQL = """
+    SELECT user_id FROM wishlist_items
+    WHERE product_id = %s AND user_id > %s AND user_id <> %s
+    ORDER BY user_id
+    LIMIT %s
+"""
+
+# Wishlisters without an ending_soon notification for the product yet
+_ENDING_USERS_SQL = """
+    SELECT w.user_id FROM wishlist_items w
+    LEFT JOIN notifications n
+           ON n.product_id = w.product_id AND n.type = 'ending_soon' AND n.user_id = w.user_id
+    WHERE w.product_id = %s AND w.user_id > %s AND n.id IS NULL
+    ORDER BY w.user_id
+    LIMIT %s
+"""
+
+
+def _fan_out(conn, cursor, users_sql, users_params, notification):
+    """Insert `notification` (type, title, message, product_id) for every user
+    returned by the keyset-paged `users_sql`, commit per batch and push.
+    Returns the number of users notified."""
+    from ..socket_events import notify_user
+
+    kind, title, message, product_id = notification
+    payload = {"type": kind, "title": title, "message": message, "product_id": product_id}
+    after, total = 0, 0
+    while True:
+        cursor.execute(users_sql, (product_id, after, *users_params, FANOUT_BATCH))
+        users = [row["user_id"] for row in cursor.fetchall()]
+        if not users:
+            break
+        cursor.executemany(_INSERT_SQL, [(user_id, kind, title, message, product_id) for user_id in users])
+        conn.commit()
+        for user_id in users:
+            notify_user(user_id, "notification", payload)
+        total += len(users)
+        after = users[-1]
+        if len(users) < FANOUT_BATCH:
+            break
+    return total
+
+
+# ── price changes ────────────────────────────────────────────────────────────
+
+class PriceAlerts:
+    """Coalesces bid_placed per product and fans out the latest price."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = {}  # product id -> (amount, bidder user id)
+        self._scheduled = False
+
+    def queue(self, product_id, amount, bidder_id):
+        with self._lock:
+            self._pending[product_id] = (amount, bidder_id)
+            if self._scheduled:
+                return
+            self._scheduled = True
+        spawn(self._drain)
+
+    def _drain(self):
+        from .. import db
+        from ..socket_events import socketio
+
+        socketio.sleep(current_app.config["WISHLIST_PRICE_ALERT_COALESCE"])
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._scheduled = False
+        conn = db.get_db()
+        cursor = conn.cursor()
+        try:
+            for product_id, (amount, bidder_id) in pending.items():
+                try:
+                    notify_price_change(conn, cursor, product_id, amount, bidder_id)
+                except Exception:
+                    conn.rollback()
+                    current_app.logger.exception(f"Wishlist price alert for product {product_id} failed")
+        finally:
+            cursor.close()
+            conn.close()
+
+
+def notify_price_change(conn, cursor, product_id, amount, bidder_id=None):
+    """Tell everyone who wishlisted `product_id` (but the bidder) that its
+    current bid is now `amount`. Returns the number of users notified."""
+    cursor.execute("SELECT name FROM products WHERE id = %s AND status = 'approved'", (product_id,))
+    product = cursor.fetchone()
+    if not product:
+        return 0
+    # One unread price alert per user and product: the latest
+    cursor.execute(
+        "DELETE FROM notifications WHERE product_id = %s AND type = 'price_change' AND is_read = FALSE",
+        (product_id,),
+    )
+    return _fan_out(conn, cursor, _PRICE_USERS_SQL, (bidder_id or 0,), (
+        "price_change",
+        "Price update on your wishlist",
+        f"{product['name']} now has a bid of ₹{float(amount):,.2f}",
+        product_id,
+    ))
+
+
+price_alerts = PriceAlerts()
+
+
+@bid_placed.connect
+def _on_bid_placed(sender, **kwargs):
+    price_alerts.queue(kwargs["product_id"], kwargs["amount"], kwargs.get("user_id"))
+
+
+# ── ending soon ──────────────────────────────────────────────────────────────
+
+def scan_ending_soon(conn, cursor, minutes):
+    """Notify wishlisters of open auctions ending within `minutes`, once per
+    user and product. Returns (auctions scanned, users notified); (0, 0)
+    when another scanner holds the lock."""
+    cursor.execute("SELECT GET_LOCK(%s, 0) as got", (SCAN_LOCK,))
+    if not cursor.fetchone()["got"]:
+        return 0, 0
+    try:
+        cursor.execute("""
+            SELECT id, name, bid_end_date FROM products
+            WHERE status = 'approved' AND is_active = TRUE
+              AND bid_end_date > NOW() AND bid_end_date <= NOW() + INTERVAL %s MINUTE
+        """, (minutes,))
+        products = cursor.fetchall()
+        notified = 0
+        for product in products:
+            notified += _fan_out(conn, cursor, _ENDING_USERS_SQL, (), (
+                "ending_soon",
+                "Auction ending soon",
+                f"Bidding on {product['name']} closes at {product['bid_end_date']:%d %b %Y, %I:%M %p}",
+                product["id"],
+            ))
+        return len(products), notified
+    finally:
+        cursor.execute("SELECT RELEASE_LOCK(%s)", (SCAN_LOCK,))
+        cursor.fetchall()
+
+
+def run_ending_soon_loop(app):
+    """Background loop calling scan_ending_soon every
+    WISHLIST_ENDING_SOON_SCAN_INTERVAL seconds (0 disables it)."""
+    from .. import db
+    from ..socket_events import socketio
+
+    with app.app_context():
+        interval = app.config["WISHLIST_ENDING_SOON_SCAN_INTERVAL"]
+        while interval > 0:
+            try:
+                conn = db.get_db()
+                cursor = conn.cursor()
+                try:
+                    scan_ending_soon(conn, cursor, app.config["WISHLIST_ENDING_SOON_MINUTES"])
+                finally:
+                    cursor.close()
+                    conn.close()
+            except Exception:
+                app.logger.exception("Wishlist ending-soon scan failed")
+            socketio.sleep(interval)
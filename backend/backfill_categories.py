@@ -0,0 +1,67 @@
+"""
+Classify products into 2W / 3W / 4W / Commercial with utils.vehicle_category.
+
+By default only rows with no category are filled. --all also normalizes
+legacy values ('CV', '2w', ...) and classifies rows whose category is not
+one of the four, leaving rows the dictionary can't classify untouched.
+search_text is rebuilt for every recategorized row in the same UPDATE, so
+search sees the new category.
+
+Run from backend dir:  python backfill_categories.py [--all] [--batch-size 1000]
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from app import create_app
+from app.utils.search import SEARCH_SOURCE_COLUMNS, build_search_text
+from app.utils.vehicle_category import classify_vehicle, normalize_category
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--all", action="store_true", help="Also normalize rows that already have a category")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    create_app()
+    from app import db
+
+    conn = db.get_db()
+    cursor = conn.cursor()
+    last_id = 0
+    updated = 0
+    try:
+        while True:
+            cursor.execute(
+                f"""SELECT id, {", ".join(SEARCH_SOURCE_COLUMNS)} FROM products
+                    WHERE id > %s {"" if args.all else "AND category IS NULL"}
+                    ORDER BY id LIMIT %s""",
+                (last_id, args.batch_size),
+            )
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            last_id = rows[-1]["id"]
+
+            updates = []
+            for row in rows:
+                category = normalize_category(row["category"]) or classify_vehicle(row["name"], row["description"])
+                if category and category != row["category"]:
+                    search_text = build_search_text(dict(row, category=category))
+                    updates.append((category, search_text, row["id"]))
+            if updates:
+                cursor.executemany("UPDATE products SET category = %s, search_text = %s WHERE id = %s", updates)
+                conn.commit()
+                updated += len(updates)
+            print(f"  up to product #{last_id}: {updated} rows updated")
+    finally:
+        cursor.close()
+        conn.close()
+    print(f"Backfill done! {updated} products categorized.")
+
+
+if __name__ == "__main__":
+    main()
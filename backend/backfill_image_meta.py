@@ -0,0 +1,63 @@
+"""
+Backfill products.image_meta (dimensions + inline placeholder per photo)
+for rows created before the upload pipeline started computing it.
+
+Run from backend dir:  python backfill_image_meta.py [--batch-size 200] [--all]
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from app import create_app
+from app.utils.images import build_image_meta, parse_image_paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--all", action="store_true", help="Recompute rows that already have image_meta")
+    args = parser.parse_args()
+
+    app = create_app()
+    from app import db
+    upload_folder = app.config["UPLOAD_FOLDER"]
+
+    conn = db.get_db()
+    cursor = conn.cursor()
+    last_id = 0
+    updated = 0
+    try:
+        while True:
+            cursor.execute(
+                f"""SELECT id, image_path, image_meta FROM products
+                    WHERE id > %s AND image_path IS NOT NULL
+                    {"" if args.all else "AND image_meta IS NULL"}
+                    ORDER BY id LIMIT %s""",
+                (last_id, args.batch_size),
+            )
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            last_id = rows[-1]["id"]
+
+            updates = []
+            for row in rows:
+                existing = None if args.all else row["image_meta"]
+                meta = build_image_meta(upload_folder, parse_image_paths(row["image_path"]), existing=existing)
+                if meta:
+                    updates.append((meta, row["id"]))
+            if updates:
+                cursor.executemany("UPDATE products SET image_meta = %s WHERE id = %s", updates)
+                conn.commit()
+                updated += len(updates)
+            print(f"  up to product #{last_id}: {updated} rows updated")
+    finally:
+        cursor.close()
+        conn.close()
+    print(f"Backfill done! {updated} products updated.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+Backfill products.search_text (the FULLTEXT search column) for rows created
+before search moved off LIKE, or rebuild it after changing the tokenizer.
+
+Run from backend dir:  python backfill_search_text.py [--batch-size 1000] [--all]
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from app import create_app
+from app.utils.search import backfill_search_text
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--all", action="store_true", help="Recompute rows that already have search_text")
+    args = parser.parse_args()
+
+    create_app()
+    from app import db
+
+    conn = db.get_db()
+    cursor = conn.cursor()
+
+    def on_batch(last_id, written):
+        conn.commit()
+        print(f"  up to product #{last_id}: {written} rows updated")
+
+    try:
+        updated = backfill_search_text(
+            cursor, batch_size=args.batch_size, only_missing=not args.all, on_batch=on_batch,
+        )
+    finally:
+        cursor.close()
+        conn.close()
+    print(f"Backfill done! {updated} products updated.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+Benchmark the admin user list query: the legacy users × products × bids
+GROUP BY vs. page-first selection with per-page aggregates.
+
+Seeds a scratch database (never the app database) with --users users,
+--offices offices × --products-per-office products and --bids bids, then
+times each strategy for the first page, a deep OFFSET page and a keyset page.
+
+Run from backend dir:
+    python benchmarks/bench_get_users.py [--database autorevive_bench] [--users 100000] [--bids 1000000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from app.database import Database
+
+LEGACY = """
+    SELECT u.*,
+           COUNT(DISTINCT p.id) as product_count,
+           COUNT(DISTINCT b.id) as bid_count,
+           COALESCE(SUM(b.amount), 0) as total_bids
+    FROM users u
+    LEFT JOIN products p ON u.id = p.office_id
+    LEFT JOIN bids b ON u.id = b.user_id
+    GROUP BY u.id ORDER BY u.created_at DESC
+"""
+
+
+def _seed(conn, users, offices, products_per_office, bids, batch=10000):
+    cursor = conn.cursor()
+    cursor.execute("SELECT COUNT(*) as c FROM users WHERE username LIKE 'bench_%'")
+    if cursor.fetchone()["c"] >= users + offices:
+        print("Scratch data already seeded")
+        return
+    print(f"Seeding {users} users, {offices} offices, {offices * products_per_office} products, {bids} bids ...")
+    rows = [(f"bench_o{i}", f"bench_o{i}@example.com", "x", "office", "active") for i in range(offices)]
+    rows += [(f"bench_u{i}", f"bench_u{i}@example.com", "x", "user", "active") for i in range(users)]
+    for start in range(0, len(rows), batch):
+        cursor.executemany(
+            "INSERT INTO users (username, email, password_hash, role, status) VALUES (%s, %s, %s, %s, %s)",
+            rows[start:start + batch],
+        )
+    conn.commit()
+
+    cursor.execute("SELECT id, role FROM users WHERE username LIKE 'bench_%'")
+    ids = cursor.fetchall()
+    office_ids = [r["id"] for r in ids if r["role"] == "office"]
+    user_ids = [r["id"] for r in ids if r["role"] == "user"]
+
+    cursor.executemany(
+        "INSERT INTO products (office_id, name, starting_price, status) VALUES (%s, %s, %s, 'approved')",
+        [(o, f"Bench vehicle {o}-{n}", 10000) for o in office_ids for n in range(products_per_office)],
+    )
+    conn.commit()
+    cursor.execute("SELECT id FROM products WHERE name LIKE 'Bench vehicle %'")
+    product_ids = [r["id"] for r in cursor.fetchall()]
+
+    rng = random.Random(42)
+    for start in range(0, bids, batch):
+        cursor.executemany(
+            "INSERT INTO bids (product_id, user_id, amount) VALUES (%s, %s, %s)",
+            [(rng.choice(product_ids), rng.choice(user_ids), rng.randint(10001, 500000))
+             for _ in range(min(batch, bids - start))],
+        )
+        conn.commit()
+    cursor.close()
+
+
+def _time(label, fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    print(f"  {label:<44}{best * 1000:>10.1f} ms")
+
+
+def _page_first(cursor, per_page, offset=0, after=None):
+    cursor.execute("SELECT COUNT(*) as total FROM users u")
+    cursor.fetchone()
+    if after:
+        cursor.execute(
+            """SELECT u.* FROM users u WHERE (u.created_at < %s OR (u.created_at = %s AND u.id < %s))
+               ORDER BY u.created_at DESC, u.id DESC LIMIT %s""",
+            (after[0], after[0], after[1], per_page),
+        )
+    else:
+        cursor.execute(
+            "SELECT u.* FROM users u ORDER BY u.created_at DESC, u.id DESC LIMIT %s OFFSET %s",
+            (per_page, offset),
+        )
+    rows = cursor.fetchall()
+    ids = [r["id"] for r in rows]
+    placeholders = ", ".join(["%s"] * len(ids))
+    cursor.execute(
+        f"SELECT office_id, COUNT(*) as c FROM products WHERE office_id IN ({placeholders}) GROUP BY office_id", ids
+    )
+    cursor.fetchall()
+    cursor.execute(
+        f"SELECT user_id, COUNT(*) as c, SUM(amount) as s FROM bids WHERE user_id IN ({placeholders}) GROUP BY user_id",
+        ids,
+    )
+    cursor.fetchall()
+    return rows
+
+
+def _legacy(cursor, per_page, offset=0):
+    cursor.execute(f"SELECT COUNT(*) as total FROM ({LEGACY}) as sub")
+    cursor.fetchone()
+    cursor.execute(LEGACY + " LIMIT %s OFFSET %s", (per_page, offset))
+    return cursor.fetchall()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database", default="autorevive_bench", help="Scratch database (created if missing)")
+    parser.add_argument("--users", type=int, default=100000)
+    parser.add_argument("--offices", type=int, default=200)
+    parser.add_argument("--products-per-office", type=int, default=25)
+    parser.add_argument("--bids", type=int, default=1000000)
+    parser.add_argument("--per-page", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--skip-legacy", action="store_true", help="The legacy query can take minutes at full size")
+    args = parser.parse_args()
+
+    app = create_app()
+    if args.database == app.config["MYSQL_DB"]:
+        sys.exit("Refusing to seed the application database; pass a scratch --database")
+
+    bench_db = Database(app)
+    bench_db.db_name = args.database
+    bench_db.init_db()
+
+    conn = bench_db.get_db()
+    try:
+        _seed(conn, args.users, args.offices, args.products_per_office, args.bids)
+        cursor = conn.cursor()
+        deep = (args.users // 2 // args.per_page) * args.per_page
+        last = _page_first(cursor, args.per_page, offset=deep - args.per_page)[-1]
+
+        print(f"\nper_page={args.per_page}, deep offset={deep}")
+        _time("page-first, page 1", lambda: _page_first(cursor, args.per_page), args.repeat)
+        _time(f"page-first, OFFSET {deep}", lambda: _page_first(cursor, args.per_page, offset=deep), args.repeat)
+        _time("page-first, keyset ?after= at same position",
+              lambda: _page_first(cursor, args.per_page, after=(last["created_at"], last["id"])), args.repeat)
+        if not args.skip_legacy:
+            _time("legacy GROUP BY, page 1", lambda: _legacy(cursor, args.per_page), args.repeat)
+            _time(f"legacy GROUP BY, OFFSET {deep}", lambda: _legacy(cursor, args.per_page, offset=deep), args.repeat)
+        cursor.close()
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
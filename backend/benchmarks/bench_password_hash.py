@@ -0,0 +1,119 @@
+"""
+Benchmark password hashing: cost of each hash method, and how long the
+eventlet hub stalls during a login burst when check_password_hash runs
+inline vs. through app.utils.passwords (bounded native-thread slots).
+
+The hub stall is measured by a green thread that asks to sleep TICK_MS and
+records how late it wakes up while --logins concurrent logins verify a
+password. Needs eventlet (monkey-patched at import, as run.py does); without
+it only the method costs are reported. No database needed.
+
+Run from backend dir:
+    python benchmarks/bench_password_hash.py [--logins 50] [--workers 4] [--repeat 5]
+"""
+try:
+    import eventlet
+    eventlet.monkey_patch()
+except ImportError:
+    eventlet = None
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from werkzeug.security import check_password_hash, generate_password_hash
+
+from app.utils import passwords
+
+METHODS = ("scrypt", "pbkdf2:sha256:600000", "pbkdf2:sha256:260000", "pbkdf2:sha256:100000")
+TICK_MS = 10
+
+
+def method_costs(repeat):
+    print(f"{'method':<24} {'hash ms':>9} {'check ms':>9}")
+    for method in METHODS:
+        hashes, checks = [], []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            hashed = generate_password_hash("correct horse", method)
+            hashes.append((time.perf_counter() - started) * 1000)
+            started = time.perf_counter()
+            check_password_hash(hashed, "correct horse")
+            checks.append((time.perf_counter() - started) * 1000)
+        print(f"{method:<24} {statistics.median(hashes):>9.1f} {statistics.median(checks):>9.1f}")
+
+
+def hub_stall(app, logins, verify):
+    """(max / p99 tick lateness ms, burst wall time s) while `logins` green
+    threads each run `verify` once."""
+    lateness = []
+    running = [True]
+
+    def ticker():
+        while running[0]:
+            started = time.perf_counter()
+            eventlet.sleep(TICK_MS / 1000)
+            lateness.append((time.perf_counter() - started) * 1000 - TICK_MS)
+
+    def login():
+        with app.app_context():
+            verify()
+
+    tick = eventlet.spawn(ticker)
+    eventlet.sleep(0.05)
+    started = time.perf_counter()
+    pool = eventlet.GreenPool(logins)
+    for _ in range(logins):
+        pool.spawn(login)
+    pool.waitall()
+    wall = time.perf_counter() - started
+    running[0] = False
+    tick.wait()
+    lateness.sort()
+    p99 = lateness[min(len(lateness) - 1, int(len(lateness) * 0.99))]
+    return lateness[-1], p99, wall
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=50, help="concurrent logins in the burst")
+    parser.add_argument("--workers", type=int, default=4, help="PASSWORD_HASH_WORKERS")
+    parser.add_argument("--repeat", type=int, default=5, help="hashes per method for the cost table")
+    parser.add_argument("--method", default="scrypt", help="method of the stored hash in the burst")
+    args = parser.parse_args()
+
+    method_costs(args.repeat)
+    if eventlet is None:
+        print("\neventlet not installed: hub stall comparison skipped")
+        return
+
+    app = Flask(__name__)
+    app.config.update(
+        PASSWORD_HASH_METHOD=args.method,
+        PASSWORD_HASH_WORKERS=args.workers,
+        PASSWORD_HASH_MAX_WAITING=args.logins,
+    )
+    stored = generate_password_hash("correct horse", args.method)
+    with app.app_context():
+        passwords.pool.method_tag(args.method)  # learn the tag outside the timed burst
+
+    print(f"\n{args.logins} concurrent logins, {args.method}, tick {TICK_MS} ms")
+    print(f"{'mode':<24} {'max stall ms':>13} {'p99 stall ms':>13} {'burst s':>8}")
+    modes = (
+        ("inline (werkzeug)", lambda: check_password_hash(stored, "correct horse")),
+        (f"passwords ({args.workers} workers)", lambda: passwords.verify_password(stored, "correct horse")),
+    )
+    for name, verify in modes:
+        worst, p99, wall = hub_stall(app, args.logins, verify)
+        print(f"{name:<24} {worst:>13.1f} {p99:>13.1f} {wall:>8.2f}")
+    with app.app_context():
+        print(f"\npool stats: {passwords.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Benchmark saved-search matching: the reverse-index Percolator in
+app.utils.saved_searches vs. evaluating every saved search per product.
+
+Generates --searches random saved searches (facets + text terms) and
+--products random products, checks both give the same matches and reports
+per-product match time. No database needed.
+
+Run from backend dir:
+    python benchmarks/bench_percolator.py [--searches 100000] [--products 200]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils import saved_searches
+from app.utils.facets import PRICE_BUCKETS
+
+MODELS = [
+    ("Bajaj Pulsar 150", "2W"), ("Honda Activa 6G", "2W"), ("Royal Enfield Classic 350", "2W"),
+    ("Yamaha FZ S", "2W"), ("TVS Apache RTR 160", "2W"), ("Piaggio Ape City", "3W"),
+    ("Maruti Swift VXI", "4W"), ("Toyota Innova Crysta", "4W"), ("Hyundai Creta SX", "4W"),
+    ("Honda City ZX", "4W"), ("Tata Ace Gold", "Commercial"), ("Ashok Leyland Dost", "Commercial"),
+]
+TERMS = ["pulsar", "activa", "classic", "royal", "fz", "apache", "ape", "swift", "innova",
+         "creta", "city", "honda", "ace", "dost", "diesel"]
+STATES = ["Tamil Nadu", "Kerala", "Karnataka", "Andhra Pradesh", "Telangana", "Goa"]
+FUELS = ["Petrol", "Diesel", "CNG", "Electric"]
+PRICES = [key for key, _, _ in PRICE_BUCKETS]
+
+
+def make_search(rng):
+    query = {}
+    if rng.random() < 0.5:
+        query["search"] = " ".join(rng.sample(TERMS, rng.randint(1, 2)))
+    if rng.random() < 0.6:
+        query["year"] = rng.sample(range(2005, 2026), rng.randint(1, 3))
+    if rng.random() < 0.5:
+        query["state"] = [rng.choice(STATES)]
+    if rng.random() < 0.5:
+        query["category"] = [rng.choice(["2W", "3W", "4W", "Commercial"])]
+    if rng.random() < 0.3:
+        query["price"] = rng.sample(PRICES, rng.randint(1, 2))
+    if rng.random() < 0.2:
+        query["fuel_type"] = [rng.choice(FUELS)]
+    if not query:
+        query["price"] = [rng.choice(PRICES)]
+    return saved_searches.normalize_query(query)
+
+
+def make_product(rng, product_id):
+    name, category = rng.choice(MODELS)
+    state = rng.choice(STATES)
+    return {
+        "id": product_id,
+        "name": name,
+        "description": "Repossessed, single owner",
+        "registration_number": f"TN{rng.randint(1, 99):02d}AB{rng.randint(1000, 9999)}",
+        "category": category,
+        "state": state,
+        "display_state": state,
+        "fuel_type": rng.choice(FUELS),
+        "transmission": "Manual",
+        "vehicle_year": rng.randint(2005, 2025),
+        "starting_price": rng.randint(20000, 1500000),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--searches", type=int, default=100000)
+    parser.add_argument("--products", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(11)
+    queries = {i: make_search(rng) for i in range(args.searches)}
+    products = [make_product(rng, i) for i in range(args.products)]
+
+    started = time.perf_counter()
+    percolator = saved_searches.Percolator()
+    for search_id, query in queries.items():
+        percolator.add(search_id, search_id % 5000, f"search {search_id}", query)
+    print(f"indexed {args.searches} saved searches in {time.perf_counter() - started:.2f} s")
+
+    indexed_time = brute_time = 0.0
+    matches = 0
+    for row in products:
+        started = time.perf_counter()
+        found = {search_id for search_id, _, _ in percolator.match(row)}
+        indexed_time += time.perf_counter() - started
+
+        started = time.perf_counter()
+        values, tokens = saved_searches._product_facts(row)
+        expected = {i for i, query in queries.items() if saved_searches._matches(query, values, tokens)}
+        brute_time += time.perf_counter() - started
+
+        assert found == expected, f"product {row['id']}: {len(found)} != {len(expected)}"
+        matches += len(found)
+
+    n = len(products)
+    print(f"{n} products, {matches / n:.0f} matches per product on average\n")
+    print(f"{'strategy':<24}{'ms / product':>14}")
+    print(f"{'evaluate every search':<24}{brute_time / n * 1000:>14.2f}")
+    print(f"{'reverse index':<24}{indexed_time / n * 1000:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
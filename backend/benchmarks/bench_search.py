@@ -0,0 +1,138 @@
+"""
+Benchmark vehicle/auction search: the legacy `name LIKE '%q%' OR description
+LIKE '%q%'` scan vs. the FULLTEXT MATCH on products.search_text.
+
+Seeds a scratch database (never the app database) with --products approved
+products, then times page 1 (rows + COUNT(*) OVER ()) for each query.
+
+Run from backend dir:
+    python benchmarks/bench_search.py [--database autorevive_bench] [--products 500000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from app.database import Database
+from app.utils.search import boolean_query, build_search_text, match_expr
+
+MODELS = [
+    ("Royal Enfield Classic-350", "2W"), ("Bajaj Pulsar 150", "2W"), ("Honda Activa 6G", "2W"),
+    ("Yamaha FZ S", "2W"), ("TVS Apache RTR 160", "2W"), ("Bajaj RE Compact", "3W"),
+    ("Piaggio Ape City", "3W"), ("Maruti Swift VXI", "4W"), ("Hyundai i20 Asta", "4W"),
+    ("Mahindra XUV 500 W8", "4W"), ("Toyota Innova Crysta", "4W"), ("Tata Ace Gold", "Commercial"),
+    ("Ashok Leyland Dost", "Commercial"), ("Eicher Pro 2049", "Commercial"),
+]
+STATES = ["Tamil Nadu", "Kerala", "Karnataka", "Andhra Pradesh", "Telangana"]
+QUERIES = ["swift", "royal enfield", "fz", "innova crysta", "classic-350", "tn09"]
+
+
+def _seed(conn, products, batch=10000):
+    cursor = conn.cursor()
+    cursor.execute("SELECT COUNT(*) as c FROM products WHERE name LIKE 'Bench %'")
+    if cursor.fetchone()["c"] >= products:
+        print("Scratch data already seeded")
+        return
+    cursor.execute("SELECT id FROM users WHERE username = 'bench_search_office'")
+    row = cursor.fetchone()
+    if row:
+        office_id = row["id"]
+    else:
+        cursor.execute(
+            "INSERT INTO users (username, email, password_hash, role, status) VALUES (%s, %s, 'x', 'office', 'active')",
+            ("bench_search_office", "bench_search_office@example.com"),
+        )
+        office_id = cursor.lastrowid
+
+    print(f"Seeding {products} products ...")
+    rng = random.Random(42)
+    for start in range(0, products, batch):
+        rows = []
+        for i in range(start, min(start + batch, products)):
+            model, category = rng.choice(MODELS)
+            product = {
+                "name": f"Bench {model} {rng.randint(2008, 2025)}",
+                "description": f"Repossessed vehicle, {rng.choice(['single', 'second', 'third'])} owner, "
+                               f"{rng.randint(5, 150) * 1000} km. Registration TN{rng.randint(1, 99):02d}.",
+                "category": category,
+                "state": rng.choice(STATES),
+            }
+            rows.append((office_id, product["name"], product["description"], category, product["state"],
+                         rng.randint(10000, 900000), build_search_text(product)))
+        cursor.executemany(
+            """INSERT INTO products (office_id, name, description, category, state, starting_price, search_text, status)
+               VALUES (%s, %s, %s, %s, %s, %s, %s, 'approved')""",
+            rows,
+        )
+        conn.commit()
+    cursor.execute("OPTIMIZE TABLE products")  # fold the FULLTEXT insert cache into the index
+    cursor.fetchall()
+    cursor.close()
+
+
+def _like(cursor, q, per_page):
+    cursor.execute(
+        """SELECT COUNT(*) OVER () as _total, p.* FROM products p
+           WHERE p.status = 'approved' AND (p.name LIKE %s OR p.description LIKE %s)
+           ORDER BY p.created_at DESC, p.id DESC LIMIT %s""",
+        (f"%{q}%", f"%{q}%", per_page),
+    )
+    return cursor.fetchall()
+
+
+def _fulltext(cursor, q, per_page):
+    score = match_expr("p.search_text", boolean_query(q))
+    cursor.execute(
+        f"""SELECT COUNT(*) OVER () as _total, p.*, {score} as relevance FROM products p
+            WHERE p.status = 'approved' AND {score}
+            ORDER BY {score} DESC, p.id DESC LIMIT %s""",
+        (per_page,),
+    )
+    return cursor.fetchall()
+
+
+def _time(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        rows = fn()
+        best = min(best, time.perf_counter() - started)
+    return best, (rows[0]["_total"] if rows else 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database", default="autorevive_bench", help="Scratch database (created if missing)")
+    parser.add_argument("--products", type=int, default=500000)
+    parser.add_argument("--per-page", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    app = create_app()
+    if args.database == app.config["MYSQL_DB"]:
+        sys.exit("Refusing to seed the application database; pass a scratch --database")
+
+    bench_db = Database(app)
+    bench_db.db_name = args.database
+    bench_db.init_db()
+
+    conn = bench_db.get_db()
+    try:
+        _seed(conn, args.products)
+        cursor = conn.cursor()
+        print(f"\n{'query':<18}{'LIKE ms':>10}{'hits':>9}{'MATCH ms':>11}{'hits':>9}")
+        for q in QUERIES:
+            like_s, like_hits = _time(lambda: _like(cursor, q, args.per_page), args.repeat)
+            ft_s, ft_hits = _time(lambda: _fulltext(cursor, q, args.per_page), args.repeat)
+            print(f"{q:<18}{like_s * 1000:>10.1f}{like_hits:>9}{ft_s * 1000:>11.1f}{ft_hits:>9}")
+        cursor.close()
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
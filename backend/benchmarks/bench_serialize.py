@@ -0,0 +1,121 @@
+"""
+Micro-benchmark row serialization and JSON encoding.
+
+Compares the original per-value serialize_rows with the compiled-plan
+version in app.utils.serialization, and Flask's default JSON provider with
+FastJSONProvider, on synthetic product-list rows. No database needed.
+
+Run from backend dir:
+    python benchmarks/bench_serialize.py [--rows 5000] [--repeat 20]
+"""
+import argparse
+import datetime
+import decimal
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from app.utils import serialization
+
+
+def legacy_serialize_row(row):
+    """serialize_row as it was before the compiled-plan version."""
+    if row is None:
+        return None
+    result = {}
+    for key, value in row.items():
+        if isinstance(value, datetime.datetime):
+            result[key] = value.isoformat()
+        elif isinstance(value, datetime.date):
+            result[key] = value.isoformat()
+        elif hasattr(value, "__float__"):
+            result[key] = float(value)
+        else:
+            result[key] = value
+    result.pop("password_hash", None)
+    return result
+
+
+def legacy_serialize_rows(rows):
+    return [legacy_serialize_row(r) for r in rows]
+
+
+def make_rows(n, seed=7):
+    rng = random.Random(seed)
+    now = datetime.datetime(2026, 1, 1)
+    rows = []
+    for i in range(n):
+        rows.append({
+            "id": i + 1,
+            "office_id": rng.randint(1, 200),
+            "name": f"Vehicle {i}",
+            "description": "Well maintained, single owner. " * 3,
+            "category": rng.choice(["2W", "3W", "4W", "Commercial"]),
+            "state": "Tamil Nadu",
+            "image_path": f'["uploads/98{i:08d}/4W/img_{i}.webp"]',
+            "starting_price": decimal.Decimal(rng.randint(10000, 900000)) / 1,
+            "quoted_price": None if i % 3 else decimal.Decimal("1000.00"),
+            "bid_end_date": now + datetime.timedelta(days=rng.randint(1, 30)),
+            "vehicle_year": rng.randint(2005, 2025),
+            "mileage": rng.randint(1000, 150000),
+            "fuel_type": "Petrol",
+            "transmission": "Manual",
+            "status": "approved",
+            "is_active": 1,
+            "created_at": now - datetime.timedelta(minutes=i),
+            "office_name": f"office{rng.randint(1, 200)}",
+            "current_bid": float(rng.randint(0, 900000)),
+            "bid_count": rng.randint(0, 50),
+        })
+    return rows
+
+
+def _best(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    assert serialization.serialize_rows(rows[:50]) == legacy_serialize_rows(rows[:50])
+
+    app = Flask(__name__)
+    default_provider = DefaultJSONProvider(app)
+    fast_provider = serialization.FastJSONProvider(app)
+    payload = {"auctions": legacy_serialize_rows(rows), "total": len(rows)}
+
+    results = [
+        ("serialize_rows (legacy)", _best(lambda: legacy_serialize_rows(rows), args.repeat)),
+        ("serialize_rows (compiled)", _best(lambda: serialization.serialize_rows(rows), args.repeat)),
+        ("json dumps (Flask default)", _best(lambda: default_provider.dumps(payload), args.repeat)),
+        (f"json dumps ({'orjson' if serialization.orjson else 'stdlib, unsorted'})",
+         _best(lambda: fast_provider.dumps(payload), args.repeat)),
+    ]
+
+    print(f"{args.rows} rows x {len(rows[0])} columns, best of {args.repeat}\n")
+    print(f"{'step':<34}{'ms':>10}{'rows/sec':>14}")
+    for label, seconds in results:
+        print(f"{label:<34}{seconds * 1000:>10.2f}{args.rows / seconds:>14,.0f}")
+
+    before = results[0][1] + results[2][1]
+    after = results[1][1] + results[3][1]
+    print(f"\nserialize + encode: {before * 1000:.1f} ms -> {after * 1000:.1f} ms ({before / after:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
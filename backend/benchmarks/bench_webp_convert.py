@@ -0,0 +1,97 @@
+"""
+Benchmark WebP conversion of uploaded photos: legacy full decode vs. the
+draft/reduce fast path.
+
+Run from backend dir:
+    python benchmarks/bench_webp_convert.py path/to/sample_photos [--max-edge 2560] [--quality 85]
+
+Each mode runs in a fresh process so peak RSS is measured per mode.
+"""
+import argparse
+import multiprocessing
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.images import CONVERTIBLE_EXTENSIONS, convert_to_webp
+
+
+def _collect(corpus):
+    files = []
+    for root, _dirs, names in os.walk(corpus):
+        for name in sorted(names):
+            if os.path.splitext(name)[1].lower() in CONVERTIBLE_EXTENSIONS:
+                files.append(os.path.join(root, name))
+    return files
+
+
+def _run_mode(files, max_edge, quality, queue):
+    work_dir = tempfile.mkdtemp(prefix="bench_webp_")
+    try:
+        total_in = total_out = 0
+        started = time.perf_counter()
+        for i, src in enumerate(files):
+            dst = os.path.join(work_dir, f"{i}{os.path.splitext(src)[1]}")
+            shutil.copyfile(src, dst)
+            total_in += os.path.getsize(dst)
+            out = convert_to_webp(dst, quality=quality, max_edge=max_edge)
+            total_out += os.path.getsize(out)
+        elapsed = time.perf_counter() - started
+        # ru_maxrss is KiB on Linux, bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        if sys.platform == "darwin":
+            peak //= 1024
+        queue.put({"seconds": elapsed, "peak_rss_kb": peak, "bytes_in": total_in, "bytes_out": total_out})
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def _measure(files, max_edge, quality):
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    proc = ctx.Process(target=_run_mode, args=(files, max_edge, quality, queue))
+    proc.start()
+    result = queue.get()
+    proc.join()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("corpus", help="Directory of sample photos (jpg/png)")
+    parser.add_argument("--max-edge", type=int, default=2560)
+    parser.add_argument("--quality", type=int, default=85)
+    args = parser.parse_args()
+
+    files = _collect(args.corpus)
+    if not files:
+        sys.exit(f"No images found under {args.corpus}")
+
+    print(f"Corpus: {len(files)} images")
+    rows = [
+        ("legacy (full decode)", _measure(files, None, args.quality)),
+        (f"fast (max edge {args.max_edge})", _measure(files, args.max_edge, args.quality)),
+    ]
+
+    print(f"\n{'mode':<28}{'time (s)':>10}{'ms/img':>10}{'peak RSS (MB)':>15}{'in (MB)':>10}{'out (MB)':>10}")
+    for label, r in rows:
+        print(
+            f"{label:<28}{r['seconds']:>10.2f}{r['seconds'] * 1000 / len(files):>10.1f}"
+            f"{r['peak_rss_kb'] / 1024:>15.1f}{r['bytes_in'] / 1048576:>10.2f}{r['bytes_out'] / 1048576:>10.2f}"
+        )
+
+    before, after = rows[0][1], rows[1][1]
+    print(
+        f"\nSpeed-up: {before['seconds'] / after['seconds']:.1f}x   "
+        f"RSS: {after['peak_rss_kb'] / before['peak_rss_kb']:.0%} of legacy   "
+        f"Output: {after['bytes_out'] / before['bytes_out']:.0%} of legacy"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,336 @@
+"""
+Re-encode the existing uploads/ tree to WebP and rewrite the DB paths.
+
+Legacy PNG/JPG uploads (and, with --include-webp, existing WebP files after a
+quality change) are converted in a multiprocessing pool. Every finished file
+is appended to a JSONL progress journal, so an interrupted run picks up where
+it stopped: each file is journaled as "started" before it is converted, so a
+.webp left behind by a crash is recognised as ours and redone.
+
+Journal entries record the quality and max_edge they were encoded with and
+only count as done for a run with the same settings: rerunning with
+--include-webp --quality 80 re-encodes this job's earlier output too.
+
+Once all files are converted, the referencing columns are rewritten in
+batches (products.image_meta entries are re-keyed to the new paths and
+recomputed, since max_edge may have changed the dimensions), and only then
+are the original files removed.
+
+Run from backend dir:
+    python convert_uploads.py --dry-run            # projected byte savings only
+    python convert_uploads.py                      # convert + rewrite DB
+    python convert_uploads.py --include-webp --quality 80
+"""
+import argparse
+import io
+import json
+import multiprocessing
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from app.utils.images import CONVERTIBLE_EXTENSIONS, convert_to_webp, describe_image, open_for_webp, save_webp
+
+JOURNAL_NAME = ".convert_journal.jsonl"
+
+# (table, id column, path column, stored with "uploads/" prefix?, may hold a JSON array?)
+PATH_COLUMNS = [
+    ("products", "id", "image_path", True, True),
+    ("products", "id", "rc_image", True, False),
+    ("products", "id", "insurance_image", True, False),
+    ("office_details", "id", "logo_path", True, False),
+    ("transactions", "id", "payment_screenshot", False, False),
+]
+
+
+def _collect(upload_folder, include_webp):
+    """Yield upload-relative paths (forward slashes) of files to convert."""
+    exts = CONVERTIBLE_EXTENSIONS + ((".webp",) if include_webp else ())
+    for root, dirs, names in os.walk(upload_folder):
+        # Skip hidden work dirs (chunk spools etc.)
+        dirs[:] = [d for d in dirs if not d.startswith(".")]
+        for name in sorted(names):
+            if os.path.splitext(name)[1].lower() in exts:
+                full = os.path.join(root, name)
+                yield os.path.relpath(full, upload_folder).replace(os.sep, "/")
+
+
+def _convert_one(task):
+    """Pool worker — convert (or, in dry-run, just encode) one file."""
+    upload_folder, rel, quality, max_edge, dry_run, resumed = task
+    src = os.path.join(upload_folder, rel)
+    dst_rel = os.path.splitext(rel)[0] + ".webp"
+    dst = os.path.join(upload_folder, dst_rel)
+    result = {"src": rel, "dst": dst_rel, "quality": quality, "max_edge": max_edge,
+              "bytes_in": os.path.getsize(src)}
+    try:
+        # A target this job wrote before (journaled, e.g. "started" by an
+        # interrupted run) is overwritten; any other .webp is someone else's
+        if dst != src and os.path.exists(dst) and not resumed:
+            result.update(status="skipped", error="target .webp already exists")
+            return result
+
+        if dry_run:
+            buf = io.BytesIO()
+            img = open_for_webp(src, max_edge=max_edge)
+            try:
+                save_webp(img, buf, quality=quality)
+            finally:
+                img.close()
+            result.update(status="projected", bytes_out=buf.tell())
+            return result
+
+        if dst == src:
+            # Re-encode an existing WebP in place via a temp file
+            tmp = dst + ".tmp"
+            img = open_for_webp(src, max_edge=max_edge)
+            try:
+                save_webp(img, tmp, quality=quality)
+            finally:
+                img.close()
+            os.replace(tmp, dst)
+        else:
+            convert_to_webp(src, quality=quality, max_edge=max_edge, remove_original=False)
+        result.update(status="converted", bytes_out=os.path.getsize(dst))
+    except Exception as e:
+        result.update(status="failed", error=str(e))
+    return result
+
+
+def _load_journal(path):
+    entries = {}
+    if os.path.exists(path):
+        with open(path) as fh:
+            for line in fh:
+                line = line.strip()
+                if line:
+                    entry = json.loads(line)
+                    entries[entry["src"]] = entry
+    return entries
+
+
+def _is_done(entry, quality, max_edge):
+    """Converted by an earlier run with the current settings."""
+    return (entry.get("status") in ("converted", "done")
+            and entry.get("quality") == quality and entry.get("max_edge") == max_edge)
+
+
+def _rewrite_value(value, mapping, prefixed, is_list):
+    """Return the rewritten column value, or None if nothing changed."""
+    if not value:
+        return None
+
+    def swap(path):
+        key = path[len("uploads/"):] if prefixed and path.startswith("uploads/") else path
+        new = mapping.get(key)
+        if new is None:
+            return path
+        return f"uploads/{new}" if prefixed else new
+
+    if is_list and value.lstrip().startswith("["):
+        try:
+            paths = json.loads(value)
+        except (json.JSONDecodeError, TypeError):
+            return None
+        new_paths = [swap(p) for p in paths]
+        return json.dumps(new_paths) if new_paths != paths else None
+
+    new_value = swap(value)
+    return new_value if new_value != value else None
+
+
+def _rewrite_db(db, mapping, batch_size):
+    """Rewrite every path column that references a renamed file, in id batches."""
+    conn = db.get_db()
+    cursor = conn.cursor()
+    total = 0
+    try:
+        for table, id_col, col, prefixed, is_list in PATH_COLUMNS:
+            last_id = 0
+            while True:
+                try:
+                    cursor.execute(
+                        f"""SELECT {id_col} AS id, {col} AS path FROM {table}
+                            WHERE {id_col} > %s AND {col} IS NOT NULL
+                            ORDER BY {id_col} LIMIT %s""",
+                        (last_id, batch_size),
+                    )
+                except Exception as e:
+                    print(f"  SKIP {table}.{col}: {e}")
+                    break
+                rows = cursor.fetchall()
+                if not rows:
+                    break
+                last_id = rows[-1]["id"]
+
+                updates = []
+                for row in rows:
+                    new_value = _rewrite_value(row["path"], mapping, prefixed, is_list)
+                    if new_value is not None:
+                        updates.append((new_value, row["id"]))
+                if updates:
+                    cursor.executemany(f"UPDATE {table} SET {col} = %s WHERE {id_col} = %s", updates)
+                    conn.commit()
+                    total += len(updates)
+            print(f"  {table}.{col}: done")
+    finally:
+        cursor.close()
+        conn.close()
+    return total
+
+
+def _rewrite_image_meta(db, upload_folder, converted, batch_size):
+    """Re-key products.image_meta entries of converted files to their new
+    path and recompute them from the converted file. `converted` maps source
+    to target upload-relative paths (equal for in-place re-encodes)."""
+    targets = set(converted.values())
+    conn = db.get_db()
+    cursor = conn.cursor()
+    total = 0
+    last_id = 0
+    try:
+        while True:
+            cursor.execute(
+                """SELECT id, image_meta FROM products
+                   WHERE id > %s AND image_meta IS NOT NULL
+                   ORDER BY id LIMIT %s""",
+                (last_id, batch_size),
+            )
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            last_id = rows[-1]["id"]
+
+            updates = []
+            for row in rows:
+                try:
+                    meta = json.loads(row["image_meta"])
+                except (json.JSONDecodeError, TypeError):
+                    continue
+                if not isinstance(meta, dict):
+                    continue
+                new_meta, changed = {}, False
+                for key, entry in meta.items():
+                    rel = key[len("uploads/"):] if key.startswith("uploads/") else key
+                    dst = converted.get(rel, rel if rel in targets else None)
+                    if dst is None:
+                        new_meta[key] = entry
+                        continue
+                    try:
+                        entry = describe_image(os.path.join(upload_folder, dst))
+                    except Exception as e:
+                        print(f"  image_meta of {dst} not recomputed: {e}")
+                    new_meta[f"uploads/{dst}"] = entry
+                    changed = True
+                if changed:
+                    updates.append((json.dumps(new_meta), row["id"]))
+            if updates:
+                cursor.executemany("UPDATE products SET image_meta = %s WHERE id = %s", updates)
+                conn.commit()
+                total += len(updates)
+    finally:
+        cursor.close()
+        conn.close()
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dry-run", action="store_true", help="Encode in memory and report projected savings")
+    parser.add_argument("--include-webp", action="store_true", help="Also re-encode existing .webp files")
+    parser.add_argument("--keep-originals", action="store_true", help="Don't delete source files after the DB rewrite")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--batch-size", type=int, default=500, help="Rows per DB update batch")
+    parser.add_argument("--quality", type=int, default=None, help="WebP quality (default: WEBP_QUALITY)")
+    parser.add_argument("--max-edge", type=int, default=None, help="Longest edge cap (default: IMAGE_MAX_EDGE)")
+    parser.add_argument("--journal", default=None, help=f"Progress journal (default: <UPLOAD_FOLDER>/{JOURNAL_NAME})")
+    args = parser.parse_args()
+
+    from app import create_app
+    app = create_app()
+    from app import db
+
+    upload_folder = app.config["UPLOAD_FOLDER"]
+    quality = args.quality or app.config.get("WEBP_QUALITY", 85)
+    max_edge = (args.max_edge if args.max_edge is not None else app.config.get("IMAGE_MAX_EDGE")) or None
+    journal_path = args.journal or os.path.join(upload_folder, JOURNAL_NAME)
+
+    journal = {} if args.dry_run else _load_journal(journal_path)
+    # .webp files this job already wrote with the current settings are not sources
+    produced = {e["dst"] for e in journal.values()
+                if e["src"] != e["dst"] and _is_done(e, quality, max_edge)}
+    pending = [rel for rel in _collect(upload_folder, args.include_webp)
+               if not _is_done(journal.get(rel, {}), quality, max_edge) and rel not in produced]
+    # A source still to convert rewrites its .webp target; don't also re-encode that
+    targets = {os.path.splitext(rel)[0] + ".webp" for rel in pending if not rel.lower().endswith(".webp")}
+    pending = [rel for rel in pending if rel not in targets]
+    print(f"{len(pending)} files to process ({len(journal)} already in journal)")
+
+    tasks = [
+        (upload_folder, rel, quality, max_edge, args.dry_run,
+         journal.get(rel, {}).get("status") not in (None, "skipped"))
+        for rel in pending
+    ]
+    bytes_in = bytes_out = failed = 0
+    journal_fh = None if args.dry_run else open(journal_path, "a")
+    if journal_fh:
+        # Record intent first: after a crash, an existing target of a
+        # "started" file is known to be this job's (possibly partial) output
+        for rel in pending:
+            dst_rel = os.path.splitext(rel)[0] + ".webp"
+            journal_fh.write(json.dumps({"src": rel, "dst": dst_rel, "quality": quality,
+                                         "max_edge": max_edge, "status": "started"}) + "\n")
+        journal_fh.flush()
+        os.fsync(journal_fh.fileno())
+    try:
+        with multiprocessing.Pool(args.workers) as pool:
+            for i, res in enumerate(pool.imap_unordered(_convert_one, tasks, chunksize=4), 1):
+                if res["status"] in ("converted", "projected"):
+                    bytes_in += res["bytes_in"]
+                    bytes_out += res["bytes_out"]
+                else:
+                    failed += 1
+                    print(f"  {res['status'].upper()}: {res['src']} ({res.get('error')})")
+                if journal_fh:
+                    journal_fh.write(json.dumps(res) + "\n")
+                    journal_fh.flush()
+                if i % 100 == 0:
+                    print(f"  {i}/{len(tasks)}")
+    finally:
+        if journal_fh:
+            journal_fh.close()
+
+    saved = bytes_in - bytes_out
+    label = "Projected" if args.dry_run else "Converted"
+    print(f"\n{label}: {bytes_in / 1048576:.1f} MB -> {bytes_out / 1048576:.1f} MB "
+          f"(saves {saved / 1048576:.1f} MB, {saved / bytes_in:.0%})" if bytes_in else f"\n{label}: nothing to do")
+    if failed:
+        print(f"{failed} files failed or were skipped")
+    if args.dry_run:
+        return
+
+    # Rewrite DB columns for every renamed file in the journal (this run and earlier ones)
+    journal = _load_journal(journal_path)
+    converted = [e for e in journal.values() if e["status"] == "converted"]
+    mapping = {e["src"]: e["dst"] for e in converted if e["src"] != e["dst"]}
+    if mapping:
+        print(f"\nRewriting DB references for {len(mapping)} files...")
+        print(f"Updated {_rewrite_db(db, mapping, args.batch_size)} rows")
+    if converted:
+        converted_map = {e["src"]: e["dst"] for e in converted}
+        print(f"Updated image_meta of {_rewrite_image_meta(db, upload_folder, converted_map, args.batch_size)} products")
+
+    # Originals are only removed once the DB points at the new files
+    with open(journal_path, "a") as fh:
+        for entry in converted:
+            if entry["src"] != entry["dst"] and not args.keep_originals:
+                src = os.path.join(upload_folder, entry["src"])
+                if os.path.exists(src):
+                    os.remove(src)
+            fh.write(json.dumps(dict(entry, status="done")) + "\n")
+    print("Done!")
+
+
+if __name__ == "__main__":
+    main()
@@ -14,7 +14,9 @@ CREATE TABLE IF NOT EXISTS users (
     location VARCHAR(255) DEFAULT NULL,
     role ENUM('admin', 'office', 'user') NOT NULL,
     status ENUM('pending', 'active', 'blocked') DEFAULT 'active',
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_created (created_at, id),
+    FULLTEXT INDEX ft_office_search (username, finance_name, owner_name)
 );
 
 -- Products Table
@@ -24,6 +26,7 @@ CREATE TABLE IF NOT EXISTS products (
     name VARCHAR(255) NOT NULL,
     description TEXT,
     image_path TEXT,
+    image_meta TEXT COMMENT 'JSON: {path: {width, height, placeholder}}',
     starting_price DECIMAL(10, 2) NOT NULL,
     quoted_price DECIMAL(10, 2) DEFAULT NULL,
     category VARCHAR(50) DEFAULT NULL,
@@ -43,7 +46,12 @@ CREATE TABLE IF NOT EXISTS products (
     is_active BOOLEAN DEFAULT TRUE,
     winner_user_id INT DEFAULT NULL,
     closed_at TIMESTAMP NULL DEFAULT NULL,
+    search_text TEXT DEFAULT NULL COMMENT 'Tokenized name/description/registration; see app/utils/search.py',
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_status_category (status, category),
+    INDEX idx_status_created (status, created_at, id),
+    INDEX idx_office_created (office_id, created_at, id),
+    FULLTEXT INDEX ft_search (search_text),
     FOREIGN KEY (office_id) REFERENCES users(id) ON DELETE CASCADE,
     FOREIGN KEY (winner_user_id) REFERENCES users(id) ON DELETE SET NULL
 );
@@ -55,6 +63,8 @@ CREATE TABLE IF NOT EXISTS bids (
     user_id INT NOT NULL,
     amount DECIMAL(10, 2) NOT NULL,
     bid_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_bid_time (bid_time),
+    INDEX idx_product_amount (product_id, amount, id),
     FOREIGN KEY (product_id) REFERENCES products(id) ON DELETE CASCADE,
     FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
 );
@@ -87,6 +97,26 @@ CREATE TABLE IF NOT EXISTS plans (
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
 );
 
+-- Dashboard rollup (single row, id = 1; reconciled from the base tables)
+CREATE TABLE IF NOT EXISTS platform_stats (
+    id TINYINT UNSIGNED PRIMARY KEY,
+    total_users INT NOT NULL DEFAULT 0,
+    total_offices INT NOT NULL DEFAULT 0,
+    pending_offices INT NOT NULL DEFAULT 0,
+    live_auctions INT NOT NULL DEFAULT 0,
+    pending_auctions INT NOT NULL DEFAULT 0,
+    closed_auctions INT NOT NULL DEFAULT 0,
+    total_products INT NOT NULL DEFAULT 0,
+    two_wheeler INT NOT NULL DEFAULT 0,
+    three_wheeler INT NOT NULL DEFAULT 0,
+    four_wheeler INT NOT NULL DEFAULT 0,
+    commercial INT NOT NULL DEFAULT 0,
+    total_volume DECIMAL(15, 2) NOT NULL DEFAULT 0,
+    total_auction_value DECIMAL(15, 2) NOT NULL DEFAULT 0,
+    pending_payments INT NOT NULL DEFAULT 0,
+    reconciled_at DATETIME DEFAULT NULL
+);
+
 -- Insert default plans
 INSERT INTO plans (name, price, duration, period, features, popular, sort_order) VALUES
 ('Basic', 499, '30 Days', '30 Days', '["Access all auctions","Real-time bidding","Email notifications","Standard support"]', FALSE, 1),
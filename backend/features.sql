@@ -12,6 +12,8 @@ CREATE TABLE IF NOT EXISTS password_resets (
     FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
 );
 
+-- Legacy: items JSON array per user. init_db moves it into wishlist_items
+-- and empties the column.
 CREATE TABLE IF NOT EXISTS wishlists (
     user_id INT PRIMARY KEY,
     items JSON,
@@ -19,6 +21,18 @@ CREATE TABLE IF NOT EXISTS wishlists (
     FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
 );
 
+-- One row per wishlisted product; idx_product answers "who wishlisted this".
+CREATE TABLE IF NOT EXISTS wishlist_items (
+    user_id INT NOT NULL,
+    product_id INT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (user_id, product_id),
+    INDEX idx_product (product_id, user_id),
+    INDEX idx_user_created (user_id, created_at),
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+    FOREIGN KEY (product_id) REFERENCES products(id) ON DELETE CASCADE
+);
+
 CREATE TABLE IF NOT EXISTS transactions (
     id INT AUTO_INCREMENT PRIMARY KEY,
     user_id INT NOT NULL,
@@ -30,12 +44,38 @@ CREATE TABLE IF NOT EXISTS transactions (
     upi_transaction_id VARCHAR(100) DEFAULT NULL,
     verified_by INT DEFAULT NULL,
     verified_at TIMESTAMP NULL DEFAULT NULL,
+    duplicate_of INT DEFAULT NULL,                -- earlier transaction with a near-identical screenshot
+    duplicate_distance TINYINT UNSIGNED DEFAULT NULL,  -- hamming distance between the two hashes
     transaction_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
     FOREIGN KEY (product_id) REFERENCES products(id) ON DELETE CASCADE,
     FOREIGN KEY (verified_by) REFERENCES users(id) ON DELETE SET NULL
 );
 
+-- ─────────────────────────────────────────────────────────────────────────────
+-- Payment screenshot hash index — 256-bit dHash split into 8 indexed bands.
+-- Hashes within 7 bits share at least one band, so duplicates are found with
+-- index lookups instead of comparing images at review time.
+-- ─────────────────────────────────────────────────────────────────────────────
+CREATE TABLE IF NOT EXISTS payment_screenshot_hashes (
+    transaction_id INT PRIMARY KEY,
+    phash CHAR(64) NOT NULL,                      -- hex
+    band0 INT UNSIGNED NOT NULL,
+    band1 INT UNSIGNED NOT NULL,
+    band2 INT UNSIGNED NOT NULL,
+    band3 INT UNSIGNED NOT NULL,
+    band4 INT UNSIGNED NOT NULL,
+    band5 INT UNSIGNED NOT NULL,
+    band6 INT UNSIGNED NOT NULL,
+    band7 INT UNSIGNED NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_band0 (band0), INDEX idx_band1 (band1),
+    INDEX idx_band2 (band2), INDEX idx_band3 (band3),
+    INDEX idx_band4 (band4), INDEX idx_band5 (band5),
+    INDEX idx_band6 (band6), INDEX idx_band7 (band7),
+    FOREIGN KEY (transaction_id) REFERENCES transactions(id) ON DELETE CASCADE
+);
+
 -- ─────────────────────────────────────────────────────────────────────────────
 -- Error Logs — rich device + browser fingerprint table
 -- ─────────────────────────────────────────────────────────────────────────────
@@ -80,9 +120,86 @@ CREATE TABLE IF NOT EXISTS error_logs (
     occurred_at     DATETIME     NOT NULL,       -- exact client-side timestamp
     created_at      TIMESTAMP    DEFAULT CURRENT_TIMESTAMP,
 
-    INDEX idx_error_type  (error_type),
-    INDEX idx_user_id     (user_id),
-    INDEX idx_occurred_at (occurred_at)
+    fingerprint     CHAR(32)     DEFAULT NULL,   -- error_groups.fingerprint
+
+    INDEX idx_type_time   (error_type, occurred_at),
+    INDEX idx_user_time   (user_id, occurred_at),
+    INDEX idx_occurred_at (occurred_at),
+    INDEX idx_fingerprint (fingerprint, occurred_at)
+);
+-- Converted to daily RANGE partitions on occurred_at (PRIMARY KEY becomes
+-- (id, occurred_at)) by `python maintain_logs.py --partition`; retention then
+-- drops whole partitions. See app/utils/log_retention.py.
+
+-- ─────────────────────────────────────────────────────────────────────────────
+-- Daily error rollup — counts by type, browser and OS, bumped at ingest and
+-- kept after raw error_logs partitions expire.
+-- ─────────────────────────────────────────────────────────────────────────────
+CREATE TABLE IF NOT EXISTS error_log_daily (
+    day             DATE          NOT NULL,
+    error_type      VARCHAR(50)   NOT NULL DEFAULT '',
+    browser_name    VARCHAR(100)  NOT NULL DEFAULT '',
+    os_name         VARCHAR(100)  NOT NULL DEFAULT '',
+    occurrences     INT           NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, error_type, browser_name, os_name)
+);
+
+-- ─────────────────────────────────────────────────────────────────────────────
+-- Error groups — one row per fingerprint (type + component + masked message +
+-- top stack frames), upserted at ingest. affected_users is a 4096-bit
+-- linear-counting bitmap of reporting users. Raw error_logs rows are kept for
+-- the first ERROR_GROUP_RAW_QUOTA occurrences, then sampled.
+-- ─────────────────────────────────────────────────────────────────────────────
+CREATE TABLE IF NOT EXISTS error_groups (
+    id              INT AUTO_INCREMENT PRIMARY KEY,
+    fingerprint     CHAR(32)      NOT NULL UNIQUE,
+    error_type      VARCHAR(50)   DEFAULT NULL,
+    component_name  VARCHAR(255)  DEFAULT NULL,
+    title           VARCHAR(500)  DEFAULT NULL,   -- normalized message
+    sample_message  TEXT,                         -- latest occurrence
+    sample_stack    TEXT,
+    occurrences     INT           NOT NULL DEFAULT 0,
+    raw_count       INT           NOT NULL DEFAULT 0,   -- rows kept in error_logs
+    affected_users  VARBINARY(512) DEFAULT NULL,
+    first_seen      DATETIME      NOT NULL,
+    last_seen       DATETIME      NOT NULL,
+    INDEX idx_last_seen   (last_seen, id),
+    INDEX idx_occurrences (occurrences, id)
+);
+
+-- ─────────────────────────────────────────────────────────────────────────────
+-- Saved searches — get_auctions filters stored as JSON. Approved products are
+-- matched against them by a reverse index (app/utils/saved_searches.py) and
+-- matches land in notifications.
+-- ─────────────────────────────────────────────────────────────────────────────
+CREATE TABLE IF NOT EXISTS saved_searches (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    user_id INT NOT NULL,
+    name VARCHAR(100) NOT NULL,
+    query JSON NOT NULL,                          -- {"category": ["2W"], "search": "pulsar", ...}
+    notify BOOLEAN DEFAULT TRUE,
+    last_notified_at TIMESTAMP NULL DEFAULT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_user (user_id),
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS notifications (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    user_id INT NOT NULL,
+    type VARCHAR(50) NOT NULL,                    -- 'saved_search', 'price_change', 'ending_soon'
+    title VARCHAR(255) NOT NULL,
+    message VARCHAR(1000) DEFAULT NULL,
+    product_id INT DEFAULT NULL,
+    saved_search_id INT DEFAULT NULL,
+    is_read BOOLEAN DEFAULT FALSE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_user_read (user_id, is_read, id),
+    INDEX idx_product_type (product_id, type, user_id),
+    UNIQUE KEY uniq_search_product (saved_search_id, product_id),  -- one alert per search per product
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+    FOREIGN KEY (product_id) REFERENCES products(id) ON DELETE CASCADE,
+    FOREIGN KEY (saved_search_id) REFERENCES saved_searches(id) ON DELETE CASCADE
 );
 
 -- ─────────────────────────────────────────────────────────────────────────────
@@ -110,7 +227,9 @@ ALTER TABLE error_logs
     ADD COLUMN IF NOT EXISTS ip_address      VARCHAR(45)   DEFAULT NULL AFTER timezone,
     ADD COLUMN IF NOT EXISTS app_version     VARCHAR(50)   DEFAULT NULL AFTER ip_address,
     ADD COLUMN IF NOT EXISTS occurred_at     DATETIME      DEFAULT CURRENT_TIMESTAMP AFTER app_version,
-    MODIFY COLUMN IF EXISTS page_url         VARCHAR(1000) DEFAULT NULL;
+    MODIFY COLUMN IF EXISTS page_url         VARCHAR(1000) DEFAULT NULL,
+    ADD COLUMN IF NOT EXISTS fingerprint     CHAR(32)      DEFAULT NULL AFTER created_at,
+    ADD INDEX IF NOT EXISTS idx_fingerprint (fingerprint, occurred_at);
 
 -- ─────────────────────────────────────────────────────────────────────────────
 -- MIGRATION: Add bidding close/winner columns to products table
@@ -127,5 +246,7 @@ ALTER TABLE transactions
     ADD COLUMN IF NOT EXISTS payment_screenshot VARCHAR(500) DEFAULT NULL AFTER payment_status,
     ADD COLUMN IF NOT EXISTS upi_transaction_id VARCHAR(100) DEFAULT NULL AFTER payment_screenshot,
     ADD COLUMN IF NOT EXISTS verified_by INT DEFAULT NULL AFTER upi_transaction_id,
-    ADD COLUMN IF NOT EXISTS verified_at TIMESTAMP NULL DEFAULT NULL AFTER verified_by;
+    ADD COLUMN IF NOT EXISTS verified_at TIMESTAMP NULL DEFAULT NULL AFTER verified_by,
+    ADD COLUMN IF NOT EXISTS duplicate_of INT DEFAULT NULL AFTER verified_at,
+    ADD COLUMN IF NOT EXISTS duplicate_distance TINYINT UNSIGNED DEFAULT NULL AFTER duplicate_of;
 
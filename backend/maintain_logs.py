@@ -0,0 +1,75 @@
+"""
+Daily maintenance for the day-partitioned log tables (error_logs, and
+auth_logs where that table exists): create the next LOG_PARTITIONS_AHEAD
+days of partitions and drop the ones past ERROR_LOG_RETENTION_DAYS /
+AUTH_LOG_RETENTION_DAYS. Dropping a partition is a metadata operation, so
+this is safe to run during traffic; schedule it once a day, e.g.
+
+    15 3 * * *  cd /path/to/backend && python maintain_logs.py
+
+Daily error counts live on in error_log_daily (bumped at ingest).
+
+--partition converts tables that aren't partitioned yet. It rebuilds the
+table once (the primary key becomes (id, <time column>)), so run it in a
+quiet window; existing rows go to a p_history partition that is emptied once
+it falls out of the retention window.
+
+Run from backend dir:  python maintain_logs.py [--partition] [--dry-run]
+"""
+import argparse
+import datetime
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from app import create_app
+from app.utils import log_retention
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--partition", action="store_true", help="convert unpartitioned log tables first")
+    parser.add_argument("--dry-run", action="store_true", help="only report partition state")
+    args = parser.parse_args()
+
+    app = create_app()
+    from app import db
+
+    retention = {
+        "error_logs": app.config["ERROR_LOG_RETENTION_DAYS"],
+        "auth_logs": app.config["AUTH_LOG_RETENTION_DAYS"],
+    }
+    ahead = app.config["LOG_PARTITIONS_AHEAD"]
+    today = datetime.date.today()
+
+    conn = db.get_db()
+    cursor = conn.cursor()
+    try:
+        for table, column in log_retention.PARTITIONED_TABLES.items():
+            if not log_retention.table_exists(cursor, table):
+                print(f"{table}: no such table, skipped")
+                continue
+            existing = log_retention.partitions(cursor, table)
+            if args.dry_run:
+                days = sorted(existing) if existing else []
+                state = f"{len(days)} day partitions ({days[0]} … {days[-1]})" if days else "not partitioned"
+                print(f"{table}: {state}, retention {retention[table]} days")
+                continue
+            if existing is None and args.partition:
+                print(f"{table}: partitioning by day on {column} …")
+                log_retention.partition_table(cursor, table, column, today, ahead)
+                existing = log_retention.partitions(cursor, table)
+            if existing is not None:
+                added = log_retention.add_future_partitions(cursor, table, today, ahead)
+                print(f"{table}: {len(added)} partitions added")
+            print(f"{table}: {log_retention.drop_expired(cursor, table, column, today, retention[table])}")
+            conn.commit()
+    finally:
+        cursor.close()
+        conn.close()
+    print("Log maintenance done!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+Send "auction ending soon" alerts to users who wishlisted an open auction
+closing within WISHLIST_ENDING_SOON_MINUTES. Each user is told once per
+auction.
+
+run.py already runs this scan every WISHLIST_ENDING_SOON_SCAN_INTERVAL
+seconds; use this script from cron when the API is served another way (set
+the interval to 0 there). Concurrent scans are serialized by a MySQL lock.
+
+Run from backend dir:  python notify_ending_soon.py [--minutes N]
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from app import create_app
+from app.utils import wishlist_alerts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--minutes", type=int, default=None, help="window ahead of bid_end_date (default from config)")
+    args = parser.parse_args()
+
+    app = create_app()
+    from app import db
+
+    minutes = args.minutes or app.config["WISHLIST_ENDING_SOON_MINUTES"]
+    with app.app_context():
+        conn = db.get_db()
+        cursor = conn.cursor()
+        try:
+            auctions, notified = wishlist_alerts.scan_ending_soon(conn, cursor, minutes)
+        finally:
+            cursor.close()
+            conn.close()
+    print(f"Ending-soon scan done! {auctions} auctions, {notified} users notified.")
+
+
+if __name__ == "__main__":
+    main()
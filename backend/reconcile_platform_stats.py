@@ -0,0 +1,49 @@
+"""
+Recompute the platform_stats dashboard rollup from the base tables.
+
+The write paths keep the row current incrementally and the dashboard
+reconciles it in the background every STATS_RECONCILE_INTERVAL seconds; run
+this after bulk imports or manual SQL to correct drift immediately. Prints
+any counter that had drifted.
+
+Run from backend dir:  python reconcile_platform_stats.py
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from app import create_app
+from app.utils import platform_stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.parse_args()
+
+    create_app()
+    from app import db
+
+    conn = db.get_db()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT * FROM platform_stats WHERE id = 1")
+        before = cursor.fetchone() or {}
+        values = platform_stats.reconcile(cursor)
+        conn.commit()
+    finally:
+        cursor.close()
+        conn.close()
+
+    drifted = 0
+    for key in platform_stats.COUNTERS:
+        old = before.get(key)
+        if old is None or float(old) != float(values[key]):
+            print(f"  {key}: {old} -> {values[key]}")
+            drifted += 1
+    print(f"Reconcile done! {drifted} counters corrected.")
+
+
+if __name__ == "__main__":
+    main()
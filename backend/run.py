@@ -19,6 +19,10 @@ if __name__ == "__main__":
     port = int(os.getenv("PORT", 5000))
     debug = os.getenv("FLASK_ENV") == "development"
 
+    # Wishlist "auction ending soon" alerts (see app/utils/wishlist_alerts.py)
+    from app.utils.wishlist_alerts import run_ending_soon_loop
+    socketio.start_background_task(run_ending_soon_loop, app)
+
     print(f"[AutoRevive] API starting on http://{host}:{port}  (WebSockets: enabled)")
     # socketio.run() replaces app.run() — it manages the eventlet WSGI loop
     # and handles both HTTP and WebSocket connections on the same port.
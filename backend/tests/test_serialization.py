@@ -0,0 +1,36 @@
+import datetime
+import decimal
+
+from app.utils.serialization import serialize_row, serialize_rows
+
+
+def test_mixed_type_column_is_converted_per_value():
+    rows = [
+        {"id": 1, "total_bids": 0},
+        {"id": 2, "total_bids": decimal.Decimal("12345.50")},
+    ]
+    out = serialize_rows(rows)
+    assert out[1]["total_bids"] == 12345.5
+    assert type(out[1]["total_bids"]) is float
+
+
+def test_mixed_type_converted_column():
+    rows = [
+        {"id": 1, "at": datetime.date(2026, 1, 2)},
+        {"id": 2, "at": datetime.datetime(2026, 1, 2, 3, 4, 5)},
+        {"id": 3, "at": decimal.Decimal("1.5")},
+        {"id": 4, "at": None},
+    ]
+    assert serialize_rows(rows) == [serialize_row(r) for r in rows]
+    assert type(serialize_rows(rows)[2]["at"]) is float
+
+
+def test_matches_serialize_row_types():
+    rows = [
+        {"id": 1, "price": decimal.Decimal("10.00"), "name": "a", "password_hash": "x"},
+        {"id": 2, "price": None, "name": None, "password_hash": "y"},
+        {"id": 3, "price": decimal.Decimal("2.50"), "name": "c", "password_hash": "z"},
+    ]
+    for got, want in zip(serialize_rows(rows), [serialize_row(r) for r in rows]):
+        assert got == want
+        assert {k: type(v) for k, v in got.items()} == {k: type(v) for k, v in want.items()}
@@ -39,16 +39,14 @@ export default function Home() {
       .finally(() => setLoading(false));
   }, []);
 
-  // Fetch user's wishlist to show heart states
+  // Heart states: ask which of the listed products are wishlisted
   useEffect(() => {
-    if (!isAuthenticated) return;
-    api.get('/features/wishlist')
-      .then(({ data }) => {
-        const ids = (data.wishlist || []).map((p) => p.id);
-        setWishlistIds(new Set(ids));
-      })
+    const ids = (data.products || []).slice(0, 6).map((p) => p.id);
+    if (!isAuthenticated || ids.length === 0) return;
+    api.post('/features/wishlist/contains', { ids })
+      .then(({ data }) => setWishlistIds(new Set(data.wishlisted || [])))
       .catch((err) => logError(err, { errorType: 'api' }));
-  }, [isAuthenticated]);
+  }, [isAuthenticated, data.products]);
 
   // Auto-rotate hero images
   useEffect(() => {